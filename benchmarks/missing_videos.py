@@ -0,0 +1,75 @@
+import os
+import sys
+import timeit
+
+# same as for the unit tests, the source is in a completely different directory
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from youspotube.api.youtube import YouTube  # noqa: E402
+import youspotube.constants as constants  # noqa: E402
+
+SIZES = [1000, 2500, 5000, 10000]
+SEARCH_RESULTS_PER_VIDEO = constants.YOUTUBE_SEARCH_LIMIT
+REPEATS = 3
+
+
+def create_playlist_items(size):
+    # every other video of the candidates is already in the playlist
+    playlist_items = []
+    for index in range(size):
+        playlist_items.append({
+            'contentDetails': {
+                'videoId': 'video%s' % (index * 2)
+            },
+            'snippet': {
+                'title': 'Title %s' % (index * 2)
+            }
+        })
+    return playlist_items
+
+
+def create_candidate_videos(size):
+    videos = []
+    for index in range(size):
+        search_results = []
+        for result_index in range(SEARCH_RESULTS_PER_VIDEO):
+            search_results.append({
+                'id': 'result%s_%s' % (index, result_index),
+                'title': 'Result %s %s' % (index, result_index)
+            })
+        videos.append({
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: 'video%s' % index,
+            constants.SEARCH_RESULTS_DATA_KEY: search_results,
+            constants.TRACK_POSITION_DATA_KEY: index
+        })
+    return videos
+
+
+def benchmark(size):
+    playlist_items = create_playlist_items(size)
+    videos = create_candidate_videos(size)
+    youtube = YouTube.__new__(YouTube)
+    youtube._get_playlist_items = lambda playlist_id: playlist_items
+    playlist_details = {
+        constants.ORIGIN_YOUTUBE: 'playlist'
+    }
+
+    missing_videos = list(youtube.get_missing_videos_in_playlist(playlist_details, videos))
+    seconds = min(timeit.repeat(
+        lambda: list(youtube.get_missing_videos_in_playlist(playlist_details, videos)),
+        number=1,
+        repeat=REPEATS
+    ))
+    return seconds, len(missing_videos)
+
+
+def main():
+    print("get_missing_videos_in_playlist, %s search results per candidate video" % SEARCH_RESULTS_PER_VIDEO)
+    print("%12s %12s %12s %14s" % ('playlist', 'candidates', 'missing', 'seconds'))
+    for size in SIZES:
+        seconds, missing_count = benchmark(size)
+        print("%12s %12s %12s %14.4f" % (size, size, missing_count, seconds))
+
+
+if __name__ == '__main__':
+    main()
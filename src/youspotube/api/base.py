@@ -1,15 +1,73 @@
+from collections import Counter
+import threading
+from types import MappingProxyType
 from youspotube.exceptions import ConfigurationError
+from youspotube.util.credential_refresher import CredentialRefresher
+from youspotube.util.lookup_memo import LookupMemo
+import youspotube.constants as constants
 
 
 class BaseAPI:
-    def __init__(self, client_id, client_secret, tied_songs):
+    def __init__(self, client_id, client_secret, tied_songs, match_cache, rate_limiter, search_workers):
         classname = type(self).__name__
 
         self.client_id = client_id
         self.client_secret = client_secret
         self.tied_songs = tied_songs
+        self.tied_track_ids_by_video_id, self.tied_video_ids_by_track_id = BaseAPI.index_tied_songs(tied_songs)
+        self.match_cache = match_cache
+        self.rate_limiter = rate_limiter
+        self.search_workers = search_workers
+        # the searches of the playlists that are synchronized simultaneously share the same number of workers
+        self.search_slots = threading.BoundedSemaphore(search_workers)
+        # lookups share a single connection, which must only be refreshed by one of them at a time
+        self.connection_lock = threading.RLock()
+        # songs that are in several playlists are looked up once per run
+        self.lookup_memo = LookupMemo()
+        self.lookup_counts = Counter()
+        self.lookup_counts_lock = threading.Lock()
         try:
             self._init_connection()
-            self._test_connection()
         except Exception as e:
-            raise ConfigurationError("Test connection to %s API failed: %s" % (classname, str(e)))
+            raise ConfigurationError("Connection to %s API failed: %s" % (classname, str(e)))
+
+        # the credentials are refreshed ahead of their expiry, so API calls do not have to wait for a refresh
+        self.credential_refresher = CredentialRefresher(classname, self._get_credentials_expires_at,
+                                                        self._refresh_credentials)
+
+    def start_credential_refresher(self):
+        # started once the test connection has refreshed an expired token, so the two never refresh it at the same time
+        self.credential_refresher.start()
+
+    def disconnect(self):
+        self.credential_refresher.stop()
+
+    def test_connection(self, playlists):
+        try:
+            self._test_connection(playlists)
+        except Exception as e:
+            raise ConfigurationError("Test connection to %s API failed: %s" % (type(self).__name__, str(e)))
+
+    def _run_search(self, search, *args):
+        with self.search_slots:
+            return search(*args)
+
+    def get_lookup_counts(self):
+        with self.lookup_counts_lock:
+            return dict(self.lookup_counts)
+
+    def _count_lookup(self, outcome):
+        with self.lookup_counts_lock:
+            self.lookup_counts[outcome] += 1
+
+    def index_tied_songs(tied_songs):
+        # ties are validated to be unique in both directions, so each ID maps to exactly one ID on the other side
+        track_ids_by_video_id = {}
+        video_ids_by_track_id = {}
+
+        for tie_name in tied_songs:
+            tie = tied_songs[tie_name]
+            track_ids_by_video_id[tie[constants.ORIGIN_YOUTUBE]] = tie[constants.ORIGIN_SPOTIFY]
+            video_ids_by_track_id[tie[constants.ORIGIN_SPOTIFY]] = tie[constants.ORIGIN_YOUTUBE]
+
+        return MappingProxyType(track_ids_by_video_id), MappingProxyType(video_ids_by_track_id)
@@ -1,9 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import time
 import spotipy
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyOAuth
 from youspotube.api.base import BaseAPI
 import youspotube.constants as constants
+from youspotube.util.pipeline import Pipeline
+from youspotube.util.rate_limiter import RateLimiter
+from youspotube.util.token_cache import TokenCache
 from youspotube.util.tools import Tools
 
 
@@ -11,11 +15,12 @@ class Spotify(BaseAPI):
     @property
     def connection(self):
         # _init_connection should have been called in order to be able to use this property
-        auth_manager = self.spotify.auth_manager
-        token_info = auth_manager.cache_handler.get_cached_token()
-        if token_info is not None and auth_manager.is_token_expired(token_info):
-            self._init_connection()
-        return self.spotify
+        with self.connection_lock:
+            auth_manager = self.spotify.auth_manager
+            token_info = auth_manager.cache_handler.get_cached_token()
+            if token_info is not None and auth_manager.is_token_expired(token_info):
+                self._refresh_credentials()
+            return self.spotify
 
     def _init_connection(self):
         cache_path = Tools.get_filepath_relative_to_ysptb(constants.SPOTIFY_TOKEN_STORAGE_FILE)
@@ -26,19 +31,80 @@ class Spotify(BaseAPI):
                 redirect_uri=constants.SPOTIFY_CALLBACK_URL,
                 client_id=self.client_id,
                 client_secret=self.client_secret,
-                cache_path=cache_path
+                cache_handler=TokenCache(cache_path)
             )
         )
-
-    def _test_connection(self):
+        # spotipy authorizes lazily, getting the first token up front keeps the authorization prompt out of the health
+        # checks, while an expired token is only refreshed by the test connection, within their deadline
+        if self.spotify.auth_manager.cache_handler.get_cached_token() is None:
+            self.spotify.auth_manager.get_access_token(as_dict=False)
+
+    def _get_credentials_expires_at(self):
+        token_info = self.spotify.auth_manager.cache_handler.get_cached_token()
+        if token_info is None:
+            return None
+
+        return token_info['expires_at']
+
+    def _refresh_credentials(self):
+        with self.connection_lock:
+            auth_manager = self.spotify.auth_manager
+            token_info = auth_manager.cache_handler.get_cached_token()
+            # the token cache keeps the refreshed token in memory and saves it
+            auth_manager.refresh_access_token(token_info['refresh_token'])
+
+    def _test_connection(self, playlists):
         self.connection.me()
 
     def _get_playlist_items(self, playlist_id):
-        all_tracks = self.connection.playlist(playlist_id, 'tracks(items(track(name,id,duration_ms,artists(name))))')
-        items = all_tracks['tracks']['items']
+        first_page = self._get_playlist_items_page(playlist_id, 0)
+        items = first_page['items']
+
+        # the first page tells how many items there are, so the rest of the pages can be fetched simultaneously
+        remaining_pages_offsets = range(constants.SPOTIFY_PLAYLIST_PAGE_SIZE, first_page['total'],
+                                        constants.SPOTIFY_PLAYLIST_PAGE_SIZE)
+        if not remaining_pages_offsets:
+            return items
+
+        with ThreadPoolExecutor(max_workers=constants.SPOTIFY_PLAYLIST_FETCH_WORKERS) as executor:
+            pages = executor.map(lambda offset: self._get_playlist_items_page(playlist_id, offset), remaining_pages_offsets)
+            for page in pages:
+                items.extend(page['items'])
 
         return items
 
+    def _get_playlist_items_page(self, playlist_id, offset):
+        return self.connection.playlist_items(
+            playlist_id,
+            fields=constants.SPOTIFY_PLAYLIST_ITEMS_FIELDS,
+            limit=constants.SPOTIFY_PLAYLIST_PAGE_SIZE,
+            offset=offset,
+            additional_types=('track',)
+        )
+
+    def get_playlist_snapshot_ids(self, playlist_ids):
+        remaining_playlist_ids = set(playlist_ids)
+        snapshot_ids = {}
+
+        # the snapshot IDs of all playlists in the user's library come with a few pages of a single listing
+        offset = 0
+        while remaining_playlist_ids:
+            page = self.connection.current_user_playlists(limit=constants.SPOTIFY_USER_PLAYLISTS_PAGE_SIZE, offset=offset)
+            for playlist in page['items']:
+                if playlist['id'] in remaining_playlist_ids:
+                    snapshot_ids[playlist['id']] = playlist['snapshot_id']
+                    remaining_playlist_ids.discard(playlist['id'])
+
+            if page['next'] is None:
+                break
+            offset += constants.SPOTIFY_USER_PLAYLISTS_PAGE_SIZE
+
+        # playlists that are not in the user's library are looked up one by one
+        for playlist_id in remaining_playlist_ids:
+            snapshot_ids[playlist_id] = self.connection.playlist(playlist_id, fields='snapshot_id')['snapshot_id']
+
+        return snapshot_ids
+
     def parse_playlist(self, playlist_details):
         playlist_id = playlist_details[constants.ORIGIN_SPOTIFY]
         playlist_items = self._get_playlist_items(playlist_id)
@@ -61,37 +127,41 @@ class Spotify(BaseAPI):
         return playlist
 
     def youtube_playlist_to_track_ids(self, youtube_playlist):
-        track_ids = []
+        # the searches run simultaneously a bounded number of videos ahead of the consumer of the track IDs,
+        # their results come in the order of the playlist as soon as they are ready
+        lookups = Pipeline.ordered_map(
+            lambda video_id: self.lookup_memo.get(
+                video_id,
+                lambda: self._run_search(self._lookup_youtube_video_on_spotify, youtube_playlist[video_id], video_id)
+            ),
+            youtube_playlist,
+            self.search_workers,
+            self.search_workers * constants.PIPELINE_MAX_PENDING_RESULTS_PER_WORKER
+        )
+        return self._get_track_ids_from_lookups(youtube_playlist, lookups)
 
+    def _get_track_ids_from_lookups(self, youtube_playlist, lookups):
         track_position = 0
-        for video_id in youtube_playlist:
+        for video_id, lookup in zip(youtube_playlist, lookups):
             video = youtube_playlist[video_id]
-
-            track_id, track_title_artists, search_results = self._lookup_youtube_video_on_spotify(video, video_id)
+            track_id, track_title_artists, search_results = lookup
 
             if track_id is None:
                 continue
 
-            track_ids.append({
+            yield {
                 constants.SPOTIFY_TRACK_ID_DATA_KEY: track_id,
                 constants.YOUTUBE_VIDEO_ID_DATA_KEY: video_id,
                 constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: track_title_artists,
                 constants.YOUTUBE_VIDEO_TITLE_DATA_KEY: video['title'],
                 constants.SEARCH_RESULTS_DATA_KEY: search_results,
                 constants.TRACK_POSITION_DATA_KEY: track_position
-            })
+            }
 
             track_position += 1
 
-        return track_ids
-
     def _get_tied_track_id_to_video_id(self, video_id):
-        for tie_name in self.tied_songs:
-            tie = self.tied_songs[tie_name]
-            if video_id == tie[constants.ORIGIN_YOUTUBE]:
-                return tie[constants.ORIGIN_SPOTIFY]
-
-        return None
+        return self.tied_track_ids_by_video_id.get(video_id)
 
     def _lookup_youtube_video_on_spotify(self, video, video_id):
         video_title = video['title']
@@ -106,6 +176,21 @@ class Spotify(BaseAPI):
             )
             return tied_track_id_to_video_id, None, None
 
+        cached_match = self.match_cache.get(constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK, video_id)
+        if cached_match is not None:
+            cached_track_id, match_details = cached_match
+            logging.debug(
+                "Using cached track ID '%s' to video '%s' instead of looking it up on Spotify" % (
+                    cached_track_id,
+                    video_title
+                )
+            )
+            return (
+                cached_track_id,
+                match_details[constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY],
+                match_details[constants.SEARCH_RESULTS_DATA_KEY]
+            )
+
         logging.debug("Spotify search query: %s" % video_title)
         tracks_result = self.connection.search(video_title, constants.SPOTIFY_SEARCH_LIMIT, 0, 'track')['tracks']['items']
 
@@ -125,15 +210,36 @@ class Spotify(BaseAPI):
         track_artists_names = list(map(lambda x: x['name'], track_artists))
         track_title_artists = Tools.get_track_string(track_name, track_artists_names)
 
+        self._cache_match(video_id, track_id, track_title_artists, tracks_result)
+
         return track_id, track_title_artists, tracks_result
 
+    def _cache_match(self, video_id, track_id, track_title_artists, tracks_result):
+        # only the track IDs are used when diffing against the target playlist
+        search_results = []
+        for found_track in tracks_result:
+            search_results.append({
+                'id': found_track['id']
+            })
+
+        self.match_cache.put(
+            constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK,
+            video_id,
+            track_id,
+            {
+                constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: track_title_artists,
+                constants.SEARCH_RESULTS_DATA_KEY: search_results,
+                # the match is verified by searching for the track on YouTube later on
+                constants.MATCH_VERIFIED_DATA_KEY: None
+            }
+        )
+
     def _get_track_ids_from_spotify_playlist(self, playlist_items):
-        track_ids = []
+        track_ids = set()
 
         for item in playlist_items:
             track = item['track']
-            track_id = track['id']
-            track_ids.append(track_id)
+            track_ids.add(track['id'])
 
         return track_ids
 
@@ -142,47 +248,89 @@ class Spotify(BaseAPI):
         playlist_items = self._get_playlist_items(playlist_id)
         playlist_track_ids = self._get_track_ids_from_spotify_playlist(playlist_items)
 
-        missing_tracks = []
-
+        # missing tracks are yielded as soon as they're found instead of being collected first
         for track in all_tracks:
-            track_search_results = track[constants.SEARCH_RESULTS_DATA_KEY]
+            if not self._is_track_in_playlist(track, playlist_track_ids):
+                yield track
 
-            track_in_playlist = False
+    def _is_track_in_playlist(self, track, playlist_track_ids):
+        track_search_results = track[constants.SEARCH_RESULTS_DATA_KEY]
 
-            if track_search_results is not None:
-                for found_track in track_search_results:
-                    found_track_id = found_track['id']
+        if track_search_results is None:
+            # a track without related YouTube search results is a tied track
+            # we just look up those in the playlist directly
+            return track[constants.SPOTIFY_TRACK_ID_DATA_KEY] in playlist_track_ids
 
-                    if found_track_id in playlist_track_ids:
-                        track_in_playlist = True
-                        break
-            else:
-                # a track without related YouTube search results is a tied track
-                # we just look up those in the playlist directly
-                track_in_playlist = track[constants.SPOTIFY_TRACK_ID_DATA_KEY] in playlist_track_ids
-
-            if not track_in_playlist:
-                missing_tracks.append(track)
+        for found_track in track_search_results:
+            if found_track['id'] in playlist_track_ids:
+                return True
 
-        return missing_tracks
+        return False
 
-    def add_tracks_to_playlist(self, playlist_details, tracks_to_add):
+    def add_tracks_to_playlist(self, playlist_details, tracks_to_add, on_pushed=None):
         playlist_id = playlist_details[constants.ORIGIN_SPOTIFY]
+        # the playlist is fetched once, its length is kept up to date locally while pushing
+        playlist_length = len(self._get_playlist_items(playlist_id))
+
+        for track_ids, position in self._group_tracks_by_insertion_point(tracks_to_add, playlist_length):
+            logging.debug("Pushing tracks '%s' to Spotify playlist '%s'" % (
+                    "', '".join(track_ids),
+                    playlist_id
+                )
+            )
+
+            self._push_tracks_to_playlist(playlist_id, track_ids, position)
+            if on_pushed is not None:
+                on_pushed(len(track_ids))
+
+    def _push_tracks_to_playlist(self, playlist_id, track_ids, position):
+        attempt = 1
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                self.connection.playlist_add_items(playlist_id, track_ids, position)
+                self.rate_limiter.on_success()
+                return
+            except SpotifyException as spotify_error:
+                self.rate_limiter.on_error(RateLimiter.parse_retry_after(spotify_error.headers.get('Retry-After')))
+                if spotify_error.http_status not in constants.RETRYABLE_PUSH_HTTP_STATUSES:
+                    raise
+                if attempt == constants.MAX_PUSH_ATTEMPTS:
+                    raise
+                attempt += 1
+
+    def _group_tracks_by_insertion_point(self, tracks_to_add, playlist_length):
+        # a batch is yielded, and therefore pushed, as soon as a track cannot extend it
+        batch = None
 
         for track in tracks_to_add:
-            playlist_length = len(self._get_playlist_items(playlist_id))
             track_id = track[constants.SPOTIFY_TRACK_ID_DATA_KEY]
             track_position = track[constants.TRACK_POSITION_DATA_KEY]
 
             if track_position > playlist_length - 1:
+                # positions past the end of the playlist are appended instead
                 track_position = None
 
-            logging.debug("Pushing track '%s' to Spotify playlist '%s'" % (
-                    track_id,
-                    playlist_id
-                )
-            )
+            if batch is not None and self._can_extend_batch(batch, track_position):
+                batch[0].append(track_id)
+            else:
+                if batch is not None:
+                    yield batch
+                batch = ([track_id], track_position)
+
+            playlist_length += 1
+
+        if batch is not None:
+            yield batch
+
+    def _can_extend_batch(self, batch, track_position):
+        batch_track_ids, batch_position = batch
+
+        if len(batch_track_ids) == constants.SPOTIFY_PLAYLIST_ADD_ITEMS_LIMIT:
+            return False
 
-            self.connection.playlist_add_items(playlist_id, [track_id], track_position)
+        if batch_position is None:
+            return track_position is None
 
-            time.sleep(constants.SLEEP_BETWEEN_PLAYLIST_PUSHES)
+        # a batch inserted at a given position extends when the track should go right after its last track
+        return track_position == batch_position + len(batch_track_ids)
@@ -1,35 +1,74 @@
+import calendar
+import hashlib
 import logging
-import time
 import os
 import pickle
+import threading
+import httplib2
 from googleapiclient.errors import HttpError
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from youspotube.api.base import BaseAPI
+from youspotube.exceptions import ExecutionError
 from youtubesearchpython import CustomSearch, VideoSortOrder
 import youspotube.constants as constants
+from youspotube.util.page_cache import PageCache
+from youspotube.util.pipeline import Pipeline
+from youspotube.util.rate_limiter import RateLimiter
 from youspotube.util.tools import Tools
 
 
 class YouTube(BaseAPI):
+    def __init__(self, *args):
+        # the playlists are listed several times per synchronization, their pages are kept along with their etags
+        self.playlist_items_page_cache = PageCache()
+        self.thread_local = threading.local()
+        super().__init__(*args)
+
     @property
     def connection(self):
         # _init_connection should have been called in order to be able to use this property
-        credentials = self._get_credentials()
-        if credentials.expired:
-            self._init_connection(credentials)
-        return self.youtube
+        with self.connection_lock:
+            # the service holds the same credentials object, so refreshing it in place keeps the service usable
+            if self.credentials.expired:
+                self._refresh_credentials()
+            return self.youtube
+
+    def _init_connection(self):
+        # an expired token is only refreshed by the test connection, which runs within the deadline of the health checks
+        self.credentials = self._get_credentials()
+
+        # the discovery document bundled with the client library is used, so building the service needs no network
+        self.youtube = build('youtube', 'v3', credentials=self.credentials, static_discovery=True,
+                             requestBuilder=self._build_request)
+
+    def _build_request(self, http, *args, **kwargs):
+        # httplib2 connections are not thread-safe, so each thread that synchronizes a playlist sends its requests
+        # through its own one
+        thread_http = getattr(self.thread_local, 'http', None)
+        if thread_http is None:
+            thread_http = AuthorizedHttp(
+                self.credentials,
+                http=httplib2.Http(timeout=constants.YOUTUBE_REQUEST_TIMEOUT_SECONDS)
+            )
+            self.thread_local.http = thread_http
 
-    def _init_connection(self, credentials=None):
-        if credentials is None:
-            credentials = self._get_credentials()
+        return HttpRequest(thread_http, *args, **kwargs)
 
-        if credentials.expired:
-            credentials.refresh(Request())
-            self._save_credentials(credentials)
+    def _get_credentials_expires_at(self):
+        if self.credentials.expiry is None:
+            return None
+
+        # google-auth keeps the expiry as a naive UTC datetime
+        return calendar.timegm(self.credentials.expiry.utctimetuple())
 
-        self.youtube = build('youtube', 'v3', credentials=credentials, static_discovery=False, cache_discovery=False)
+    def _refresh_credentials(self):
+        with self.connection_lock:
+            self.credentials.refresh(Request())
+            self._save_credentials(self.credentials)
 
     def _get_credentials(self):
         token_storage_file_path = Tools.get_filepath_relative_to_ysptb(constants.YOUTUBE_TOKEN_STORAGE_FILE)
@@ -57,40 +96,66 @@ class YouTube(BaseAPI):
 
     def _save_credentials(self, credentials):
         token_storage_file_path = Tools.get_filepath_relative_to_ysptb(constants.YOUTUBE_TOKEN_STORAGE_FILE)
-        with open(token_storage_file_path, 'wb') as credentials_file:
-            pickle.dump(credentials, credentials_file)
-
-    def _test_connection(self):
-        request = self.connection.channels().list(
-            part="snippet,contentDetails,statistics",
-            id="UC_x5XG1OV2P6uZZ5FSM9Ttw"
-        )
+        Tools.write_file_atomically(token_storage_file_path, pickle.dumps(credentials), 'wb')
+
+    def _test_connection(self, playlists):
+        # getting the connection refreshes an expired token
+        connection = self.connection
+        if not self.credentials.valid:
+            raise ValueError("the stored credentials are not valid")
+
+        # the only request made lists just the IDs of the configured playlists, which costs the least quota and
+        # tells up front which of them cannot be synchronized
+        playlist_ids = []
+        for playlist_name in playlists:
+            playlist_ids.append(playlists[playlist_name][constants.ORIGIN_YOUTUBE])
+        playlist_ids = playlist_ids[:constants.YOUTUBE_MAX_RESULTS_PER_PAGE]
+
+        response = connection.playlists().list(
+            part='id',
+            id=','.join(playlist_ids),
+            maxResults=constants.YOUTUBE_MAX_RESULTS_PER_PAGE,
+            fields=constants.YOUTUBE_PLAYLISTS_ID_FIELDS
+        ).execute()
 
-        request.execute()
+        found_playlist_ids = set(item['id'] for item in response['items'])
+        for playlist_name in playlists:
+            playlist_id = playlists[playlist_name][constants.ORIGIN_YOUTUBE]
+            if playlist_id in playlist_ids and playlist_id not in found_playlist_ids:
+                logging.warning(
+                    "YouTube playlist '%s' of playlist '%s' from the configuration file does not exist or is not "
+                    "accessible" % (playlist_id, playlist_name)
+                )
 
     def spotify_playlist_to_video_ids(self, spotify_playlist):
-        video_ids = []
+        # the lookups run simultaneously a bounded number of tracks ahead of the consumer of the video IDs,
+        # their results come in the order of the playlist as soon as they are ready
+        lookups = Pipeline.ordered_map(
+            lambda track_id: self.lookup_memo.get(
+                track_id,
+                lambda: self._run_search(self._lookup_spotify_track_on_youtube, spotify_playlist[track_id], track_id)
+            ),
+            spotify_playlist,
+            self.search_workers,
+            self.search_workers * constants.PIPELINE_MAX_PENDING_RESULTS_PER_WORKER
+        )
+        return self._get_video_ids_from_lookups(lookups)
 
+    def _get_video_ids_from_lookups(self, lookups):
         track_position = 0
-        for track_id in spotify_playlist:
-            track = spotify_playlist[track_id]
-
-            video_id, search_results = self._lookup_spotify_track_on_youtube(track, track_id)
-
+        for video_id, search_results in lookups:
             if video_id is None:
                 continue
 
-            video_ids.append({
+            yield {
                 constants.YOUTUBE_VIDEO_ID_DATA_KEY: video_id,
                 constants.SEARCH_RESULTS_DATA_KEY: search_results,
                 constants.TRACK_POSITION_DATA_KEY: track_position
-            })
+            }
 
             track_position += 1
 
-        return video_ids
-
-    def _lookup_spotify_track_on_youtube(self, track, track_id, search_limit=constants.INITIAL_SEARCH_LIMIT):
+    def _lookup_spotify_track_on_youtube(self, track, track_id):
         track_name = track['name']
         track_artists = track['artists']
         track_duration_s = track['duration_ms'] // 1000
@@ -105,30 +170,32 @@ class YouTube(BaseAPI):
                     track_beautiful
                 )
             )
+            self._count_lookup(constants.LOOKUP_OUTCOME_TIED)
             return tied_video_id_to_track_id, None
 
+        cached_match = self.match_cache.get(constants.MATCH_CACHE_KIND_TRACK_TO_VIDEO, track_id)
+        if cached_match is not None:
+            cached_video_id, match_details = cached_match
+            logging.debug(
+                "Using cached video ID '%s' to track '%s' instead of looking it up on YouTube" % (
+                    cached_video_id,
+                    track_beautiful
+                )
+            )
+            self._count_lookup(constants.LOOKUP_OUTCOME_CACHED)
+            return cached_video_id, match_details[constants.SEARCH_RESULTS_DATA_KEY]
+
         logging.debug("YouTube search query: %s" % track_lookup_string)
 
+        # a single page of search results holds more than the extended limit of videos, so getting all of them up front
+        # costs the same request as getting only the initial ones; the extra videos are checked only if needed
         videos_result = CustomSearch(
             track_lookup_string,
             VideoSortOrder.relevance,
-            search_limit
+            constants.EXTENDED_SEARCH_LIMIT
         ).result()['result']
-        videos = self._get_relevant_videos_from_search_result(track_duration_s, videos_result, search_limit)
-
-        # in order to produce more accurate results, choose the video that has the smallest duration delta compared to the Spotify # noqa: E501
-        # this is probably one of the best ways to mitigate duration issues similar to Taylor Swift's I Knew You Were Trouble # noqa: E501
-        # should this prove to be misleading, one could probably switch back to getting the top result... after all, AI knows best # noqa: E501
-
-        if not videos and search_limit == constants.INITIAL_SEARCH_LIMIT:
-            logging.debug(
-                "Could not find a relevant video in the top %s YouTube search results for: %s, checking the top %s results" % (
-                    constants.INITIAL_SEARCH_LIMIT,
-                    track_beautiful,
-                    constants.EXTENDED_SEARCH_LIMIT
-                )
-            )
-            return self._lookup_spotify_track_on_youtube(track, track_id, constants.EXTENDED_SEARCH_LIMIT)
+        videos, search_limit = self._get_relevant_videos_within_search_limits(track_duration_s, videos_result,
+                                                                              track_beautiful)
 
         if not videos:
             logging.warning(
@@ -137,12 +204,64 @@ class YouTube(BaseAPI):
                     track_beautiful
                 )
             )
+            self._count_lookup(constants.LOOKUP_OUTCOME_NOT_FOUND)
             return None, videos_result
 
+        # in order to produce more accurate results, choose the video that has the smallest duration delta compared to the Spotify # noqa: E501
+        # this is probably one of the best ways to mitigate duration issues similar to Taylor Swift's I Knew You Were Trouble # noqa: E501
+        # should this prove to be misleading, one could probably switch back to getting the top result... after all, AI knows best # noqa: E501
         videos.sort(key=lambda x: x[constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY])
         best_match_video = videos[0][constants.YOUTUBE_VIDEO_ID_DATA_KEY]
+        searched_videos_result = videos_result[:search_limit]
+
+        self._cache_match(track_id, videos[0], searched_videos_result)
+
+        return best_match_video, searched_videos_result
+
+    def _get_relevant_videos_within_search_limits(self, track_duration_s, videos_result, track_beautiful):
+        videos = self._get_relevant_videos_from_search_result(track_duration_s, videos_result,
+                                                              constants.INITIAL_SEARCH_LIMIT)
+        if videos:
+            self._count_lookup(constants.LOOKUP_OUTCOME_INITIAL_SEARCH)
+            return videos, constants.INITIAL_SEARCH_LIMIT
+
+        logging.debug(
+            "Could not find a relevant video in the top %s YouTube search results for: %s, checking the top %s results" % (
+                constants.INITIAL_SEARCH_LIMIT,
+                track_beautiful,
+                constants.EXTENDED_SEARCH_LIMIT
+            )
+        )
+        # the initial results have no relevant videos, so only the ones after them are checked
+        videos = self._get_relevant_videos_from_search_result(
+            track_duration_s,
+            videos_result[constants.INITIAL_SEARCH_LIMIT:],
+            constants.EXTENDED_SEARCH_LIMIT - constants.INITIAL_SEARCH_LIMIT
+        )
+        if videos:
+            self._count_lookup(constants.LOOKUP_OUTCOME_EXTENDED_SEARCH)
+        return videos, constants.EXTENDED_SEARCH_LIMIT
 
-        return best_match_video, videos_result
+    def _cache_match(self, track_id, best_match_video, videos_result):
+        # only the fields used when diffing against the target playlist are kept from the search results
+        search_results = []
+        for video_data in videos_result:
+            search_results.append({
+                'id': video_data['id'],
+                'title': video_data['title']
+            })
+
+        self.match_cache.put(
+            constants.MATCH_CACHE_KIND_TRACK_TO_VIDEO,
+            track_id,
+            best_match_video[constants.YOUTUBE_VIDEO_ID_DATA_KEY],
+            {
+                constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY: best_match_video[
+                    constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY
+                ],
+                constants.SEARCH_RESULTS_DATA_KEY: search_results
+            }
+        )
 
     def _get_relevant_videos_from_search_result(self, required_video_duration, search_result, search_limit):
         relevant_videos = []
@@ -167,147 +286,162 @@ class YouTube(BaseAPI):
         return relevant_videos
 
     def _get_tied_video_id_to_track_id(self, track_id):
-        for tie_name in self.tied_songs:
-            tie = self.tied_songs[tie_name]
-            if track_id == tie[constants.ORIGIN_SPOTIFY]:
-                return tie[constants.ORIGIN_YOUTUBE]
-
-        return None
+        return self.tied_video_ids_by_track_id.get(track_id)
 
-    def add_videos_to_playlist(self, playlist_details, videos):
+    def add_videos_to_playlist(self, playlist_details, videos, on_pushed=None):
         playlist_id = playlist_details[constants.ORIGIN_YOUTUBE]
+        # the playlist is listed once, its ordering is kept up to date locally from the responses of the inserts
+        playlist_video_ids = self._get_video_ids_from_youtube_playlist(self._get_playlist_items(playlist_id))
 
         for video_data in videos:
-            playlist_length = len(self._get_playlist_items(playlist_id))
             video_id = video_data[constants.YOUTUBE_VIDEO_ID_DATA_KEY]
-            request_body = {
-                "snippet": {
-                    "playlistId": playlist_id,
-                    "position": video_data[constants.TRACK_POSITION_DATA_KEY],
-                    "resourceId": {
-                        "kind": "youtube#video",
-                        "videoId": video_id
-                    }
-                }
-            }
-            if video_data[constants.TRACK_POSITION_DATA_KEY] > playlist_length - 1:
-                # remove the position property when it is not in the playlist range
-                # that's done in order to prevent invalid arguments due to invalid positions
-                request_body['snippet'].pop('position')
+            request_body = self._get_playlist_insert_request_body(playlist_id, video_data, len(playlist_video_ids))
 
             logging.debug("Pushing video ID '%s' to YouTube playlist '%s'" % (video_id, playlist_id))
 
-            request = self.connection.playlistItems().insert(
-                part="snippet",
-                body=request_body
-            )
+            response = self._push_video_to_playlist(playlist_id, video_id, request_body)
+            if response is None:
+                # the following videos would end up at wrong positions, so the synchronization is not complete
+                raise ExecutionError(
+                    "Stopped pushing to YouTube playlist '%s' because video ID '%s' could not be pushed" % (
+                        playlist_id,
+                        video_id
+                    )
+                )
+
+            self._update_playlist_video_ids(playlist_video_ids, video_id, response)
+            if on_pushed is not None:
+                on_pushed(1)
+
+    def _get_playlist_insert_request_body(self, playlist_id, video_data, playlist_length):
+        request_body = {
+            "snippet": {
+                "playlistId": playlist_id,
+                "position": video_data[constants.TRACK_POSITION_DATA_KEY],
+                "resourceId": {
+                    "kind": "youtube#video",
+                    "videoId": video_data[constants.YOUTUBE_VIDEO_ID_DATA_KEY]
+                }
+            }
+        }
+        if video_data[constants.TRACK_POSITION_DATA_KEY] > playlist_length - 1:
+            # remove the position property when it is not in the playlist range
+            # that's done in order to prevent invalid arguments due to invalid positions
+            request_body['snippet'].pop('position')
+
+        return request_body
+
+    def _push_video_to_playlist(self, playlist_id, video_id, request_body):
+        request = self.connection.playlistItems().insert(
+            part="snippet",
+            body=request_body,
+            fields=constants.YOUTUBE_PLAYLIST_ITEM_INSERT_FIELDS
+        )
 
-            should_stop_iterating_over_videos = False
-            retried_once = False
-            while True:
-                response = None
-                try:
-                    time.sleep(constants.SLEEP_BETWEEN_PLAYLIST_PUSHES)
-                    response = request.execute()
-                    break
-                except HttpError as httperr:
-                    if not retried_once and httperr.resp.status in [400, 500, 503]:
-                        # in case of a connection error, retry
-                        retried_once = True
-                        continue
-                    logging.warning(
-                        "An error has occurred while pushing video ID '%s' to YouTube playlist '%s'" % (
-                            video_id,
-                            playlist_id
-                        )
+        attempt = 1
+        while True:
+            response = None
+            try:
+                self.rate_limiter.acquire()
+                response = request.execute()
+                self.rate_limiter.on_success()
+                return response
+            except HttpError as httperr:
+                self.rate_limiter.on_error(RateLimiter.parse_retry_after(httperr.resp.get('retry-after')))
+                if httperr.resp.status in constants.RETRYABLE_PUSH_HTTP_STATUSES and attempt < constants.MAX_PUSH_ATTEMPTS:
+                    # in case of a connection error or throttling, retry once the rate limiter allows it
+                    attempt += 1
+                    continue
+                logging.warning(
+                    "An error has occurred while pushing video ID '%s' to YouTube playlist '%s'" % (
+                        video_id,
+                        playlist_id
                     )
-                    logging.debug(
-                        "An error has occurred while pushing video ID '%s' to YouTube playlist '%s': %s" % (
-                            video_id,
-                            playlist_id,
-                            str(httperr)
-                        )
+                )
+                logging.debug(
+                    "An error has occurred while pushing video ID '%s' to YouTube playlist '%s': %s" % (
+                        video_id,
+                        playlist_id,
+                        str(httperr)
                     )
-                    logging.debug("Request was: %s" % request_body)
-                    logging.debug("Response was: %s" % response)
-                    should_stop_iterating_over_videos = True
-                    break
-
-            if should_stop_iterating_over_videos:
-                break
+                )
+                logging.debug("Request was: %s" % request_body)
+                logging.debug("Response was: %s" % response)
+                return None
+
+    def _update_playlist_video_ids(self, playlist_video_ids, video_id, response):
+        video_position = response.get('snippet', {}).get('position')
+        if video_position is None:
+            playlist_video_ids.append(video_id)
+        else:
+            playlist_video_ids.insert(video_position, video_id)
 
     def get_missing_videos_in_playlist(self, playlist_details, all_videos):
         playlist_id = playlist_details[constants.ORIGIN_YOUTUBE]
         playlist_items = self._get_playlist_items(playlist_id)
+        playlist_video_ids = set(self._get_video_ids_from_youtube_playlist(playlist_items))
+        playlist_video_titles = set(self._get_video_titles_from_youtube_playlist(playlist_items))
 
-        all_missing_videos = []
-
+        # missing videos are yielded as soon as they're found instead of being collected first
         for video_data in all_videos:
-            video_id = video_data[constants.YOUTUBE_VIDEO_ID_DATA_KEY]
-            is_video_missing = True
-            for video_details in playlist_items:
-                if video_details['contentDetails']['videoId'] == video_id:
-                    is_video_missing = False
-                    break
-
-            if is_video_missing:
-                all_missing_videos.append(video_data)
-
-        actual_missing_video_ids = self._find_actually_missing_videos(all_missing_videos, playlist_items)
+            if video_data[constants.YOUTUBE_VIDEO_ID_DATA_KEY] in playlist_video_ids:
+                continue
 
-        return actual_missing_video_ids
+            if self._is_video_actually_missing(video_data, playlist_video_titles):
+                yield video_data
 
     def _get_playlist_items(self, playlist_id):
-        desired_parts = 'snippet,contentDetails'
-        max_results = 50
+        playlist_items = []
 
-        partial_youtube_playlist = self.connection.playlistItems().list(
-            part=desired_parts,
-            playlistId=playlist_id,
-            maxResults=max_results
-        ).execute()
+        for page in self._get_playlist_items_pages(playlist_id):
+            playlist_items.extend(page['items'])
 
-        playlist_items = partial_youtube_playlist['items']
-
-        next_page_token = partial_youtube_playlist.get('nextPageToken')
-        while ('nextPageToken' in partial_youtube_playlist):
-            next_page = self.connection.playlistItems().list(
-                part=desired_parts,
-                playlistId=playlist_id,
-                maxResults=max_results,
-                pageToken=next_page_token
-            ).execute()
-            playlist_items.extend(next_page['items'])
+        return playlist_items
 
-            if 'nextPageToken' not in next_page:
-                partial_youtube_playlist.pop('nextPageToken', None)
-            else:
-                next_page_token = next_page['nextPageToken']
+    def _get_playlist_items_pages(self, playlist_id):
+        page_token = None
+        while True:
+            page = self._get_playlist_items_page(playlist_id, page_token)
+            yield page
 
-        return playlist_items
+            page_token = page.get('nextPageToken')
+            if page_token is None:
+                return
 
-    def _find_actually_missing_videos(self, all_missing_videos, playlist_items):
-        playlist_video_titles = self._get_video_titles_from_youtube_playlist(playlist_items)
+    def _get_playlist_items_page(self, playlist_id, page_token):
+        request = self.connection.playlistItems().list(
+            part='snippet,contentDetails',
+            playlistId=playlist_id,
+            maxResults=constants.YOUTUBE_MAX_RESULTS_PER_PAGE,
+            pageToken=page_token,
+            fields=constants.YOUTUBE_PLAYLIST_ITEMS_FIELDS
+        )
 
-        actually_missing_videos = []
+        # a page that was already fetched is only sent again by YouTube if it has changed since then
+        cache_key = (playlist_id, page_token, constants.YOUTUBE_PLAYLIST_ITEMS_FIELDS)
+        cached_page = self.playlist_items_page_cache.get(cache_key)
+        if cached_page is not None:
+            request.headers['If-None-Match'] = cached_page['etag']
 
-        for video_data in all_missing_videos:
-            search_results = video_data[constants.SEARCH_RESULTS_DATA_KEY]
-            # a video without search_results is a tied video
-            # since they're manually entered by the user no search results will be accurate
-            if search_results is not None:
-                search_results_video_titles = self._get_video_titles_from_videos_search_result(search_results)
+        try:
+            page = request.execute()
+        except HttpError as httperr:
+            if cached_page is None or httperr.resp.status != 304:
+                raise
+            return cached_page
 
-                title_found_in_search_results = False
-                for playlist_video_title in playlist_video_titles:
-                    if playlist_video_title in search_results_video_titles:
-                        title_found_in_search_results = True
-                        break
+        self.playlist_items_page_cache.put(cache_key, page)
+        return page
 
-            if search_results is None or not title_found_in_search_results:
-                actually_missing_videos.append(video_data)
+    def _is_video_actually_missing(self, video_data, playlist_video_titles):
+        search_results = video_data[constants.SEARCH_RESULTS_DATA_KEY]
+        # a video without search_results is a tied video
+        # since they're manually entered by the user no search results will be accurate
+        if search_results is None:
+            return True
 
-        return actually_missing_videos
+        search_results_video_titles = self._get_video_titles_from_videos_search_result(search_results)
+        return playlist_video_titles.isdisjoint(search_results_video_titles)
 
     def _get_video_titles_from_videos_search_result(self, videos_result):
         video_titles = []
@@ -317,6 +451,14 @@ class YouTube(BaseAPI):
 
         return video_titles
 
+    def _get_video_ids_from_youtube_playlist(self, playlist_items):
+        video_ids = []
+
+        for video_data in playlist_items:
+            video_ids.append(video_data['contentDetails']['videoId'])
+
+        return video_ids
+
     def _get_video_titles_from_youtube_playlist(self, playlist_items):
         video_titles = []
 
@@ -325,6 +467,43 @@ class YouTube(BaseAPI):
 
         return video_titles
 
+    def get_playlist_etags(self, playlist_ids):
+        unique_playlist_ids = list(dict.fromkeys(playlist_ids))
+        etags = {}
+
+        # the etag of a playlist changes along with its item count, up to 50 playlists are listed per request
+        for first_index in range(0, len(unique_playlist_ids), constants.YOUTUBE_MAX_RESULTS_PER_PAGE):
+            batch_playlist_ids = unique_playlist_ids[first_index:first_index + constants.YOUTUBE_MAX_RESULTS_PER_PAGE]
+            response = self.connection.playlists().list(
+                part='contentDetails',
+                id=','.join(batch_playlist_ids),
+                maxResults=constants.YOUTUBE_MAX_RESULTS_PER_PAGE,
+                fields=constants.YOUTUBE_PLAYLISTS_ETAG_FIELDS
+            ).execute()
+            for playlist in response['items']:
+                etags[playlist['id']] = playlist['etag']
+
+        return etags
+
+    def get_playlist_items_etags(self, playlist_ids):
+        etags = {}
+
+        # unlike the etag of a playlist, the etags of the pages of its items change along with any of its items,
+        # the pages are fetched conditionally, so the synchronization that follows reuses them
+        for playlist_id in dict.fromkeys(playlist_ids):
+            page_etags = []
+            try:
+                for page in self._get_playlist_items_pages(playlist_id):
+                    page_etags.append(page['etag'])
+            except HttpError as httperr:
+                if httperr.resp.status != 404:
+                    raise
+                continue
+
+            etags[playlist_id] = hashlib.sha1(','.join(page_etags).encode('utf-8')).hexdigest()
+
+        return etags
+
     def parse_playlist(self, playlist_details):
         playlist_id = playlist_details[constants.ORIGIN_YOUTUBE]
         playlist_items = self._get_playlist_items(playlist_id)
@@ -341,36 +520,63 @@ class YouTube(BaseAPI):
         return playlist
 
     def get_relevant_spotify_tracks(self, all_tracks):
-        relevant_tracks = []
-
-        for track in all_tracks:
-            track_query = track[constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY]
-            origin_video_id = track[constants.YOUTUBE_VIDEO_ID_DATA_KEY]
-
-            if track_query is None:
-                # a track without a YouTube search query is a tied track
-                # since they're manually entered by the user no search results will be accurate
-                relevant_tracks.append(track)
-                continue
+        # the verifications run simultaneously while the tracks keep coming, their results keep the order of the tracks
+        verifications = Pipeline.ordered_map(
+            lambda track: (track, self._run_search(self._is_track_verified, track)),
+            all_tracks,
+            self.search_workers,
+            self.search_workers * constants.PIPELINE_MAX_PENDING_RESULTS_PER_WORKER
+        )
 
-            video_results = CustomSearch(
-                track_query,
-                VideoSortOrder.relevance,
-                constants.YOUTUBE_SEARCH_LIMIT
-            ).result()['result']
-
-            origin_video_found = False
-            for video_data in video_results:
-                video_id = video_data['id']
-                if video_id == origin_video_id:
-                    relevant_tracks.append(track)
-                    origin_video_found = True
-                    break
-
-            if not origin_video_found:
+        for track, is_relevant in verifications:
+            if is_relevant:
+                yield track
+            else:
                 logging.warning("Could not find a relevant track on YouTube for: %s, song cannot be synchronized" % (
                         track[constants.YOUTUBE_VIDEO_TITLE_DATA_KEY]
                     )
                 )
 
-        return relevant_tracks
+    def _is_track_verified(self, track):
+        if track[constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY] is None:
+            # a track without a YouTube search query is a tied track
+            # since they're manually entered by the user no search results will be accurate
+            return True
+
+        return self._is_spotify_track_relevant(track)
+
+    def _is_spotify_track_relevant(self, track):
+        track_query = track[constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY]
+        origin_video_id = track[constants.YOUTUBE_VIDEO_ID_DATA_KEY]
+        track_id = track[constants.SPOTIFY_TRACK_ID_DATA_KEY]
+
+        match_details = self._get_cached_match_details_to_verify(origin_video_id, track_id)
+        if match_details is not None and match_details[constants.MATCH_VERIFIED_DATA_KEY] is not None:
+            logging.debug("Using cached verification of track '%s' to video ID '%s'" % (track_query, origin_video_id))
+            return match_details[constants.MATCH_VERIFIED_DATA_KEY]
+
+        video_results = CustomSearch(
+            track_query,
+            VideoSortOrder.relevance,
+            constants.YOUTUBE_SEARCH_LIMIT
+        ).result()['result']
+
+        origin_video_found = False
+        for video_data in video_results:
+            if video_data['id'] == origin_video_id:
+                origin_video_found = True
+                break
+
+        if match_details is not None:
+            match_details[constants.MATCH_VERIFIED_DATA_KEY] = origin_video_found
+            self.match_cache.update_details(constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK, origin_video_id, track_id,
+                                            match_details)
+
+        return origin_video_found
+
+    def _get_cached_match_details_to_verify(self, video_id, track_id):
+        cached_match = self.match_cache.get(constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK, video_id)
+        if cached_match is None or cached_match[0] != track_id:
+            return None
+
+        return cached_match[1]
@@ -1,8 +1,17 @@
+import logging
 from youspotube.api.spotify import Spotify
 from youspotube.api.youtube import YouTube
 from youspotube.configuration.param_validator import ParameterValidator
 import youspotube.constants as constants
+from youspotube.exceptions import ConfigurationError
 from youspotube.configuration.param_collector import CfgFileParameterCollector
+from youspotube.util.health_check import HealthCheck
+from youspotube.util.http import HttpUtil
+from youspotube.util.match_cache import MatchCache
+from youspotube.util.push_outbox import PushOutbox
+from youspotube.util.rate_limiter import RateLimiter
+from youspotube.util.sync_state import SyncState
+from youspotube.util.tools import Tools
 
 
 class Configuration:
@@ -14,7 +23,14 @@ class Configuration:
             constants.SPOTIFY_CLIENT_ID_PARAMETER: '',
             constants.SPOTIFY_CLIENT_SECRET_PARAMETER: '',
             constants.PLAYLISTS_PARAMETER: {},
-            constants.TIED_SONGS_PARAMETER: {}
+            constants.TIED_SONGS_PARAMETER: {},
+            constants.MATCH_CACHE_TTL_HOURS_PARAMETER: constants.MATCH_CACHE_DEFAULT_TTL_HOURS,
+            constants.MATCH_CACHE_MAX_ENTRIES_PARAMETER: constants.MATCH_CACHE_DEFAULT_MAX_ENTRIES,
+            constants.SPOTIFY_PUSHES_PER_MINUTE_PARAMETER: constants.SPOTIFY_DEFAULT_PUSHES_PER_MINUTE,
+            constants.YOUTUBE_PUSHES_PER_MINUTE_PARAMETER: constants.YOUTUBE_DEFAULT_PUSHES_PER_MINUTE,
+            constants.SEARCH_WORKERS_PARAMETER: constants.DEFAULT_SEARCH_WORKERS,
+            constants.PLAYLIST_WORKERS_PARAMETER: constants.DEFAULT_PLAYLIST_WORKERS,
+            constants.POLL_INTERVAL_SECONDS_PARAMETER: constants.DEFAULT_POLL_INTERVAL_SECONDS
         }
 
     def collect_parameters(self):
@@ -25,17 +41,79 @@ class Configuration:
         param_validator = ParameterValidator(self.params)
         param_validator.check_params()
 
+    def init_match_cache(self, invalidated_ids=None):
+        self.match_cache = MatchCache(
+            Tools.get_filepath_relative_to_ysptb(constants.MATCH_CACHE_STORAGE_FILE),
+            self.params[constants.MATCH_CACHE_TTL_HOURS_PARAMETER] * 3600,
+            self.params[constants.MATCH_CACHE_MAX_ENTRIES_PARAMETER]
+        )
+
+        self.prune_match_cache()
+
+        if invalidated_ids is not None:
+            invalidated_matches_count = self.match_cache.invalidate(invalidated_ids)
+            logging.info("Invalidated %s matches in the match cache" % invalidated_matches_count)
+
+    def prune_match_cache(self):
+        expired_matches_count, evicted_matches_count = self.match_cache.prune()
+        logging.debug(
+            "Removed %s expired and %s excess matches from the match cache" % (
+                expired_matches_count,
+                evicted_matches_count
+            )
+        )
+
+    def init_sync_state(self, full_sync=False):
+        self.sync_state = SyncState(Tools.get_filepath_relative_to_ysptb(constants.SYNC_STATE_STORAGE_FILE))
+
+        if full_sync:
+            forgotten_playlists_count = self.sync_state.clear()
+            logging.info("Forgot the synchronized versions of %s playlists, all playlists will be synchronized" %
+                         forgotten_playlists_count)
+
+    def init_push_outbox(self):
+        self.push_outbox = PushOutbox(Tools.get_filepath_relative_to_ysptb(constants.PUSH_OUTBOX_STORAGE_FILE))
+
     def connect_apis(self):
         self.spotify_connection = Spotify(
             self.params[constants.SPOTIFY_CLIENT_ID_PARAMETER],
             self.params[constants.SPOTIFY_CLIENT_SECRET_PARAMETER],
-            self.params[constants.TIED_SONGS_PARAMETER]
-        )
-        self.youtube_connection = YouTube(
-            self.params[constants.YOUTUBE_CLIENT_ID_PARAMETER],
-            self.params[constants.YOUTUBE_CLIENT_SECRET_PARAMETER],
-            self.params[constants.TIED_SONGS_PARAMETER]
+            self.params[constants.TIED_SONGS_PARAMETER],
+            self.match_cache,
+            RateLimiter('Spotify', self.params[constants.SPOTIFY_PUSHES_PER_MINUTE_PARAMETER]),
+            self.params[constants.SEARCH_WORKERS_PARAMETER]
         )
+        try:
+            self.youtube_connection = YouTube(
+                self.params[constants.YOUTUBE_CLIENT_ID_PARAMETER],
+                self.params[constants.YOUTUBE_CLIENT_SECRET_PARAMETER],
+                self.params[constants.TIED_SONGS_PARAMETER],
+                self.match_cache,
+                RateLimiter('YouTube', self.params[constants.YOUTUBE_PUSHES_PER_MINUTE_PARAMETER]),
+                self.params[constants.SEARCH_WORKERS_PARAMETER]
+            )
+        except ConfigurationError:
+            self.spotify_connection.disconnect()
+            raise
+
+    def start_credential_refreshers(self):
+        self.spotify_connection.start_credential_refresher()
+        self.youtube_connection.start_credential_refresher()
+
+    def disconnect_apis(self):
+        # the credentials are no longer refreshed in the background once the APIs are not used anymore
+        self.spotify_connection.disconnect()
+        self.youtube_connection.disconnect()
+
+    def check_health(self):
+        playlists = self.params[constants.PLAYLISTS_PARAMETER]
+        health_check = HealthCheck(Tools.get_filepath_relative_to_ysptb(constants.HEALTH_CHECK_STORAGE_FILE))
+        health_check.run({
+            constants.SPOTIFY_API_URL: lambda: HttpUtil.check_connectivity(constants.SPOTIFY_API_URL),
+            constants.YOUTUBE_API_URL: lambda: HttpUtil.check_connectivity(constants.YOUTUBE_API_URL),
+            'Spotify API': lambda: self.spotify_connection.test_connection(playlists),
+            'YouTube API': lambda: self.youtube_connection.test_connection(playlists)
+        })
 
     def get_params(self):
         return self.params
@@ -45,3 +123,9 @@ class Configuration:
 
     def get_youtube_connection(self):
         return self.youtube_connection
+
+    def get_sync_state(self):
+        return self.sync_state
+
+    def get_push_outbox(self):
+        return self.push_outbox
@@ -14,6 +14,9 @@ class CfgFileParameterCollector:
 
     def _validate_cfg(self):
         for param_name in self.params:
+            if param_name not in self.parsed_cfg_file and param_name in constants.OPTIONAL_PARAMETERS:
+                continue
+
             if param_name not in self.parsed_cfg_file:
                 raise ConfigurationError("Required parameter '%s' is missing in the configuration file" % param_name)
 
@@ -34,4 +37,7 @@ class CfgFileParameterCollector:
 
     def _copy_cfg_values(self):
         for param_name in self.params:
+            if param_name not in self.parsed_cfg_file:
+                # an optional parameter that is missing keeps its default value
+                continue
             self.params[param_name] = self.parsed_cfg_file[param_name]
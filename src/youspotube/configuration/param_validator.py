@@ -63,8 +63,67 @@ class ParameterValidator:
 
     def check_playlists(self, playlists):
         self.check_song_playlist(playlists, 'playlist')
+        for playlist_name in playlists:
+            self.check_playlist_poll_interval_seconds(playlists[playlist_name], playlist_name)
+
+    def check_playlist_poll_interval_seconds(self, playlist_details, playlist_name):
+        if constants.POLL_INTERVAL_SECONDS_PARAMETER not in playlist_details:
+            return
+
+        poll_interval_seconds = playlist_details[constants.POLL_INTERVAL_SECONDS_PARAMETER]
+        if type(poll_interval_seconds) is not int or poll_interval_seconds <= 0:
+            raise ConfigurationError(
+                "Field '%s' of playlist '%s' should be a positive integer in the configuration file" % (
+                    constants.POLL_INTERVAL_SECONDS_PARAMETER,
+                    playlist_name
+                )
+            )
 
     def check_tied_songs(self, tied_songs):
         if not tied_songs:
             return
         self.check_song_playlist(tied_songs, 'tied song')
+        for origin in constants.ORIGINS:
+            self.check_tied_songs_unique_ids(tied_songs, origin)
+
+    def check_tied_songs_unique_ids(self, tied_songs, origin):
+        tie_names_by_song_id = {}
+        for tie_name in tied_songs:
+            song_id = tied_songs[tie_name][origin]
+            if song_id in tie_names_by_song_id:
+                raise ConfigurationError(
+                    "Tied songs '%s' and '%s' have the same value '%s' for the field '%s' in the configuration file" % (
+                        tie_names_by_song_id[song_id],
+                        tie_name,
+                        song_id,
+                        origin
+                    )
+                )
+            tie_names_by_song_id[song_id] = tie_name
+
+    def check_positive_integer(self, value, param_name):
+        if value <= 0:
+            raise ConfigurationError(
+                "Parameter '%s' should be a positive integer in the configuration file" % param_name
+            )
+
+    def check_match_cache_ttl_hours(self, ttl_hours):
+        self.check_positive_integer(ttl_hours, constants.MATCH_CACHE_TTL_HOURS_PARAMETER)
+
+    def check_match_cache_max_entries(self, max_entries):
+        self.check_positive_integer(max_entries, constants.MATCH_CACHE_MAX_ENTRIES_PARAMETER)
+
+    def check_spotify_pushes_per_minute(self, pushes_per_minute):
+        self.check_positive_integer(pushes_per_minute, constants.SPOTIFY_PUSHES_PER_MINUTE_PARAMETER)
+
+    def check_youtube_pushes_per_minute(self, pushes_per_minute):
+        self.check_positive_integer(pushes_per_minute, constants.YOUTUBE_PUSHES_PER_MINUTE_PARAMETER)
+
+    def check_search_workers(self, search_workers):
+        self.check_positive_integer(search_workers, constants.SEARCH_WORKERS_PARAMETER)
+
+    def check_playlist_workers(self, playlist_workers):
+        self.check_positive_integer(playlist_workers, constants.PLAYLIST_WORKERS_PARAMETER)
+
+    def check_poll_interval_seconds(self, poll_interval_seconds):
+        self.check_positive_integer(poll_interval_seconds, constants.POLL_INTERVAL_SECONDS_PARAMETER)
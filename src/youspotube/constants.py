@@ -8,6 +8,12 @@ LOG_FILE = "ysptb_%s.log"
 CHECK_PARAM_METHOD_PREFIX = 'check_'
 SYNC_FROM_METHOD_PREFIX = 'sync_from_'
 
+COMMAND_SYNC = 'sync'
+COMMAND_PLAN = 'plan'
+COMMAND_APPLY = 'apply'
+COMMAND_WATCH = 'watch'
+COMMANDS = [COMMAND_SYNC, COMMAND_PLAN, COMMAND_APPLY, COMMAND_WATCH]
+
 ORIGIN_YOUTUBE = 'youtube'
 ORIGIN_SPOTIFY = 'spotify'
 ORIGINS = [ORIGIN_YOUTUBE, ORIGIN_SPOTIFY]
@@ -20,8 +26,33 @@ SPOTIFY_CLIENT_ID_PARAMETER = 'spotify_client_id'
 SPOTIFY_CLIENT_SECRET_PARAMETER = 'spotify_client_secret'
 PLAYLISTS_PARAMETER = 'playlists'
 TIED_SONGS_PARAMETER = 'tied_songs'
+MATCH_CACHE_TTL_HOURS_PARAMETER = 'match_cache_ttl_hours'
+MATCH_CACHE_MAX_ENTRIES_PARAMETER = 'match_cache_max_entries'
+SPOTIFY_PUSHES_PER_MINUTE_PARAMETER = 'spotify_pushes_per_minute'
+YOUTUBE_PUSHES_PER_MINUTE_PARAMETER = 'youtube_pushes_per_minute'
+SEARCH_WORKERS_PARAMETER = 'search_workers'
+PLAYLIST_WORKERS_PARAMETER = 'playlist_workers'
+POLL_INTERVAL_SECONDS_PARAMETER = 'poll_interval_seconds'
 
 NO_DATA_EXCEPTION_PARAMETERS = [TIED_SONGS_PARAMETER]
+OPTIONAL_PARAMETERS = [
+    MATCH_CACHE_TTL_HOURS_PARAMETER,
+    MATCH_CACHE_MAX_ENTRIES_PARAMETER,
+    SPOTIFY_PUSHES_PER_MINUTE_PARAMETER,
+    YOUTUBE_PUSHES_PER_MINUTE_PARAMETER,
+    SEARCH_WORKERS_PARAMETER,
+    PLAYLIST_WORKERS_PARAMETER,
+    POLL_INTERVAL_SECONDS_PARAMETER
+]
+
+HEALTH_CHECK_STORAGE_FILE = '.ysptb_health'
+HEALTH_CHECK_CACHE_TTL_SECONDS = 60
+HEALTH_CHECK_DEADLINE_SECONDS = 30
+CONNECTIVITY_CHECK_TIMEOUT_SECONDS = 10
+YOUTUBE_REQUEST_TIMEOUT_SECONDS = 60
+
+CREDENTIALS_REFRESH_MARGIN_SECONDS = 5 * 60
+CREDENTIALS_REFRESH_RETRY_SECONDS = 30
 
 SPOTIFY_API_URL = 'https://api.spotify.com/v1/'
 SPOTIFY_CALLBACK_URL = 'http://localhost:4466'
@@ -30,10 +61,21 @@ SPOTIFY_TRACK_ID_DATA_KEY = 'track_id'
 SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY = 'track_title_artists'
 SPOTIFY_SEARCH_LIMIT = 1
 SPOTIFY_TOKEN_STORAGE_FILE = '.spotify_cache'
+SPOTIFY_PLAYLIST_ITEMS_FIELDS = 'total,items(track(name,id,duration_ms,artists(name)))'
+SPOTIFY_PLAYLIST_PAGE_SIZE = 100
+SPOTIFY_PLAYLIST_FETCH_WORKERS = 8
+SPOTIFY_PLAYLIST_ADD_ITEMS_LIMIT = 100
+SPOTIFY_USER_PLAYLISTS_PAGE_SIZE = 50
 
 YOUTUBE_API_URL = 'https://www.googleapis.com/youtube/v3/'
 YOUTUBE_TOKEN_STORAGE_FILE = '.youtube_cache'
 YOUTUBE_SCOPE = 'https://www.googleapis.com/auth/youtube'
+YOUTUBE_MAX_RESULTS_PER_PAGE = 50
+# fields= selectors of the YouTube Data API calls, each one lists only what is read from the responses
+YOUTUBE_PLAYLISTS_ID_FIELDS = 'items(id)'
+YOUTUBE_PLAYLISTS_ETAG_FIELDS = 'items(id,etag)'
+YOUTUBE_PLAYLIST_ITEMS_FIELDS = 'etag,nextPageToken,items(snippet(title),contentDetails(videoId))'
+YOUTUBE_PLAYLIST_ITEM_INSERT_FIELDS = 'snippet(position)'
 MAX_YOUTUBE_SPOTIFY_DURATION_DELTA_SECONDS = 15
 YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY = 'spotify_youtube_length_difference'
 YOUTUBE_VIDEO_ID_DATA_KEY = 'video_id'
@@ -43,7 +85,38 @@ YOUTUBE_VIDEO_TITLE_DATA_KEY = 'video_title'
 INITIAL_SEARCH_LIMIT = 2
 EXTENDED_SEARCH_LIMIT = 7
 YOUTUBE_SEARCH_LIMIT = EXTENDED_SEARCH_LIMIT
-SLEEP_BETWEEN_PLAYLIST_PUSHES = 3
+LOOKUP_OUTCOME_TIED = 'tied'
+LOOKUP_OUTCOME_CACHED = 'cached'
+LOOKUP_OUTCOME_INITIAL_SEARCH = 'found in the top %s results' % INITIAL_SEARCH_LIMIT
+LOOKUP_OUTCOME_EXTENDED_SEARCH = 'found after extending the search to the top %s results' % EXTENDED_SEARCH_LIMIT
+LOOKUP_OUTCOME_NOT_FOUND = 'not found'
+DEFAULT_SEARCH_WORKERS = 4
+PIPELINE_MAX_PENDING_RESULTS_PER_WORKER = 4
+DEFAULT_PLAYLIST_WORKERS = 2
+DEFAULT_POLL_INTERVAL_SECONDS = 300
+
+SPOTIFY_DEFAULT_PUSHES_PER_MINUTE = 60
+YOUTUBE_DEFAULT_PUSHES_PER_MINUTE = 30
+RATE_LIMITER_BURST = 3
+RATE_LIMITER_BACKOFF_FACTOR = 0.5
+RATE_LIMITER_RECOVERY_STEP = 0.1
+RATE_LIMITER_MIN_RATE_RATIO = 1 / 32
+RETRYABLE_PUSH_HTTP_STATUSES = [400, 429, 500, 503]
+MAX_PUSH_ATTEMPTS = 3
+
+MATCH_CACHE_STORAGE_FILE = '.ysptb_matches.db'
+SYNC_STATE_STORAGE_FILE = '.ysptb_sync_state.db'
+PUSH_OUTBOX_STORAGE_FILE = '.ysptb_outbox.db'
+SYNC_PLAN_STORAGE_FILE = 'ysptb_plan.json'
+SYNC_PLAN_ORIGIN_KEY = 'origin'
+SYNC_PLAN_PLAYLISTS_KEY = 'playlists'
+SYNC_PLAN_VERSIONS_KEY = 'versions'
+SYNC_PLAN_SONGS_KEY = 'songs'
+MATCH_CACHE_DEFAULT_TTL_HOURS = 24 * 30
+MATCH_CACHE_DEFAULT_MAX_ENTRIES = 100000
+MATCH_CACHE_KIND_TRACK_TO_VIDEO = 'spotify_track_to_youtube_video'
+MATCH_CACHE_KIND_VIDEO_TO_TRACK = 'youtube_video_to_spotify_track'
+MATCH_VERIFIED_DATA_KEY = 'verified'
 
 CONFIGURATION_ERROR_TYPE = 'Configuration'
 EXECUTION_ERROR_TYPE = 'Execution'
@@ -1,6 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
 import logging
+import time
 import youspotube.constants as constants
 from youspotube.exceptions import ExecutionError
+from youspotube.util.pipeline import CountedStream, Pipeline
+from youspotube.util.sync_plan import SyncPlan
 
 
 class Execution:
@@ -11,10 +17,310 @@ class Execution:
         self.tied_songs = self.params[constants.TIED_SONGS_PARAMETER]
         self.spotify = self.config.get_spotify_connection()
         self.youtube = self.config.get_youtube_connection()
+        self.sync_state = self.config.get_sync_state()
+        self.push_outbox = self.config.get_push_outbox()
+        # changing the tied songs can change the outcome of a synchronization, so they are a part of each playlist's version
+        self.tied_songs_version = hashlib.sha1(json.dumps(self.tied_songs, sort_keys=True).encode('utf-8')).hexdigest()
+        # when planning, the songs that are missing in the target playlists are added to the plan instead of pushed
+        self.sync_plan = None
+        self.push_outcome = 'pushed'
 
     def execute(self):
         logging.info("Synchronizing playlists: %s" % self.get_sync_direction())
+        self.resume_pending_pushes(self.playlists)
         self.sync_playlists()
+        self.log_lookup_counts()
+
+    def plan(self, plan_file_path):
+        logging.info("Planning the synchronization of playlists: %s" % self.get_sync_direction())
+        self.sync_plan = SyncPlan(self.params[constants.ORIGIN_PARAMETER])
+        self.push_outcome = 'planned to push'
+        self.sync_playlists()
+
+        try:
+            self.sync_plan.save(plan_file_path)
+        except OSError as e:
+            raise ExecutionError("Could not save the synchronization plan to '%s': %s" % (plan_file_path, str(e)))
+
+        logging.info("Saved the synchronization plan to '%s'" % plan_file_path)
+        self.log_lookup_counts()
+
+    def apply(self, plan_file_path):
+        try:
+            sync_plan = SyncPlan.load(plan_file_path)
+        except (OSError, ValueError, KeyError) as e:
+            raise ExecutionError("Could not read the synchronization plan '%s': %s" % (plan_file_path, str(e)))
+
+        origin = self.params[constants.ORIGIN_PARAMETER]
+        if sync_plan.origin != origin:
+            raise ExecutionError(
+                "Synchronization plan '%s' was made with origin '%s', but the configured origin is '%s'" % (
+                    plan_file_path,
+                    sync_plan.origin,
+                    origin
+                )
+            )
+
+        logging.info("Applying synchronization plan '%s': %s" % (plan_file_path, self.get_sync_direction()))
+
+        planned_playlists = sync_plan.get_playlists_details()
+        self.resume_pending_pushes(planned_playlists)
+        playlists_versions = self.get_playlists_versions(planned_playlists)
+        playlists_summary = {}
+        playlist_names_to_apply = []
+
+        for playlist_name in planned_playlists:
+            # the planned positions and songs are only valid for the versions of the playlists the plan was made with
+            planned_versions = sync_plan.get_versions(playlist_name)
+            if planned_versions is None or None in planned_versions.values() or \
+                    planned_versions != playlists_versions.get(playlist_name):
+                logging.warning(
+                    "Skipping playlist '%s' of the synchronization plan, it may have changed since the plan was made" %
+                    playlist_name
+                )
+                playlists_summary[playlist_name] = "skipped, it may have changed since the synchronization plan was made"
+                continue
+
+            playlist_names_to_apply.append(playlist_name)
+
+        applied_playlist_names = self.run_playlists(
+            playlist_names_to_apply,
+            planned_playlists,
+            lambda playlist_name: self.apply_playlist(sync_plan, playlist_name, planned_playlists[playlist_name]),
+            playlists_summary
+        )
+
+        self.save_playlists_versions(applied_playlist_names, playlists_versions, planned_playlists)
+        self.log_playlists_summary(playlists_summary, planned_playlists)
+
+    def apply_playlist(self, sync_plan, playlist_name, playlist_details):
+        planned_songs = sync_plan.get_songs(playlist_name)
+        self.run_with_outbox(
+            playlist_details,
+            sync_plan.get_versions(playlist_name),
+            lambda playlist_details: self.push_songs(playlist_details, self.get_songs_to_push(planned_songs))
+        )
+
+        return "pushed %s planned songs" % len(planned_songs)
+
+    def get_songs_to_push(self, song_ids_positions):
+        song_id_data_key = self.get_target_song_id_data_key()
+        for song_id, track_position in song_ids_positions:
+            yield {
+                song_id_data_key: song_id,
+                constants.TRACK_POSITION_DATA_KEY: track_position
+            }
+
+    def get_target_song_id_data_key(self):
+        if self.params[constants.ORIGIN_PARAMETER] == constants.ORIGIN_SPOTIFY:
+            return constants.YOUTUBE_VIDEO_ID_DATA_KEY
+
+        return constants.SPOTIFY_TRACK_ID_DATA_KEY
+
+    def get_target_api(self):
+        if self.params[constants.ORIGIN_PARAMETER] == constants.ORIGIN_SPOTIFY:
+            return self.youtube
+
+        return self.spotify
+
+    def get_outbox_key(self, playlist_details):
+        return (
+            self.params[constants.ORIGIN_PARAMETER],
+            playlist_details[constants.ORIGIN_SPOTIFY],
+            playlist_details[constants.ORIGIN_YOUTUBE]
+        )
+
+    def run_with_outbox(self, playlist_details, playlist_versions, sync_function):
+        outbox_key = self.get_outbox_key(playlist_details)
+        self.push_outbox.start_run(*outbox_key, playlist_versions)
+        result = sync_function(playlist_details)
+        # a run that fails keeps its pending pushes, so the next one resumes them
+        self.push_outbox.finish_run(*outbox_key)
+        return result
+
+    def push_songs(self, playlist_details, songs, are_pending=False):
+        outbox_key = self.get_outbox_key(playlist_details)
+        if self.params[constants.ORIGIN_PARAMETER] == constants.ORIGIN_SPOTIFY:
+            add_songs_to_playlist = self.youtube.add_videos_to_playlist
+        else:
+            add_songs_to_playlist = self.spotify.add_tracks_to_playlist
+
+        # the songs are diffed ahead of the pushes and all of them are recorded in the outbox, so a run that is
+        # interrupted while pushing is resumed without looking up and diffing the songs again; like the lookups, the
+        # diff only runs a bounded number of songs ahead, so slow pushes still hold the searches back
+        if not are_pending:
+            songs = Pipeline.run_ahead(
+                self.record_pending_pushes(outbox_key, songs),
+                self.params[constants.SEARCH_WORKERS_PARAMETER] * constants.PIPELINE_MAX_PENDING_RESULTS_PER_WORKER
+            )
+        add_songs_to_playlist(
+            playlist_details,
+            songs,
+            lambda pushed_count: self.push_outbox.mark_done(*outbox_key, pushed_count)
+        )
+
+    def record_pending_pushes(self, outbox_key, songs):
+        song_id_data_key = self.get_target_song_id_data_key()
+        for song in songs:
+            self.push_outbox.append(*outbox_key, song[song_id_data_key], song[constants.TRACK_POSITION_DATA_KEY])
+            yield song
+
+        self.push_outbox.set_diffed(*outbox_key)
+
+    def resume_pending_pushes(self, playlists):
+        playlists_runs = {}
+        for playlist_name in playlists:
+            playlist_run = self.push_outbox.get_run(*self.get_outbox_key(playlists[playlist_name]))
+            if playlist_run is not None:
+                playlists_runs[playlist_name] = playlist_run
+
+        if not playlists_runs:
+            return
+
+        interrupted_playlists = {playlist_name: playlists[playlist_name] for playlist_name in playlists_runs}
+        source_playlists_versions = self.get_playlists_versions(
+            interrupted_playlists,
+            [self.params[constants.ORIGIN_PARAMETER]]
+        )
+        resumed_playlists_versions = {}
+
+        for playlist_name in interrupted_playlists:
+            run_versions, is_diffed = playlists_runs[playlist_name]
+            playlist_details = interrupted_playlists[playlist_name]
+            # the pending pushes were diffed from a source playlist that must not have changed since then
+            if not self.is_run_current(run_versions, source_playlists_versions.get(playlist_name)):
+                dropped_pushes_count = self.push_outbox.finish_run(*self.get_outbox_key(playlist_details))
+                logging.info(
+                    "Dropped %s pushes of playlist '%s' that were not finished by the previous run, the playlist has "
+                    "changed since then" % (dropped_pushes_count, playlist_name)
+                )
+                continue
+
+            if self.resume_playlist_pushes(playlist_name, playlist_details) and is_diffed:
+                resumed_playlists_versions[playlist_name] = run_versions
+
+        # a playlist whose songs were all diffed and are now pushed is synchronized, so it is not diffed again
+        self.save_playlists_versions(list(resumed_playlists_versions), resumed_playlists_versions, interrupted_playlists)
+
+    def is_run_current(self, run_versions, source_versions):
+        if run_versions is None or source_versions is None:
+            return False
+
+        for version_key in [self.params[constants.ORIGIN_PARAMETER], constants.TIED_SONGS_PARAMETER]:
+            if run_versions.get(version_key) is None or run_versions.get(version_key) != source_versions.get(version_key):
+                return False
+
+        return True
+
+    def resume_playlist_pushes(self, playlist_name, playlist_details):
+        outbox_key = self.get_outbox_key(playlist_details)
+        pending_pushes = self.push_outbox.get_pending(*outbox_key)
+
+        try:
+            if pending_pushes:
+                self.push_pending_songs(playlist_name, playlist_details, outbox_key, pending_pushes)
+        except Exception as e:
+            # the songs are diffed again while synchronizing the playlist, so they are not lost
+            dropped_pushes_count = self.push_outbox.finish_run(*outbox_key)
+            logging.warning(
+                "Could not resume the pushes of playlist '%s', dropped %s pending pushes: %s" % (
+                    playlist_name,
+                    dropped_pushes_count,
+                    str(e)
+                )
+            )
+            return False
+
+        self.push_outbox.finish_run(*outbox_key)
+        return True
+
+    def push_pending_songs(self, playlist_name, playlist_details, outbox_key, pending_pushes):
+        # the push that was in flight when the previous run was interrupted may have been done without being marked
+        # as done, so the songs that are already in the target playlist are not pushed again
+        target_playlist = self.get_target_api().parse_playlist(playlist_details)
+        done_push_ids = []
+        songs_to_push = []
+        for push_id, song_id, track_position in pending_pushes:
+            if song_id in target_playlist:
+                done_push_ids.append(push_id)
+            else:
+                songs_to_push.append((song_id, track_position))
+
+        self.push_outbox.remove(done_push_ids)
+        logging.info("Resuming %s pushes of playlist '%s' that were not finished by the previous run" % (
+                len(songs_to_push),
+                playlist_name
+            )
+        )
+        self.push_songs(playlist_details, self.get_songs_to_push(songs_to_push), True)
+
+    def get_planned_songs(self, songs, song_id_data_key):
+        planned_songs = []
+        for song in songs:
+            planned_songs.append([song[song_id_data_key], song[constants.TRACK_POSITION_DATA_KEY]])
+
+        return planned_songs
+
+    def log_lookup_counts(self):
+        lookup_counts = self.youtube.get_lookup_counts()
+        if not lookup_counts:
+            return
+
+        logging.info("Spotify tracks looked up on YouTube: %s" % ', '.join(
+                "%s %s" % (lookup_counts[outcome], outcome) for outcome in lookup_counts
+            )
+        )
+
+    def watch(self):
+        logging.info("Watching playlists: %s" % self.get_sync_direction())
+        self.resume_pending_pushes(self.playlists)
+        # all playlists are synchronized right away, then each one of them is polled at its own interval
+        next_poll_times = dict.fromkeys(self.playlists, time.monotonic())
+
+        try:
+            while True:
+                self.poll_playlists(next_poll_times)
+                time.sleep(max(0, min(next_poll_times.values()) - time.monotonic()))
+        except KeyboardInterrupt:
+            logging.info("Stopped watching playlists")
+
+        self.log_lookup_counts()
+
+    def poll_playlists(self, next_poll_times):
+        poll_time = time.monotonic()
+        due_playlists = {}
+        for playlist_name in self.playlists:
+            if next_poll_times[playlist_name] <= poll_time:
+                due_playlists[playlist_name] = self.playlists[playlist_name]
+
+        if not due_playlists:
+            return
+
+        # the versions of the due playlists come with a few listings, only the playlists that have changed are synchronized
+        playlists_versions = self.get_playlists_versions(due_playlists)
+        changed_playlists = {}
+        for playlist_name in due_playlists:
+            if not self.is_playlist_unchanged(playlist_name, playlists_versions):
+                changed_playlists[playlist_name] = due_playlists[playlist_name]
+
+        if changed_playlists:
+            self.sync_playlists(changed_playlists, playlists_versions)
+            # the matches are kept by the match cache, songs that are not found are looked up again by the next poll
+            self.youtube.lookup_memo.clear()
+            self.spotify.lookup_memo.clear()
+            # a watch runs for as long as it is not stopped, so the match cache is kept in its limits after each sync
+            self.config.prune_match_cache()
+        else:
+            logging.debug("None of the polled playlists have changed since they were last synchronized")
+
+        for playlist_name in due_playlists:
+            next_poll_times[playlist_name] = time.monotonic() + self.get_poll_interval_seconds(playlist_name)
+
+    def get_poll_interval_seconds(self, playlist_name):
+        return self.playlists[playlist_name].get(
+            constants.POLL_INTERVAL_SECONDS_PARAMETER,
+            self.params[constants.POLL_INTERVAL_SECONDS_PARAMETER]
+        )
 
     def get_sync_direction(self):
         origin = self.params[constants.ORIGIN_PARAMETER]
@@ -25,57 +331,260 @@ class Execution:
         arrow = '-' * 10 + '> '
         return (' ' + arrow).join(arrow_sides)
 
-    def sync_playlists(self):
+    def sync_playlists(self, playlists=None, playlists_versions=None):
         origin = self.params[constants.ORIGIN_PARAMETER]
         sync_method = "%s%s" % (constants.SYNC_FROM_METHOD_PREFIX, origin)
         if not hasattr(self, sync_method):
             raise ExecutionError("Origin '%s', accepted by the configuration, is not recognized by the executor" % origin)
 
-        for playlist_name in self.playlists:
-            logging.info("Synchronizing playlist '%s' from the configuration file" % playlist_name)
+        if playlists is None:
+            playlists = self.playlists
 
-            try:
-                getattr(self, sync_method)(self.playlists[playlist_name])
-                logging.info("Finished synchronizing playlist '%s' from the configuration file" % playlist_name)
-            except Exception as e:
-                logging.warning(
-                    "An error has occurred while synchronizing the '%s' playlist: %s" % (
-                        playlist_name,
-                        str(e)
-                    )
+        if playlists_versions is None:
+            playlists_versions = self.get_playlists_versions(playlists)
+        playlists_summary = {}
+        playlist_names_to_sync = []
+
+        for playlist_name in playlists:
+            if self.is_playlist_unchanged(playlist_name, playlists_versions):
+                logging.info(
+                    "Skipping playlist '%s' from the configuration file, it has not changed since it was last synchronized" %
+                    playlist_name
                 )
+                playlists_summary[playlist_name] = "skipped, it has not changed since it was last synchronized"
+                continue
+
+            playlist_names_to_sync.append(playlist_name)
+
+        synced_playlist_names = self.run_playlists(
+            playlist_names_to_sync,
+            playlists,
+            lambda playlist_name: self.sync_playlist(playlist_name, sync_method, playlists_versions.get(playlist_name)),
+            playlists_summary
+        )
+
+        if self.sync_plan is None:
+            self.save_playlists_versions(synced_playlist_names, playlists_versions, playlists)
+        else:
+            for playlist_name in synced_playlist_names:
+                self.sync_plan.add_playlist(playlist_name, playlists[playlist_name],
+                                            playlists_versions.get(playlist_name))
+
+        self.log_playlists_summary(playlists_summary, playlists)
+
+    def run_playlists(self, playlist_names, playlists, sync_function, playlists_summary):
+        synced_playlist_names = []
+        playlists_groups = self.group_playlists_by_target(playlist_names, playlists)
+        sync_results = {}
+
+        # the groups are independent of each other, the pushes and searches of all of them share the limits per service
+        with ThreadPoolExecutor(max_workers=self.params[constants.PLAYLIST_WORKERS_PARAMETER]) as executor:
+            groups_sync_results = executor.map(
+                lambda playlists_group: [self.run_playlist(playlist_name, sync_function) for playlist_name in playlists_group],
+                playlists_groups
+            )
+            for playlists_group, group_sync_results in zip(playlists_groups, groups_sync_results):
+                sync_results.update(zip(playlists_group, group_sync_results))
+
+        for playlist_name in playlist_names:
+            is_synced, playlist_summary = sync_results[playlist_name]
+            playlists_summary[playlist_name] = playlist_summary
+            if is_synced:
+                synced_playlist_names.append(playlist_name)
+
+        return synced_playlist_names
+
+    def group_playlists_by_target(self, playlist_names, playlists):
+        # each synchronization diffs the target playlist as it was when it started and assumes that only it inserts into
+        # the playlist, so the playlists that push to the same target one are synchronized one after another
+        target_service = self.get_target_service()
+        playlists_groups = {}
+        for playlist_name in playlist_names:
+            target_playlist_id = playlists[playlist_name][target_service]
+            playlists_groups.setdefault(target_playlist_id, []).append(playlist_name)
+
+        return list(playlists_groups.values())
+
+    def run_playlist(self, playlist_name, sync_function):
+        logging.info("Synchronizing playlist '%s' from the configuration file" % playlist_name)
+
+        try:
+            playlist_summary = sync_function(playlist_name)
+        except Exception as e:
+            logging.warning(
+                "An error has occurred while synchronizing the '%s' playlist: %s" % (
+                    playlist_name,
+                    str(e)
+                )
+            )
+            return False, "failed, %s" % str(e)
+
+        logging.info("Finished synchronizing playlist '%s' from the configuration file" % playlist_name)
+        return True, playlist_summary
+
+    def sync_playlist(self, playlist_name, sync_method, playlist_versions):
+        playlist_details = self.playlists[playlist_name]
+        if self.sync_plan is None:
+            found_songs_count, songs_count, pushed_songs_count = self.run_with_outbox(
+                playlist_details,
+                playlist_versions,
+                getattr(self, sync_method)
+            )
+        else:
+            found_songs_count, songs_count, pushed_songs_count = getattr(self, sync_method)(playlist_details)
+        return "found %s/%s songs, %s %s" % (found_songs_count, songs_count, self.push_outcome, pushed_songs_count)
+
+    def log_playlists_summary(self, playlists_summary, playlists=None):
+        if playlists is None:
+            playlists = self.playlists
+
+        logging.info("Summary of the synchronized playlists:")
+        # the summary follows the order of the playlists regardless of when each one of them finished
+        for playlist_name in playlists:
+            logging.info("- '%s': %s" % (playlist_name, playlists_summary[playlist_name]))
+
+    def get_playlists_versions(self, playlists=None, services=None):
+        if playlists is None:
+            playlists = self.playlists
+        if services is None:
+            services = constants.ORIGINS
+
+        try:
+            services_versions = {}
+            for service in services:
+                services_versions[service] = self.get_service_playlists_versions(service, playlists)
+        except Exception as e:
+            logging.warning("Could not check which playlists have changed, all of them will be synchronized: %s" % str(e))
+            return {}
+
+        playlists_versions = {}
+        for playlist_name in playlists:
+            playlist_details = playlists[playlist_name]
+            playlist_versions = {constants.TIED_SONGS_PARAMETER: self.tied_songs_version}
+            for service in services:
+                playlist_versions[service] = services_versions[service].get(playlist_details[service])
+            playlists_versions[playlist_name] = playlist_versions
+
+        return playlists_versions
+
+    def get_service_playlists_versions(self, service, playlists):
+        playlist_ids = []
+        for playlist_name in playlists:
+            playlist_ids.append(playlists[playlist_name][service])
+
+        # the snapshot ID of a Spotify playlist changes with each one of its changes, the snapshot IDs of all playlists
+        # are found with a few listings instead of going through the songs of each playlist
+        if service == constants.ORIGIN_SPOTIFY:
+            return self.spotify.get_playlist_snapshot_ids(playlist_ids)
+
+        # the etag of a YouTube playlist only follows changes such as its item count, which is enough to notice the
+        # songs removed from a target playlist, but every change of a source playlist has to be noticed
+        if service == self.params[constants.ORIGIN_PARAMETER]:
+            return self.youtube.get_playlist_items_etags(playlist_ids)
+        return self.youtube.get_playlist_etags(playlist_ids)
+
+    def get_target_service(self):
+        if self.params[constants.ORIGIN_PARAMETER] == constants.ORIGIN_SPOTIFY:
+            return constants.ORIGIN_YOUTUBE
+
+        return constants.ORIGIN_SPOTIFY
+
+    def is_playlist_unchanged(self, playlist_name, playlists_versions):
+        playlist_versions = playlists_versions.get(playlist_name)
+        if playlist_versions is None or None in playlist_versions.values():
+            return False
+
+        playlist_details = self.playlists[playlist_name]
+        synced_playlist_versions = self.sync_state.get_versions(
+            self.params[constants.ORIGIN_PARAMETER],
+            playlist_details[constants.ORIGIN_SPOTIFY],
+            playlist_details[constants.ORIGIN_YOUTUBE]
+        )
+        return playlist_versions == synced_playlist_versions
+
+    def save_playlists_versions(self, synced_playlist_names, playlists_versions, playlists=None):
+        if not synced_playlist_names:
+            return
+
+        if playlists is None:
+            playlists = self.playlists
+
+        # the synchronization changes the target playlists, so their versions are taken again once it is done, while
+        # the source playlists keep the versions they were synchronized from, so songs added to them meanwhile are not missed
+        target_playlists_versions = self.get_playlists_versions(playlists, [self.get_target_service()])
+        for playlist_name in synced_playlist_names:
+            source_playlist_versions = playlists_versions.get(playlist_name)
+            target_playlist_versions = target_playlists_versions.get(playlist_name)
+            if source_playlist_versions is None or target_playlist_versions is None:
+                continue
+
+            playlist_versions = dict(source_playlist_versions)
+            playlist_versions.update(target_playlist_versions)
+            if None in playlist_versions.values():
+                continue
+
+            playlist_details = playlists[playlist_name]
+            self.sync_state.put_versions(
+                self.params[constants.ORIGIN_PARAMETER],
+                playlist_details[constants.ORIGIN_SPOTIFY],
+                playlist_details[constants.ORIGIN_YOUTUBE],
+                playlist_versions
+            )
 
     def sync_from_spotify(self, playlist_details):
         spotify_playlist = self.spotify.parse_playlist(playlist_details)
-        video_ids = self.youtube.spotify_playlist_to_video_ids(spotify_playlist)
+        # the videos are diffed and pushed as soon as their lookups are done, while the following tracks are looked up
+        video_ids = CountedStream(self.youtube.spotify_playlist_to_video_ids(spotify_playlist))
+        needed_video_ids = CountedStream(self.youtube.get_missing_videos_in_playlist(playlist_details, video_ids))
 
-        logging.info("Found %s/%s Spotify tracks on YouTube" % (len(video_ids), len(spotify_playlist)))
+        self.push_videos(playlist_details, needed_video_ids)
 
-        needed_video_ids = self.youtube.get_missing_videos_in_playlist(playlist_details, video_ids)
+        logging.info("Found %s/%s Spotify tracks on YouTube" % (video_ids.count, len(spotify_playlist)))
 
-        videos_to_push_count = len(needed_video_ids)
-        if not videos_to_push_count:
+        if not needed_video_ids.count:
             logging.info("Nothing to push to YouTube playlist")
-            return
+        else:
+            logging.info("%s %s videos to YouTube playlist that were not in it" % (
+                    self.push_outcome.capitalize(),
+                    needed_video_ids.count
+                )
+            )
 
-        logging.info("Pushing %s videos to YouTube playlist that are not in it" % videos_to_push_count)
+        return video_ids.count, len(spotify_playlist), needed_video_ids.count
 
-        self.youtube.add_videos_to_playlist(playlist_details, needed_video_ids)
+    def push_videos(self, playlist_details, videos):
+        if self.sync_plan is None:
+            self.push_songs(playlist_details, videos)
+            return
+
+        self.sync_plan.add_songs(playlist_details, self.get_planned_songs(videos, constants.YOUTUBE_VIDEO_ID_DATA_KEY))
 
     def sync_from_youtube(self, playlist_details):
         youtube_playlist = self.youtube.parse_playlist(playlist_details)
+        # the tracks are verified, diffed and pushed as soon as their lookups are done, while the following videos are
+        # looked up
         track_ids = self.spotify.youtube_playlist_to_track_ids(youtube_playlist)
-        relevant_track_ids = self.youtube.get_relevant_spotify_tracks(track_ids)
+        relevant_track_ids = CountedStream(self.youtube.get_relevant_spotify_tracks(track_ids))
+        needed_track_ids = CountedStream(self.spotify.get_missing_tracks_in_playlist(playlist_details, relevant_track_ids))
 
-        logging.info("Found %s/%s YouTube songs on Spotify" % (len(relevant_track_ids), len(youtube_playlist)))
+        self.push_tracks(playlist_details, needed_track_ids)
 
-        needed_track_ids = self.spotify.get_missing_tracks_in_playlist(playlist_details, relevant_track_ids)
+        logging.info("Found %s/%s YouTube songs on Spotify" % (relevant_track_ids.count, len(youtube_playlist)))
 
-        tracks_to_push_count = len(needed_track_ids)
-        if not tracks_to_push_count:
+        if not needed_track_ids.count:
             logging.info("Nothing to push to Spotify playlist")
-            return
+        else:
+            logging.info("%s %s tracks to Spotify playlist that were not in it" % (
+                    self.push_outcome.capitalize(),
+                    needed_track_ids.count
+                )
+            )
+
+        return relevant_track_ids.count, len(youtube_playlist), needed_track_ids.count
 
-        logging.info("Pushing %s tracks to Spotify playlist that are not in it" % tracks_to_push_count)
+    def push_tracks(self, playlist_details, tracks):
+        if self.sync_plan is None:
+            self.push_songs(playlist_details, tracks)
+            return
 
-        self.spotify.add_tracks_to_playlist(playlist_details, needed_track_ids)
+        self.sync_plan.add_songs(playlist_details, self.get_planned_songs(tracks, constants.SPOTIFY_TRACK_ID_DATA_KEY))
@@ -1,3 +1,4 @@
+import argparse
 from datetime import datetime
 import getpass
 import logging
@@ -7,30 +8,98 @@ import atexit
 from youspotube.configuration.configurator import Configuration
 from youspotube.execution.executor import Execution
 from youspotube.exceptions import ConfigurationError, ExecutionError
-from youspotube.util.http import HttpUtil
 import youspotube.constants as constants
 from youspotube.util.tools import Tools
 
 
 class Bootstrap:
-    def __init__(self):
+    def __init__(self, argv=None):
         try:
+            self.args = self.parse_arguments([] if argv is None else argv)
             self.configure_logging()
             config = Configuration()
-            HttpUtil.check_connectivity()
             config.collect_parameters()
-            config.connect_apis()
             config.validate_parameters()
+            config.init_match_cache(self.get_invalidated_ids())
+            config.init_sync_state(self.args.full_sync)
+            config.init_push_outbox()
+            config.connect_apis()
         except ConfigurationError as e:
             e.print_exception()
             sys.exit(e.get_exit_code())
 
-        executor = Execution(config)
         try:
-            executor.execute()
-        except ExecutionError as e:
+            config.check_health()
+            config.start_credential_refreshers()
+            executor = Execution(config)
+            if self.args.command == constants.COMMAND_PLAN:
+                executor.plan(self.get_plan_file_path())
+            elif self.args.command == constants.COMMAND_APPLY:
+                executor.apply(self.get_plan_file_path())
+            elif self.args.command == constants.COMMAND_WATCH:
+                executor.watch()
+            else:
+                executor.execute()
+        except (ConfigurationError, ExecutionError) as e:
             e.print_exception()
             sys.exit(e.get_exit_code())
+        finally:
+            # the credentials must not be refreshed in the background once the command is done, e.g. after watching
+            config.disconnect_apis()
+
+    def parse_arguments(self, argv):
+        parser = argparse.ArgumentParser(prog='ysptb', description='Keep Spotify and YouTube playlists in sync.')
+        parser.add_argument(
+            'command',
+            nargs='?',
+            choices=constants.COMMANDS,
+            default=constants.COMMAND_SYNC,
+            help='%s (default) looks up the songs and pushes the missing ones, %s only looks them up and saves what would '
+                 'be pushed to a plan file, %s pushes what a plan file lists without looking up the songs again, %s keeps '
+                 'running and synchronizes the playlists as soon as they change' % (
+                     constants.COMMAND_SYNC,
+                     constants.COMMAND_PLAN,
+                     constants.COMMAND_APPLY,
+                     constants.COMMAND_WATCH
+                 )
+        )
+        parser.add_argument(
+            '--plan-file',
+            metavar='PATH',
+            help='the plan file to save or apply (defaults to %s)' % constants.SYNC_PLAN_STORAGE_FILE
+        )
+        # each flag takes exactly one ID, so an ID list can never swallow the command that follows it
+        invalidate_cache_group = parser.add_mutually_exclusive_group()
+        invalidate_cache_group.add_argument(
+            '--invalidate-cache',
+            action='append',
+            metavar='ID',
+            help='drop the cached matches that involve the given Spotify track/YouTube video ID before synchronizing, '
+                 'can be given several times'
+        )
+        invalidate_cache_group.add_argument(
+            '--invalidate-whole-cache',
+            action='store_true',
+            help='drop all cached matches before synchronizing'
+        )
+        parser.add_argument(
+            '--full-sync',
+            action='store_true',
+            help='synchronize all playlists, even the ones that have not changed since they were last synchronized'
+        )
+        return parser.parse_args(argv)
+
+    def get_invalidated_ids(self):
+        if self.args.invalidate_whole_cache:
+            return []
+
+        return self.args.invalidate_cache
+
+    def get_plan_file_path(self):
+        if self.args.plan_file is None:
+            return Tools.get_filepath_relative_to_ysptb(constants.SYNC_PLAN_STORAGE_FILE)
+
+        return self.args.plan_file
 
     def configure_logging(self):
         stdout_handler = logging.StreamHandler(sys.stdout)
@@ -0,0 +1,63 @@
+import logging
+import threading
+import time
+import youspotube.constants as constants
+
+
+class CredentialRefresher:
+    def __init__(self, service_name, get_expires_at, refresh):
+        self.service_name = service_name
+        self.get_expires_at = get_expires_at
+        self.refresh = refresh
+        self.timer = None
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        self._schedule(self._get_refresh_delay())
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            if self.timer is not None:
+                self.timer.cancel()
+
+    def _get_refresh_delay(self):
+        expires_at = self.get_expires_at()
+        if expires_at is None:
+            return None
+
+        return max(0, expires_at - time.time() - constants.CREDENTIALS_REFRESH_MARGIN_SECONDS)
+
+    def _schedule(self, delay):
+        if delay is None:
+            logging.debug("%s credentials have no expiry, they will not be refreshed in the background" % self.service_name)
+            return
+
+        with self.lock:
+            if self.stopped:
+                return
+
+            # the timer thread must not keep the process alive once the synchronization is done
+            self.timer = threading.Timer(delay, self._refresh)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _refresh(self):
+        try:
+            self.refresh()
+            logging.debug("Refreshed %s credentials in the background" % self.service_name)
+            delay = self._get_refresh_delay()
+            if delay is not None:
+                # credentials that are short-lived compared to the margin must not be refreshed in a busy loop
+                delay = max(delay, constants.CREDENTIALS_REFRESH_RETRY_SECONDS)
+        except Exception as e:
+            logging.warning("Could not refresh %s credentials in the background, retrying in %s seconds: %s" % (
+                    self.service_name,
+                    constants.CREDENTIALS_REFRESH_RETRY_SECONDS,
+                    str(e)
+                )
+            )
+            delay = constants.CREDENTIALS_REFRESH_RETRY_SECONDS
+
+        self._schedule(delay)
@@ -0,0 +1,63 @@
+from concurrent.futures import Future, wait
+import logging
+import os
+import threading
+import time
+import youspotube.constants as constants
+from youspotube.exceptions import ConfigurationError
+from youspotube.util.tools import Tools
+
+
+class HealthCheck:
+    def __init__(self, storage_file_path):
+        self.storage_file_path = storage_file_path
+
+    def run(self, probes):
+        if self._is_last_success_recent():
+            logging.debug(
+                "Skipping the health checks, the last successful ones are less than %s seconds old" %
+                constants.HEALTH_CHECK_CACHE_TTL_SECONDS
+            )
+            return
+
+        # the probes are independent round trips, so they all run at once and share a single deadline
+        futures = {}
+        for probe_name in probes:
+            futures[probe_name] = Future()
+            # probes that miss the deadline are abandoned, their daemon threads do not keep the interpreter from exiting
+            probe_thread = threading.Thread(target=HealthCheck._run_probe, args=(probes[probe_name], futures[probe_name]))
+            probe_thread.daemon = True
+            probe_thread.start()
+        unfinished_futures = wait(futures.values(), timeout=constants.HEALTH_CHECK_DEADLINE_SECONDS).not_done
+
+        for probe_name in futures:
+            if futures[probe_name] in unfinished_futures:
+                raise ConfigurationError(
+                    "Health check of %s did not finish within %s seconds" % (
+                        probe_name,
+                        constants.HEALTH_CHECK_DEADLINE_SECONDS
+                    )
+                )
+            futures[probe_name].result()
+
+        self._save_success()
+
+    def _run_probe(probe, future):
+        try:
+            future.set_result(probe())
+        except Exception as e:
+            future.set_exception(e)
+
+    def _is_last_success_recent(self):
+        try:
+            last_success_at = os.path.getmtime(self.storage_file_path)
+        except OSError:
+            return False
+
+        return time.time() - last_success_at < constants.HEALTH_CHECK_CACHE_TTL_SECONDS
+
+    def _save_success(self):
+        try:
+            Tools.write_file_atomically(self.storage_file_path, str(time.time()))
+        except OSError as e:
+            logging.debug("Could not save the health check result to '%s': %s" % (self.storage_file_path, str(e)))
@@ -0,0 +1,34 @@
+from concurrent.futures import Future
+import threading
+
+
+class LookupMemo:
+    def __init__(self):
+        self.lookups = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, lookup):
+        with self.lock:
+            future = self.lookups.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.lookups[key] = future
+
+        if not is_owner:
+            # the same key is looked up or was already looked up by someone else, its result is shared
+            return future.result()
+
+        try:
+            future.set_result(lookup())
+        except Exception as e:
+            # failed lookups are not remembered, the callers waiting on them get the error and the next one retries
+            with self.lock:
+                del self.lookups[key]
+            future.set_exception(e)
+
+        return future.result()
+
+    def clear(self):
+        with self.lock:
+            self.lookups.clear()
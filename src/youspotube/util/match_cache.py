@@ -0,0 +1,77 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class MatchCache:
+    def __init__(self, db_path, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # lookups may run on worker threads, all access to the connection is serialized via the lock
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                "kind TEXT NOT NULL, "
+                "source_id TEXT NOT NULL, "
+                "target_id TEXT NOT NULL, "
+                "details TEXT NOT NULL, "
+                "matched_at REAL NOT NULL, "
+                "PRIMARY KEY (kind, source_id))"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS matches_matched_at ON matches (matched_at)")
+
+    def get(self, kind, source_id):
+        oldest_valid_match = time.time() - self.ttl_seconds
+        with self.lock:
+            row = self.db.execute(
+                "SELECT target_id, details FROM matches WHERE kind = ? AND source_id = ? AND matched_at >= ?",
+                (kind, source_id, oldest_valid_match)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        target_id, details = row
+        return target_id, json.loads(details)
+
+    def put(self, kind, source_id, target_id, details):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO matches (kind, source_id, target_id, details, matched_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, source_id, target_id, json.dumps(details), time.time())
+            )
+
+    def update_details(self, kind, source_id, target_id, details):
+        # the match itself is unchanged, so it keeps the time it was made at and expires when it would have anyway
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE matches SET details = ? WHERE kind = ? AND source_id = ? AND target_id = ?",
+                (json.dumps(details), kind, source_id, target_id)
+            )
+
+    def invalidate(self, ids=None):
+        # with no IDs the whole cache is dropped, otherwise every match that involves any of the IDs on either side
+        with self.lock, self.db:
+            if not ids:
+                return self.db.execute("DELETE FROM matches").rowcount
+
+            placeholders = ', '.join('?' * len(ids))
+            return self.db.execute(
+                "DELETE FROM matches WHERE source_id IN (%s) OR target_id IN (%s)" % (placeholders, placeholders),
+                list(ids) + list(ids)
+            ).rowcount
+
+    def prune(self):
+        # expired matches go first, then the oldest ones until the cache fits in its size cap
+        oldest_valid_match = time.time() - self.ttl_seconds
+        with self.lock, self.db:
+            expired_count = self.db.execute("DELETE FROM matches WHERE matched_at < ?", (oldest_valid_match,)).rowcount
+            evicted_count = self.db.execute(
+                "DELETE FROM matches WHERE rowid IN (SELECT rowid FROM matches ORDER BY matched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+
+        return expired_count, evicted_count
@@ -0,0 +1,15 @@
+import threading
+
+
+class PageCache:
+    def __init__(self):
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.pages.get(key)
+
+    def put(self, key, page):
+        with self.lock:
+            self.pages[key] = page
@@ -0,0 +1,70 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+
+
+class Pipeline:
+    def ordered_map(function, items, workers, max_pending):
+        # results are yielded in the order of the items as soon as they are ready; at most max_pending of them wait for
+        # the consumer, so a slow consumer holds the workers back instead of letting the results pile up
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending_results = deque()
+            for item in items:
+                if len(pending_results) == max_pending:
+                    yield pending_results.popleft().result()
+                pending_results.append(executor.submit(function, item))
+
+            while pending_results:
+                yield pending_results.popleft().result()
+
+    def run_ahead(items, max_pending):
+        # the items are consumed on a thread of their own ahead of the consumer; at most max_pending of them wait for
+        # the consumer, so a slow consumer still holds the items back instead of letting them pile up; the error that
+        # stops the items is raised to the consumer once it has taken the items before it
+        buffered_items = queue.Queue(maxsize=max_pending)
+        is_consumer_done = threading.Event()
+
+        threading.Thread(target=Pipeline._buffer_items, args=(items, buffered_items, is_consumer_done), daemon=True).start()
+        try:
+            while True:
+                is_item, value = buffered_items.get()
+                if not is_item:
+                    if value is not None:
+                        raise value
+                    return
+                yield value
+        finally:
+            is_consumer_done.set()
+            # emptying the queue once unblocks a put that waits for room, the thread stops right after it
+            while not buffered_items.empty():
+                buffered_items.get_nowait()
+
+    def _buffer_items(items, buffered_items, is_consumer_done):
+        try:
+            for item in items:
+                if not Pipeline._put_buffered_item(buffered_items, is_consumer_done, True, item):
+                    return
+        except Exception as e:
+            Pipeline._put_buffered_item(buffered_items, is_consumer_done, False, e)
+            return
+        Pipeline._put_buffered_item(buffered_items, is_consumer_done, False, None)
+
+    def _put_buffered_item(buffered_items, is_consumer_done, is_item, value):
+        # every put checks first whether the consumer is still there, so the thread never waits for room forever
+        if is_consumer_done.is_set():
+            return False
+
+        buffered_items.put((is_item, value))
+        return True
+
+
+class CountedStream:
+    def __init__(self, items):
+        self.items = items
+        self.count = 0
+
+    def __iter__(self):
+        for item in self.items:
+            self.count += 1
+            yield item
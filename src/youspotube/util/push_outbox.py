@@ -0,0 +1,108 @@
+import json
+import sqlite3
+import threading
+
+
+class PushOutbox:
+    def __init__(self, db_path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS playlist_runs ("
+                "origin TEXT NOT NULL, "
+                "spotify_playlist_id TEXT NOT NULL, "
+                "youtube_playlist_id TEXT NOT NULL, "
+                "versions TEXT NOT NULL, "
+                "is_diffed INTEGER NOT NULL, "
+                "PRIMARY KEY (origin, spotify_playlist_id, youtube_playlist_id))"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS pending_pushes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "origin TEXT NOT NULL, "
+                "spotify_playlist_id TEXT NOT NULL, "
+                "youtube_playlist_id TEXT NOT NULL, "
+                "song_id TEXT NOT NULL, "
+                "track_position INTEGER NOT NULL)"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS pending_pushes_playlists "
+                "ON pending_pushes (origin, spotify_playlist_id, youtube_playlist_id, id)"
+            )
+
+    def start_run(self, origin, spotify_playlist_id, youtube_playlist_id, versions):
+        # a run diffs the playlists anew, so the pushes left over by a previous one are dropped
+        with self.lock, self.db:
+            self._delete_pending(origin, spotify_playlist_id, youtube_playlist_id)
+            self.db.execute(
+                "INSERT OR REPLACE INTO playlist_runs "
+                "(origin, spotify_playlist_id, youtube_playlist_id, versions, is_diffed) VALUES (?, ?, ?, ?, 0)",
+                (origin, spotify_playlist_id, youtube_playlist_id, json.dumps(versions, sort_keys=True))
+            )
+
+    def get_run(self, origin, spotify_playlist_id, youtube_playlist_id):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT versions, is_diffed FROM playlist_runs "
+                "WHERE origin = ? AND spotify_playlist_id = ? AND youtube_playlist_id = ?",
+                (origin, spotify_playlist_id, youtube_playlist_id)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return json.loads(row[0]), bool(row[1])
+
+    def set_diffed(self, origin, spotify_playlist_id, youtube_playlist_id):
+        # all songs to push are in the outbox from now on, so the run can be resumed without diffing the playlists again
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE playlist_runs SET is_diffed = 1 "
+                "WHERE origin = ? AND spotify_playlist_id = ? AND youtube_playlist_id = ?",
+                (origin, spotify_playlist_id, youtube_playlist_id)
+            )
+
+    def finish_run(self, origin, spotify_playlist_id, youtube_playlist_id):
+        with self.lock, self.db:
+            self.db.execute(
+                "DELETE FROM playlist_runs WHERE origin = ? AND spotify_playlist_id = ? AND youtube_playlist_id = ?",
+                (origin, spotify_playlist_id, youtube_playlist_id)
+            )
+            return self._delete_pending(origin, spotify_playlist_id, youtube_playlist_id)
+
+    def _delete_pending(self, origin, spotify_playlist_id, youtube_playlist_id):
+        return self.db.execute(
+            "DELETE FROM pending_pushes WHERE origin = ? AND spotify_playlist_id = ? AND youtube_playlist_id = ?",
+            (origin, spotify_playlist_id, youtube_playlist_id)
+        ).rowcount
+
+    def get_pending(self, origin, spotify_playlist_id, youtube_playlist_id):
+        with self.lock:
+            return self.db.execute(
+                "SELECT id, song_id, track_position FROM pending_pushes "
+                "WHERE origin = ? AND spotify_playlist_id = ? AND youtube_playlist_id = ? ORDER BY id",
+                (origin, spotify_playlist_id, youtube_playlist_id)
+            ).fetchall()
+
+    def append(self, origin, spotify_playlist_id, youtube_playlist_id, song_id, track_position):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT INTO pending_pushes "
+                "(origin, spotify_playlist_id, youtube_playlist_id, song_id, track_position) VALUES (?, ?, ?, ?, ?)",
+                (origin, spotify_playlist_id, youtube_playlist_id, song_id, track_position)
+            )
+
+    def mark_done(self, origin, spotify_playlist_id, youtube_playlist_id, pushed_count):
+        # the songs of a playlist are pushed in the order they were appended, so the oldest pending ones are done
+        with self.lock, self.db:
+            self.db.execute(
+                "DELETE FROM pending_pushes WHERE id IN ("
+                "SELECT id FROM pending_pushes "
+                "WHERE origin = ? AND spotify_playlist_id = ? AND youtube_playlist_id = ? ORDER BY id LIMIT ?)",
+                (origin, spotify_playlist_id, youtube_playlist_id, pushed_count)
+            )
+
+    def remove(self, pending_push_ids):
+        with self.lock, self.db:
+            self.db.executemany("DELETE FROM pending_pushes WHERE id = ?", [(push_id,) for push_id in pending_push_ids])
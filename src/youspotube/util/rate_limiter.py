@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+import youspotube.constants as constants
+
+
+class RateLimiter:
+    def __init__(self, service_name, max_operations_per_minute):
+        self.service_name = service_name
+        self.max_rate = max_operations_per_minute / 60
+        self.min_rate = self.max_rate * constants.RATE_LIMITER_MIN_RATE_RATIO
+        self.rate = self.max_rate
+        self.tokens = constants.RATE_LIMITER_BURST
+        self.updated_at = time.monotonic()
+        self.blocked_until = self.updated_at
+        self.lock = threading.Lock()
+
+        logging.info("Pushing to %s at up to %s operations per minute" % (service_name, max_operations_per_minute))
+
+    def get_operations_per_minute(self):
+        return round(self.rate * 60, 2)
+
+    def acquire(self):
+        while True:
+            # the wait is computed under the lock but spent without it, so that other workers can still report their
+            # outcomes, which may change how long to wait, hence the re-check after waking
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait_seconds = self.blocked_until - now
+                if wait_seconds <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                if wait_seconds <= 0:
+                    wait_seconds = (1 - self.tokens) / self.rate
+            time.sleep(wait_seconds)
+
+    def on_success(self):
+        with self.lock:
+            if self.rate == self.max_rate:
+                return
+
+            # additive increase after a backoff, the rate recovers gradually
+            self.rate = min(self.max_rate, self.rate + self.max_rate * constants.RATE_LIMITER_RECOVERY_STEP)
+            logging.debug("%s push rate recovered to %s operations per minute" % (
+                    self.service_name,
+                    self.get_operations_per_minute()
+                )
+            )
+
+    def on_error(self, retry_after_seconds=None):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            # multiplicative decrease, the bucket is also drained so that the next push waits for the new rate
+            self.rate = max(self.min_rate, self.rate * constants.RATE_LIMITER_BACKOFF_FACTOR)
+            self.tokens = 0
+
+            if retry_after_seconds is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after_seconds)
+
+            logging.info("%s push rate lowered to %s operations per minute%s" % (
+                    self.service_name,
+                    self.get_operations_per_minute(),
+                    '' if retry_after_seconds is None else ", retrying after %s seconds" % retry_after_seconds
+                )
+            )
+
+    def _refill(self, now):
+        elapsed_seconds = now - self.updated_at
+        self.tokens = min(constants.RATE_LIMITER_BURST, self.tokens + elapsed_seconds * self.rate)
+        self.updated_at = now
+
+    def parse_retry_after(retry_after):
+        # only the delay-seconds form of Retry-After is supported, HTTP dates are ignored
+        try:
+            return max(0, int(retry_after))
+        except (TypeError, ValueError):
+            return None
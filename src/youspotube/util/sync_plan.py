@@ -0,0 +1,65 @@
+import json
+import threading
+import youspotube.constants as constants
+from youspotube.util.tools import Tools
+
+
+class SyncPlan:
+    def __init__(self, origin, playlists=None):
+        self.origin = origin
+        # playlist name -> the IDs of its Spotify and YouTube playlists, their versions and the [ID, position] of the
+        # songs to push to the target playlist
+        self.playlists = {} if playlists is None else playlists
+        self.songs_by_playlist_ids = {}
+        self.lock = threading.Lock()
+
+    def add_songs(self, playlist_details, songs):
+        # the songs are planned before it is known whether the synchronization of the playlist succeeds
+        with self.lock:
+            self.songs_by_playlist_ids[self._get_playlist_ids(playlist_details)] = songs
+
+    def add_playlist(self, playlist_name, playlist_details, versions):
+        with self.lock:
+            self.playlists[playlist_name] = {
+                constants.ORIGIN_SPOTIFY: playlist_details[constants.ORIGIN_SPOTIFY],
+                constants.ORIGIN_YOUTUBE: playlist_details[constants.ORIGIN_YOUTUBE],
+                constants.SYNC_PLAN_VERSIONS_KEY: versions,
+                constants.SYNC_PLAN_SONGS_KEY: self.songs_by_playlist_ids.get(
+                    self._get_playlist_ids(playlist_details),
+                    []
+                )
+            }
+
+    def get_playlists_details(self):
+        playlists_details = {}
+        for playlist_name in self.playlists:
+            playlist = self.playlists[playlist_name]
+            playlists_details[playlist_name] = {
+                constants.ORIGIN_SPOTIFY: playlist[constants.ORIGIN_SPOTIFY],
+                constants.ORIGIN_YOUTUBE: playlist[constants.ORIGIN_YOUTUBE]
+            }
+
+        return playlists_details
+
+    def get_versions(self, playlist_name):
+        return self.playlists[playlist_name][constants.SYNC_PLAN_VERSIONS_KEY]
+
+    def get_songs(self, playlist_name):
+        return self.playlists[playlist_name][constants.SYNC_PLAN_SONGS_KEY]
+
+    def save(self, plan_file_path):
+        with self.lock:
+            plan = {
+                constants.SYNC_PLAN_ORIGIN_KEY: self.origin,
+                constants.SYNC_PLAN_PLAYLISTS_KEY: self.playlists
+            }
+            Tools.write_file_atomically(plan_file_path, json.dumps(plan, separators=(',', ':')))
+
+    def load(plan_file_path):
+        with open(plan_file_path) as plan_file:
+            plan = json.load(plan_file)
+
+        return SyncPlan(plan[constants.SYNC_PLAN_ORIGIN_KEY], plan[constants.SYNC_PLAN_PLAYLISTS_KEY])
+
+    def _get_playlist_ids(self, playlist_details):
+        return playlist_details[constants.ORIGIN_SPOTIFY], playlist_details[constants.ORIGIN_YOUTUBE]
@@ -0,0 +1,45 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class SyncState:
+    def __init__(self, db_path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS playlist_versions ("
+                "origin TEXT NOT NULL, "
+                "spotify_playlist_id TEXT NOT NULL, "
+                "youtube_playlist_id TEXT NOT NULL, "
+                "versions TEXT NOT NULL, "
+                "synced_at REAL NOT NULL, "
+                "PRIMARY KEY (origin, spotify_playlist_id, youtube_playlist_id))"
+            )
+
+    def get_versions(self, origin, spotify_playlist_id, youtube_playlist_id):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT versions FROM playlist_versions "
+                "WHERE origin = ? AND spotify_playlist_id = ? AND youtube_playlist_id = ?",
+                (origin, spotify_playlist_id, youtube_playlist_id)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return json.loads(row[0])
+
+    def put_versions(self, origin, spotify_playlist_id, youtube_playlist_id, versions):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO playlist_versions "
+                "(origin, spotify_playlist_id, youtube_playlist_id, versions, synced_at) VALUES (?, ?, ?, ?, ?)",
+                (origin, spotify_playlist_id, youtube_playlist_id, json.dumps(versions, sort_keys=True), time.time())
+            )
+
+    def clear(self):
+        with self.lock, self.db:
+            return self.db.execute("DELETE FROM playlist_versions").rowcount
@@ -0,0 +1,25 @@
+import json
+import logging
+import threading
+from spotipy.cache_handler import CacheFileHandler
+from youspotube.util.tools import Tools
+
+
+class TokenCache(CacheFileHandler):
+    def __init__(self, cache_path):
+        super().__init__(cache_path=cache_path)
+        self.lock = threading.Lock()
+        # the token file is read once, spotipy asks for the token before every API call
+        self.token_info = super().get_cached_token()
+
+    def get_cached_token(self):
+        with self.lock:
+            return self.token_info
+
+    def save_token_to_cache(self, token_info):
+        with self.lock:
+            self.token_info = token_info
+            try:
+                Tools.write_file_atomically(self.cache_path, json.dumps(token_info))
+            except OSError as e:
+                logging.warning("Could not save Spotify token to '%s': %s" % (self.cache_path, str(e)))
@@ -28,6 +28,13 @@ class Tools:
         fullpath = os.path.join(cwd, filepath)
         return fullpath
 
+    def write_file_atomically(filepath, data, mode='w'):
+        # the data is written next to the file and then moved over it, so a crash never leaves the file half-written
+        temporary_filepath = "%s.tmp" % filepath
+        with open(temporary_filepath, mode) as temporary_file:
+            temporary_file.write(data)
+        os.replace(temporary_filepath, filepath)
+
     def getcwd():
         if getattr(sys, 'frozen', False):
             # if the application is a bundle the best bet is sys.argv[0]
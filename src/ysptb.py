@@ -1,3 +1,4 @@
+import sys
 from youspotube.util.bootstrapper import Bootstrap
 
-Bootstrap()
+Bootstrap(sys.argv[1:])
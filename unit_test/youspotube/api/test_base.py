@@ -1,41 +1,143 @@
+from collections import Counter
+import threading
 import unittest
+from unittest import mock
 from unittest.mock import Mock
 
 from youspotube.api.base import BaseAPI
+import youspotube.constants as constants
 from youspotube.exceptions import ConfigurationError
+from youspotube.util.lookup_memo import LookupMemo
 
 
 class BaseAPITest(unittest.TestCase):
     def setUp(self):
         self.base_mock = Mock()
 
-    def test_BaseAPI_creation_no_error(self):
+    @mock.patch('youspotube.api.base.CredentialRefresher')
+    def test_BaseAPI_creation_no_error(self, credential_refresher_mock):
         expected_client_id = 1
         expected_client_secret = 2
         expected_tied_songs = {}
+        expected_match_cache = Mock()
+        expected_rate_limiter = Mock()
+        expected_search_workers = 3
 
-        BaseAPI.__init__(self.base_mock, expected_client_id, expected_client_secret, expected_tied_songs)
+        BaseAPI.__init__(self.base_mock, expected_client_id, expected_client_secret, expected_tied_songs,
+                         expected_match_cache, expected_rate_limiter, expected_search_workers)
 
         self.assertEqual(expected_client_id, self.base_mock.client_id)
         self.assertEqual(expected_client_secret, self.base_mock.client_secret)
         self.assertIs(expected_tied_songs, self.base_mock.tied_songs)
+        self.assertIs(expected_match_cache, self.base_mock.match_cache)
+        self.assertIs(expected_rate_limiter, self.base_mock.rate_limiter)
+        self.assertEqual(expected_search_workers, self.base_mock.search_workers)
+        self.assertEqual(self.base_mock.tied_track_ids_by_video_id, {})
+        self.assertEqual(self.base_mock.tied_video_ids_by_track_id, {})
+        self.assertIsInstance(self.base_mock.connection_lock, type(threading.RLock()))
+        self.assertIsInstance(self.base_mock.lookup_memo, LookupMemo)
+        self.assertIsInstance(self.base_mock.search_slots, type(threading.BoundedSemaphore()))
         self.base_mock._init_connection.assert_called_once()
-        self.base_mock._test_connection.assert_called_once()
+        self.base_mock._test_connection.assert_not_called()
+        credential_refresher_mock.assert_called_once_with(
+            'Mock',
+            self.base_mock._get_credentials_expires_at,
+            self.base_mock._refresh_credentials
+        )
+        self.assertIs(self.base_mock.credential_refresher, credential_refresher_mock.return_value)
+        # the refresher is only started after the health checks
+        credential_refresher_mock.return_value.start.assert_not_called()
 
-    def test_Spotify_creation_error(self):
+    def test_BaseAPI_creation_error(self):
         expected_client_id = 1
         expected_client_secret = 2
         expected_tied_songs = {}
+        expected_match_cache = Mock()
+        expected_rate_limiter = Mock()
+        expected_search_workers = 3
         error_reason = 'bad api'
-        expected_error_message = "Configuration error: Test connection to Mock API failed: %s" % error_reason
+        expected_error_message = "Configuration error: Connection to Mock API failed: %s" % error_reason
         self.base_mock._init_connection.side_effect = Exception(error_reason)
 
         with self.assertRaises(ConfigurationError) as expected_error:
-            BaseAPI.__init__(self.base_mock, expected_client_id, expected_client_secret, expected_tied_songs)
+            BaseAPI.__init__(self.base_mock, expected_client_id, expected_client_secret, expected_tied_songs,
+                             expected_match_cache, expected_rate_limiter, expected_search_workers)
 
         self.assertEqual(expected_client_id, self.base_mock.client_id)
         self.assertEqual(expected_client_secret, self.base_mock.client_secret)
         self.assertIs(expected_tied_songs, self.base_mock.tied_songs)
+        self.assertIs(expected_match_cache, self.base_mock.match_cache)
+        self.assertIs(expected_rate_limiter, self.base_mock.rate_limiter)
+        self.assertEqual(expected_search_workers, self.base_mock.search_workers)
+        self.assertIsInstance(self.base_mock.connection_lock, type(threading.RLock()))
         self.assertEqual(str(expected_error.exception), expected_error_message)
         self.base_mock._init_connection.assert_called_once()
         self.base_mock._test_connection.assert_not_called()
+
+    def test_BaseAPI_index_tied_songs(self):
+        tied_songs = {
+            'DesiSlava - Toxic': {
+                constants.ORIGIN_YOUTUBE: 'video1',
+                constants.ORIGIN_SPOTIFY: 'track1'
+            },
+            'Azis - Motel': {
+                constants.ORIGIN_YOUTUBE: 'video2',
+                constants.ORIGIN_SPOTIFY: 'track2'
+            }
+        }
+
+        track_ids_by_video_id, video_ids_by_track_id = BaseAPI.index_tied_songs(tied_songs)
+
+        self.assertEqual(track_ids_by_video_id, {'video1': 'track1', 'video2': 'track2'})
+        self.assertEqual(video_ids_by_track_id, {'track1': 'video1', 'track2': 'video2'})
+        with self.assertRaises(TypeError):
+            track_ids_by_video_id['video3'] = 'track3'
+
+    def test_BaseAPI_start_credential_refresher(self):
+        BaseAPI.start_credential_refresher(self.base_mock)
+
+        self.base_mock.credential_refresher.start.assert_called_once_with()
+
+    def test_BaseAPI_disconnect(self):
+        BaseAPI.disconnect(self.base_mock)
+
+        self.base_mock.credential_refresher.stop.assert_called_once_with()
+
+    def test_BaseAPI_test_connection_no_error(self):
+        playlists = {}
+
+        BaseAPI.test_connection(self.base_mock, playlists)
+
+        self.base_mock._test_connection.assert_called_once_with(playlists)
+
+    def test_BaseAPI_test_connection_error(self):
+        self.base_mock._test_connection.side_effect = Exception('bad api')
+
+        with self.assertRaises(ConfigurationError) as expected_error:
+            BaseAPI.test_connection(self.base_mock, {})
+
+        self.assertEqual(
+            str(expected_error.exception),
+            "Configuration error: Test connection to Mock API failed: bad api"
+        )
+
+    def test_BaseAPI_run_search_takes_search_slot(self):
+        self.base_mock.search_slots = threading.BoundedSemaphore(1)
+
+        def search(argument):
+            # the only slot is taken while searching
+            self.assertFalse(self.base_mock.search_slots.acquire(blocking=False))
+            return argument * 2
+
+        self.assertEqual(BaseAPI._run_search(self.base_mock, search, 2), 4)
+        self.assertTrue(self.base_mock.search_slots.acquire(blocking=False))
+
+    def test_BaseAPI_count_lookups(self):
+        self.base_mock.lookup_counts = Counter()
+        self.base_mock.lookup_counts_lock = threading.Lock()
+
+        BaseAPI._count_lookup(self.base_mock, 'cached')
+        BaseAPI._count_lookup(self.base_mock, 'cached')
+        BaseAPI._count_lookup(self.base_mock, 'not found')
+
+        self.assertEqual(BaseAPI.get_lookup_counts(self.base_mock), {'cached': 2, 'not found': 1})
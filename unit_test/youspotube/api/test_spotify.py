@@ -1,27 +1,32 @@
 import unittest
 from unittest import mock
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
+from spotipy.exceptions import SpotifyException
 from youspotube.api.spotify import Spotify
 import youspotube.constants as constants
+from youspotube.util.lookup_memo import LookupMemo
 import os
+import threading
 
 
 class SpotifyTest(unittest.TestCase):
     def setUp(self):
         self.spotify_mock = Mock()
+        self.spotify_mock.match_cache.get.return_value = None
+        self.spotify_mock.connection_lock = threading.RLock()
 
-    def test_Spotify_get_connection_without_init_connection(self):
+    def test_Spotify_get_connection_without_token(self):
         auth_manager = self.spotify_mock.spotify.auth_manager
         auth_manager.cache_handler.get_cached_token.return_value = None
 
         return_value = Spotify.connection.__get__(self.spotify_mock)
 
         auth_manager.is_token_expired.assert_not_called()
-        self.spotify_mock._init_connection.assert_not_called()
+        self.spotify_mock._refresh_credentials.assert_not_called()
         self.assertIs(return_value, self.spotify_mock.spotify)
 
-    def test_Spotify_get_connection_with_init_connection(self):
+    def test_Spotify_get_connection_expired_token(self):
         auth_manager = self.spotify_mock.spotify.auth_manager
         auth_manager.cache_handler.get_cached_token.return_value = 1
         auth_manager.is_token_expired.return_value = True
@@ -29,17 +34,20 @@ class SpotifyTest(unittest.TestCase):
         return_value = Spotify.connection.__get__(self.spotify_mock)
 
         auth_manager.is_token_expired.assert_called_once_with(1)
-        self.spotify_mock._init_connection.assert_called_once()
+        self.spotify_mock._refresh_credentials.assert_called_once_with()
         self.assertIs(return_value, self.spotify_mock.spotify)
 
+    @mock.patch('youspotube.api.spotify.TokenCache')
     @mock.patch('youspotube.api.spotify.Tools')
     @mock.patch('youspotube.api.spotify.SpotifyOAuth')
     @mock.patch('youspotube.api.spotify.spotipy')
-    def test_Spotify_init_connection(self, spotipy_mock, oauth_mock, tools_mock):
+    def test_Spotify_init_connection(self, spotipy_mock, oauth_mock, tools_mock, token_cache_mock):
         self.spotify_mock.client_id = 1
         self.spotify_mock.client_secret = 2
         expected_cache_file_path = os.path.join('aa', 'bb', constants.SPOTIFY_TOKEN_STORAGE_FILE)
         tools_mock.get_filepath_relative_to_ysptb.return_value = expected_cache_file_path
+        auth_manager = spotipy_mock.Spotify.return_value.auth_manager
+        auth_manager.cache_handler.get_cached_token.return_value = None
 
         Spotify._init_connection(self.spotify_mock)
 
@@ -50,28 +58,121 @@ class SpotifyTest(unittest.TestCase):
             redirect_uri=constants.SPOTIFY_CALLBACK_URL,
             client_id=1,
             client_secret=2,
-            cache_path=expected_cache_file_path
+            cache_handler=token_cache_mock.return_value
         )
+        token_cache_mock.assert_called_once_with(expected_cache_file_path)
+        auth_manager.get_access_token.assert_called_once_with(as_dict=False)
+
+    @mock.patch('youspotube.api.spotify.TokenCache')
+    @mock.patch('youspotube.api.spotify.Tools')
+    @mock.patch('youspotube.api.spotify.SpotifyOAuth')
+    @mock.patch('youspotube.api.spotify.spotipy')
+    def test_Spotify_init_connection_with_cached_token(self, spotipy_mock, oauth_mock, tools_mock, token_cache_mock):
+        auth_manager = spotipy_mock.Spotify.return_value.auth_manager
+        auth_manager.cache_handler.get_cached_token.return_value = {'expires_at': 0}
+
+        Spotify._init_connection(self.spotify_mock)
+
+        # an expired token is refreshed by the test connection, within the deadline of the health checks
+        auth_manager.get_access_token.assert_not_called()
+        self.assertIs(self.spotify_mock.spotify, spotipy_mock.Spotify.return_value)
+
+    def test_Spotify_get_credentials_expires_at(self):
+        self.spotify_mock.spotify.auth_manager.cache_handler.get_cached_token.return_value = {'expires_at': 100}
+
+        self.assertEqual(Spotify._get_credentials_expires_at(self.spotify_mock), 100)
+
+    def test_Spotify_get_credentials_expires_at_without_token(self):
+        self.spotify_mock.spotify.auth_manager.cache_handler.get_cached_token.return_value = None
+
+        self.assertIsNone(Spotify._get_credentials_expires_at(self.spotify_mock))
+
+    def test_Spotify_refresh_credentials(self):
+        auth_manager = self.spotify_mock.spotify.auth_manager
+        auth_manager.cache_handler.get_cached_token.return_value = {'refresh_token': 'token'}
+
+        Spotify._refresh_credentials(self.spotify_mock)
+
+        auth_manager.refresh_access_token.assert_called_once_with('token')
 
     def test_Spotify_test_connection(self):
-        Spotify._test_connection(self.spotify_mock)
+        Spotify._test_connection(self.spotify_mock, {})
 
         self.spotify_mock.connection.me.assert_called_once()
 
-    def test_Spotify_get_playlist_items(self):
+    def test_Spotify_get_playlist_snapshot_ids(self):
+        self.spotify_mock.connection.current_user_playlists.side_effect = [
+            {'items': [{'id': 'sp1', 'snapshot_id': 's1'}, {'id': 'other', 'snapshot_id': 'o'}], 'next': 'url'},
+            {'items': [{'id': 'sp2', 'snapshot_id': 's2'}], 'next': None}
+        ]
+        self.spotify_mock.connection.playlist.return_value = {'snapshot_id': 's3'}
+
+        return_value = Spotify.get_playlist_snapshot_ids(self.spotify_mock, ['sp1', 'sp2', 'sp3'])
+
+        self.spotify_mock.connection.current_user_playlists.assert_has_calls([
+            call(limit=constants.SPOTIFY_USER_PLAYLISTS_PAGE_SIZE, offset=0),
+            call(limit=constants.SPOTIFY_USER_PLAYLISTS_PAGE_SIZE, offset=constants.SPOTIFY_USER_PLAYLISTS_PAGE_SIZE)
+        ])
+        self.spotify_mock.connection.playlist.assert_called_once_with('sp3', fields='snapshot_id')
+        self.assertEqual(return_value, {'sp1': 's1', 'sp2': 's2', 'sp3': 's3'})
+
+    def test_Spotify_get_playlist_snapshot_ids_stop_listing_when_all_found(self):
+        self.spotify_mock.connection.current_user_playlists.return_value = {
+            'items': [{'id': 'sp1', 'snapshot_id': 's1'}],
+            'next': 'url'
+        }
+
+        return_value = Spotify.get_playlist_snapshot_ids(self.spotify_mock, ['sp1'])
+
+        self.spotify_mock.connection.current_user_playlists.assert_called_once()
+        self.spotify_mock.connection.playlist.assert_not_called()
+        self.assertEqual(return_value, {'sp1': 's1'})
+
+    def test_Spotify_get_playlist_items_single_page(self):
         playlist_id = 1
-        playlist_filter = 'tracks(items(track(name,id,duration_ms,artists(name))))'
-        all_tracks = {
-            'tracks': {
-                'items': []
-            }
+        first_page = {
+            'total': 1,
+            'items': ['item1']
         }
-        self.spotify_mock.connection.playlist.return_value = all_tracks
+        self.spotify_mock._get_playlist_items_page.return_value = first_page
 
         return_value = Spotify._get_playlist_items(self.spotify_mock, playlist_id)
 
-        self.spotify_mock.connection.playlist.assert_called_once_with(playlist_id, playlist_filter)
-        self.assertIs(return_value, all_tracks['tracks']['items'])
+        self.spotify_mock._get_playlist_items_page.assert_called_once_with(playlist_id, 0)
+        self.assertEqual(return_value, ['item1'])
+
+    def test_Spotify_get_playlist_items_multiple_pages(self):
+        playlist_id = 1
+        page_size = constants.SPOTIFY_PLAYLIST_PAGE_SIZE
+        pages = {
+            0: {'total': page_size * 2 + 1, 'items': ['item1']},
+            page_size: {'total': page_size * 2 + 1, 'items': ['item2']},
+            page_size * 2: {'total': page_size * 2 + 1, 'items': ['item3']}
+        }
+        self.spotify_mock._get_playlist_items_page.side_effect = lambda playlist_id, offset: pages[offset]
+
+        return_value = Spotify._get_playlist_items(self.spotify_mock, playlist_id)
+
+        self.spotify_mock._get_playlist_items_page.assert_has_calls(
+            [call(playlist_id, 0), call(playlist_id, page_size), call(playlist_id, page_size * 2)],
+            any_order=True
+        )
+        self.assertEqual(return_value, ['item1', 'item2', 'item3'])
+
+    def test_Spotify_get_playlist_items_page(self):
+        playlist_id = 1
+        offset = 200
+
+        return_value = Spotify._get_playlist_items_page(self.spotify_mock, playlist_id, offset)
+
+        self.spotify_mock.connection.playlist_items.assert_called_once_with(
+            playlist_id,
+            fields=constants.SPOTIFY_PLAYLIST_ITEMS_FIELDS,
+            limit=constants.SPOTIFY_PLAYLIST_PAGE_SIZE,
+            offset=offset,
+            additional_types=('track',)
+        )
+        self.assertIs(return_value, self.spotify_mock.connection.playlist_items.return_value)
 
     def test_Spotify_parse_playlist(self):
         playlist_items = [{
@@ -101,22 +202,50 @@ class SpotifyTest(unittest.TestCase):
         self.spotify_mock._get_playlist_items.assert_called_once_with(3)
         self.assertEqual(return_value, parsed_playlist)
 
-    def test_Spotify_youtube_playlist_to_track_ids_bad_track(self):
-        video_id = '1'
+    def test_Spotify_youtube_playlist_to_track_ids(self):
         youtube_playlist = {
-            video_id: {}
+            '1': {'title': 'first'},
+            '2': {'title': 'second'},
+            '3': {'title': 'third'}
         }
-        self.spotify_mock._lookup_youtube_video_on_spotify.return_value = None, None, None
+        self.spotify_mock.search_workers = 2
+        self.spotify_mock._run_search.side_effect = lambda search, *args: search(*args)
+        self.spotify_mock.lookup_memo = LookupMemo()
+        self.spotify_mock._lookup_youtube_video_on_spotify.side_effect = lambda video, video_id: (
+            video['title'] + '_track',
+            None,
+            None
+        )
+        self.spotify_mock._get_track_ids_from_lookups.side_effect = lambda playlist, lookups: list(lookups)
 
         return_value = Spotify.youtube_playlist_to_track_ids(self.spotify_mock, youtube_playlist)
 
-        self.spotify_mock._lookup_youtube_video_on_spotify.assert_called_once_with(youtube_playlist[video_id], video_id)
+        self.spotify_mock._lookup_youtube_video_on_spotify.assert_has_calls(
+            [call(youtube_playlist[video_id], video_id) for video_id in youtube_playlist],
+            any_order=True
+        )
+        self.spotify_mock._get_track_ids_from_lookups.assert_called_once()
+        self.assertEqual(
+            return_value,
+            [('first_track', None, None), ('second_track', None, None), ('third_track', None, None)]
+        )
+
+    def test_Spotify_get_track_ids_from_lookups_bad_track(self):
+        youtube_playlist = {
+            '1': {}
+        }
+
+        return_value = list(Spotify._get_track_ids_from_lookups(self.spotify_mock, youtube_playlist, [(None, None, None)]))
+
         self.assertEqual(return_value, [])
 
-    def test_Spotify_youtube_playlist_to_track_ids_ok_track(self):
-        video_id = '1'
+    def test_Spotify_get_track_ids_from_lookups_ok_track(self):
+        video_id = '2'
         video_title = 'title, yeah!'
         youtube_playlist = {
+            '1': {
+                'title': 'not found'
+            },
             video_id: {
                 'title': video_title
             }
@@ -134,27 +263,24 @@ class SpotifyTest(unittest.TestCase):
             constants.SEARCH_RESULTS_DATA_KEY: search_result,
             constants.TRACK_POSITION_DATA_KEY: 0
         }]
-        self.spotify_mock._lookup_youtube_video_on_spotify.return_value = track_id, artists, search_result
 
-        return_value = Spotify.youtube_playlist_to_track_ids(self.spotify_mock, youtube_playlist)
+        return_value = list(Spotify._get_track_ids_from_lookups(
+            self.spotify_mock,
+            youtube_playlist,
+            [(None, None, None), (track_id, artists, search_result)]
+        ))
 
-        self.spotify_mock._lookup_youtube_video_on_spotify.assert_called_once_with(youtube_playlist[video_id], video_id)
         self.assertEqual(return_value, expected_track_ids_result)
 
     def test_Spotify_return_none_when_video_id_not_tied_to_track_id(self):
-        self.spotify_mock.tied_songs = {}
+        self.spotify_mock.tied_track_ids_by_video_id = {}
 
         self.assertIs(Spotify._get_tied_track_id_to_video_id(self.spotify_mock, 1), None)
 
     def test_Spotify_return_track_id_tied_to_video_id(self):
         video_id = '1'
         track_id = '2'
-        self.spotify_mock.tied_songs = {
-            'song name': {
-                constants.ORIGIN_YOUTUBE: video_id,
-                constants.ORIGIN_SPOTIFY: track_id
-            }
-        }
+        self.spotify_mock.tied_track_ids_by_video_id = {video_id: track_id}
 
         self.assertIs(Spotify._get_tied_track_id_to_video_id(self.spotify_mock, video_id), track_id)
 
@@ -255,11 +381,69 @@ class SpotifyTest(unittest.TestCase):
         logging_mock.debug.assert_called_once_with(dbg_msg)
         self.spotify_mock.connection.search.assert_called_once_with(video_title, constants.SPOTIFY_SEARCH_LIMIT, 0, 'track')
         tools_mock.get_track_string.assert_called_once_with('aa', ['bb', 'cc'])
+        self.spotify_mock._cache_match.assert_called_once_with(
+            video_id,
+            track_id,
+            track_title_artists,
+            tracks_result['tracks']['items']
+        )
         self.assertEqual(
             [return_value1, return_value2, return_value3],
             [track_id, track_title_artists, tracks_result['tracks']['items']]
         )
 
+    @mock.patch('youspotube.api.spotify.logging')
+    def test_Spotify_lookup_youtube_video_on_spotify_cached_match(self, logging_mock):
+        video_title = 'title, yeah'
+        video_id = '1'
+        cached_track_id = '2'
+        track_title_artists = 'Test'
+        search_results = [{'id': cached_track_id}]
+        video = {
+            'title': video_title
+        }
+        expected_msg = "Using cached track ID '%s' to video '%s' instead of looking it up on Spotify" % (
+            cached_track_id,
+            video_title
+        )
+        self.spotify_mock._get_tied_track_id_to_video_id.return_value = None
+        self.spotify_mock.match_cache.get.return_value = cached_track_id, {
+            constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: track_title_artists,
+            constants.SEARCH_RESULTS_DATA_KEY: search_results,
+            constants.MATCH_VERIFIED_DATA_KEY: True
+        }
+
+        return_value = Spotify._lookup_youtube_video_on_spotify(self.spotify_mock, video, video_id)
+
+        self.spotify_mock.match_cache.get.assert_called_once_with(constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK, video_id)
+        logging_mock.debug.assert_called_once_with(expected_msg)
+        self.spotify_mock.connection.search.assert_not_called()
+        self.spotify_mock._cache_match.assert_not_called()
+        self.assertEqual(return_value, (cached_track_id, track_title_artists, search_results))
+
+    def test_Spotify_cache_match(self):
+        video_id = '1'
+        track_id = '2'
+        track_title_artists = 'Test'
+        tracks_result = [{
+            'id': track_id,
+            'name': 'aa',
+            'artists': []
+        }]
+
+        Spotify._cache_match(self.spotify_mock, video_id, track_id, track_title_artists, tracks_result)
+
+        self.spotify_mock.match_cache.put.assert_called_once_with(
+            constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK,
+            video_id,
+            track_id,
+            {
+                constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: track_title_artists,
+                constants.SEARCH_RESULTS_DATA_KEY: [{'id': track_id}],
+                constants.MATCH_VERIFIED_DATA_KEY: None
+            }
+        )
+
     def test_Spotify_get_track_ids_from_spotify_playlist(self):
         playlist_items = [{
             'track': {
@@ -269,13 +453,13 @@ class SpotifyTest(unittest.TestCase):
 
         return_value = Spotify._get_track_ids_from_spotify_playlist(self.spotify_mock, playlist_items)
 
-        self.assertEqual(return_value, ['1'])
+        self.assertEqual(return_value, {'1'})
 
     def test_Spotify_get_missing_tracks_in_playlist_tied_track(self):
         playlist_id = '2'
         track_id = '1'
         playlist_items = ['itema']
-        playlist_track_ids = []
+        playlist_track_ids = set()
         playlist_details = {
             constants.ORIGIN_SPOTIFY: playlist_id
         }
@@ -285,8 +469,13 @@ class SpotifyTest(unittest.TestCase):
         }]
         self.spotify_mock._get_playlist_items.return_value = playlist_items
         self.spotify_mock._get_track_ids_from_spotify_playlist.return_value = playlist_track_ids
+        self.spotify_mock._is_track_in_playlist.side_effect = lambda track, track_ids: Spotify._is_track_in_playlist(
+            self.spotify_mock,
+            track,
+            track_ids
+        )
 
-        return_value = Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks)
+        return_value = list(Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks))
 
         self.spotify_mock._get_playlist_items.assert_called_once_with(playlist_id)
         self.spotify_mock._get_track_ids_from_spotify_playlist.assert_called_once_with(playlist_items)
@@ -296,7 +485,7 @@ class SpotifyTest(unittest.TestCase):
         playlist_id = '2'
         track_id = '1'
         playlist_items = ['itema']
-        playlist_track_ids = [track_id]
+        playlist_track_ids = {track_id}
         playlist_details = {
             constants.ORIGIN_SPOTIFY: playlist_id
         }
@@ -306,8 +495,13 @@ class SpotifyTest(unittest.TestCase):
         }]
         self.spotify_mock._get_playlist_items.return_value = playlist_items
         self.spotify_mock._get_track_ids_from_spotify_playlist.return_value = playlist_track_ids
+        self.spotify_mock._is_track_in_playlist.side_effect = lambda track, track_ids: Spotify._is_track_in_playlist(
+            self.spotify_mock,
+            track,
+            track_ids
+        )
 
-        return_value = Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks)
+        return_value = list(Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks))
 
         self.spotify_mock._get_playlist_items.assert_called_once_with(playlist_id)
         self.spotify_mock._get_track_ids_from_spotify_playlist.assert_called_once_with(playlist_items)
@@ -317,7 +511,7 @@ class SpotifyTest(unittest.TestCase):
         playlist_id = '2'
         track_id = '1'
         playlist_items = ['itema']
-        playlist_track_ids = []
+        playlist_track_ids = set()
         playlist_details = {
             constants.ORIGIN_SPOTIFY: playlist_id
         }
@@ -329,8 +523,13 @@ class SpotifyTest(unittest.TestCase):
         }]
         self.spotify_mock._get_playlist_items.return_value = playlist_items
         self.spotify_mock._get_track_ids_from_spotify_playlist.return_value = playlist_track_ids
+        self.spotify_mock._is_track_in_playlist.side_effect = lambda track, track_ids: Spotify._is_track_in_playlist(
+            self.spotify_mock,
+            track,
+            track_ids
+        )
 
-        return_value = Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks)
+        return_value = list(Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks))
 
         self.spotify_mock._get_playlist_items.assert_called_once_with(playlist_id)
         self.spotify_mock._get_track_ids_from_spotify_playlist.assert_called_once_with(playlist_items)
@@ -340,7 +539,7 @@ class SpotifyTest(unittest.TestCase):
         playlist_id = '2'
         track_id = '1'
         playlist_items = ['itema']
-        playlist_track_ids = [track_id]
+        playlist_track_ids = {track_id}
         playlist_details = {
             constants.ORIGIN_SPOTIFY: playlist_id
         }
@@ -352,16 +551,20 @@ class SpotifyTest(unittest.TestCase):
         }]
         self.spotify_mock._get_playlist_items.return_value = playlist_items
         self.spotify_mock._get_track_ids_from_spotify_playlist.return_value = playlist_track_ids
+        self.spotify_mock._is_track_in_playlist.side_effect = lambda track, track_ids: Spotify._is_track_in_playlist(
+            self.spotify_mock,
+            track,
+            track_ids
+        )
 
-        return_value = Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks)
+        return_value = list(Spotify.get_missing_tracks_in_playlist(self.spotify_mock, playlist_details, all_tracks))
 
         self.spotify_mock._get_playlist_items.assert_called_once_with(playlist_id)
         self.spotify_mock._get_track_ids_from_spotify_playlist.assert_called_once_with(playlist_items)
         self.assertEqual(return_value, [])
 
     @mock.patch('youspotube.api.spotify.logging')
-    @mock.patch('youspotube.api.spotify.time')
-    def test_Spotify_append_track_to_playlist(self, time_mock, logging_mock):
+    def test_Spotify_append_track_to_playlist(self, logging_mock):
         playlist_id = '2'
         track_id = '1'
         playlist_details = {
@@ -371,40 +574,129 @@ class SpotifyTest(unittest.TestCase):
             constants.SPOTIFY_TRACK_ID_DATA_KEY: track_id,
             constants.TRACK_POSITION_DATA_KEY: 0
         }]
-        expected_message = "Pushing track '%s' to Spotify playlist '%s'" % (
+        expected_message = "Pushing tracks '%s' to Spotify playlist '%s'" % (
             track_id,
             playlist_id
         )
         self.spotify_mock._get_playlist_items.return_value = []
+        self.spotify_mock._group_tracks_by_insertion_point.return_value = [([track_id], None)]
 
         Spotify.add_tracks_to_playlist(self.spotify_mock, playlist_details, tracks_to_add)
 
         self.spotify_mock._get_playlist_items.assert_called_once_with(playlist_id)
+        self.spotify_mock._group_tracks_by_insertion_point.assert_called_once_with(tracks_to_add, 0)
         logging_mock.debug.assert_called_once_with(expected_message)
-        self.spotify_mock.connection.playlist_add_items.assert_called_once_with(playlist_id, [track_id], None)
-        time_mock.sleep.assert_called_once_with(constants.SLEEP_BETWEEN_PLAYLIST_PUSHES)
+        self.spotify_mock._push_tracks_to_playlist.assert_called_once_with(playlist_id, [track_id], None)
 
     @mock.patch('youspotube.api.spotify.logging')
-    @mock.patch('youspotube.api.spotify.time')
-    def test_Spotify_add_track_to_specific_position_in_playlist(self, time_mock, logging_mock):
+    def test_Spotify_add_track_batches_to_playlist(self, logging_mock):
         playlist_id = '2'
-        track_id = '1'
         playlist_details = {
             constants.ORIGIN_SPOTIFY: playlist_id
         }
-        tracks_to_add = [{
-            constants.SPOTIFY_TRACK_ID_DATA_KEY: track_id,
-            constants.TRACK_POSITION_DATA_KEY: 0
-        }]
-        expected_message = "Pushing track '%s' to Spotify playlist '%s'" % (
-            track_id,
-            playlist_id
-        )
-        self.spotify_mock._get_playlist_items.return_value = ['dummy']
+        tracks_to_add = ['dummy']
+        expected_debug_calls = [
+            call("Pushing tracks '1', '2' to Spotify playlist '%s'" % playlist_id),
+            call("Pushing tracks '3' to Spotify playlist '%s'" % playlist_id)
+        ]
+        self.spotify_mock._get_playlist_items.return_value = ['a', 'b']
+        self.spotify_mock._group_tracks_by_insertion_point.return_value = [(['1', '2'], 0), (['3'], None)]
+        on_pushed = Mock()
 
-        Spotify.add_tracks_to_playlist(self.spotify_mock, playlist_details, tracks_to_add)
+        Spotify.add_tracks_to_playlist(self.spotify_mock, playlist_details, tracks_to_add, on_pushed)
 
         self.spotify_mock._get_playlist_items.assert_called_once_with(playlist_id)
-        logging_mock.debug.assert_called_once_with(expected_message)
-        self.spotify_mock.connection.playlist_add_items.assert_called_once_with(playlist_id, [track_id], 0)
-        time_mock.sleep.assert_called_once_with(constants.SLEEP_BETWEEN_PLAYLIST_PUSHES)
+        self.spotify_mock._group_tracks_by_insertion_point.assert_called_once_with(tracks_to_add, 2)
+        logging_mock.debug.assert_has_calls(expected_debug_calls)
+        self.spotify_mock._push_tracks_to_playlist.assert_has_calls([
+            call(playlist_id, ['1', '2'], 0),
+            call(playlist_id, ['3'], None)
+        ])
+        on_pushed.assert_has_calls([call(2), call(1)])
+
+    def test_Spotify_push_tracks_to_playlist(self):
+        Spotify._push_tracks_to_playlist(self.spotify_mock, '1', ['2'], 0)
+
+        self.spotify_mock.rate_limiter.acquire.assert_called_once()
+        self.spotify_mock.connection.playlist_add_items.assert_called_once_with('1', ['2'], 0)
+        self.spotify_mock.rate_limiter.on_success.assert_called_once()
+        self.spotify_mock.rate_limiter.on_error.assert_not_called()
+
+    def test_Spotify_push_tracks_to_playlist_retry_when_throttled(self):
+        throttling_error = SpotifyException(429, -1, 'too many requests', headers={'Retry-After': '4'})
+        self.spotify_mock.connection.playlist_add_items.side_effect = [throttling_error, None]
+
+        Spotify._push_tracks_to_playlist(self.spotify_mock, '1', ['2'], 0)
+
+        self.assertEqual(self.spotify_mock.rate_limiter.acquire.call_count, 2)
+        self.assertEqual(self.spotify_mock.connection.playlist_add_items.call_count, 2)
+        self.spotify_mock.rate_limiter.on_error.assert_called_once_with(4)
+        self.spotify_mock.rate_limiter.on_success.assert_called_once()
+
+    def test_Spotify_push_tracks_to_playlist_give_up_after_max_attempts(self):
+        throttling_error = SpotifyException(503, -1, 'unavailable')
+        self.spotify_mock.connection.playlist_add_items.side_effect = throttling_error
+
+        with self.assertRaises(SpotifyException):
+            Spotify._push_tracks_to_playlist(self.spotify_mock, '1', ['2'], 0)
+
+        self.assertEqual(self.spotify_mock.connection.playlist_add_items.call_count, constants.MAX_PUSH_ATTEMPTS)
+        self.spotify_mock.rate_limiter.on_error.assert_has_calls([call(None)] * constants.MAX_PUSH_ATTEMPTS)
+        self.spotify_mock.rate_limiter.on_success.assert_not_called()
+
+    def test_Spotify_push_tracks_to_playlist_do_not_retry_unretryable_error(self):
+        self.spotify_mock.connection.playlist_add_items.side_effect = SpotifyException(404, -1, 'not found')
+
+        with self.assertRaises(SpotifyException):
+            Spotify._push_tracks_to_playlist(self.spotify_mock, '1', ['2'], 0)
+
+        self.spotify_mock.connection.playlist_add_items.assert_called_once()
+
+    def test_Spotify_group_tracks_by_insertion_point(self):
+        spotify = Spotify.__new__(Spotify)
+        tracks_to_add = []
+        for track_id, track_position in [('1', 0), ('2', 1), ('3', 3), ('4', 4), ('5', 9), ('6', 12), ('7', 13)]:
+            tracks_to_add.append({
+                constants.SPOTIFY_TRACK_ID_DATA_KEY: track_id,
+                constants.TRACK_POSITION_DATA_KEY: track_position
+            })
+
+        return_value = list(spotify._group_tracks_by_insertion_point(tracks_to_add, 5))
+
+        # tracks 1-4 fit in the playlist, tracks 5-7 go past its end (the playlist has 9 items when track 5 is pushed)
+        self.assertEqual(return_value, [(['1', '2'], 0), (['3', '4'], 3), (['5', '6', '7'], None)])
+
+    def test_Spotify_group_tracks_by_insertion_point_respects_batch_limit(self):
+        spotify = Spotify.__new__(Spotify)
+        batch_limit = constants.SPOTIFY_PLAYLIST_ADD_ITEMS_LIMIT
+        tracks_to_add = []
+        for track_position in range(batch_limit + 1):
+            tracks_to_add.append({
+                constants.SPOTIFY_TRACK_ID_DATA_KEY: str(track_position),
+                constants.TRACK_POSITION_DATA_KEY: track_position
+            })
+
+        return_value = list(spotify._group_tracks_by_insertion_point(tracks_to_add, 0))
+
+        self.assertEqual(len(return_value), 2)
+        self.assertEqual(len(return_value[0][0]), batch_limit)
+        self.assertEqual(return_value[1], ([str(batch_limit)], None))
+
+    def test_Spotify_group_tracks_by_insertion_point_yields_batch_before_next_track(self):
+        spotify = Spotify.__new__(Spotify)
+        consumed_track_ids = []
+
+        def tracks_to_add():
+            for track_id, track_position in [('1', 0), ('2', 5), ('3', 6)]:
+                consumed_track_ids.append(track_id)
+                yield {
+                    constants.SPOTIFY_TRACK_ID_DATA_KEY: track_id,
+                    constants.TRACK_POSITION_DATA_KEY: track_position
+                }
+
+        batches = spotify._group_tracks_by_insertion_point(tracks_to_add(), 10)
+
+        # the first batch is complete once a track cannot extend it, the tracks after that one are not consumed yet
+        self.assertEqual(next(batches), (['1'], 0))
+        self.assertEqual(consumed_track_ids, ['1', '2'])
+        self.assertEqual(list(batches), [(['2', '3'], 5)])
@@ -1,3 +1,5 @@
+import datetime
+import threading
 import unittest
 from unittest import mock
 from unittest.mock import Mock, call
@@ -5,7 +7,10 @@ from unittest.mock import Mock, call
 import os
 from googleapiclient.errors import HttpError
 from youspotube.api.youtube import YouTube
+from youspotube.exceptions import ExecutionError
 import youspotube.constants as constants
+from youspotube.util.page_cache import PageCache
+from youspotube.util.lookup_memo import LookupMemo
 from youspotube.util.tools import Tools
 from youtubesearchpython import VideoSortOrder
 
@@ -13,60 +18,89 @@ from youtubesearchpython import VideoSortOrder
 class YouTubeTest(unittest.TestCase):
     def setUp(self):
         self.youtube_mock = Mock()
+        self.youtube_mock.match_cache.get.return_value = None
+        self.youtube_mock.connection_lock = threading.RLock()
 
-    def test_YouTube_get_connection_without_init_connection(self):
-        self.youtube_mock._get_credentials.return_value.expired = False
+    def test_YouTube_get_connection_valid_credentials(self):
+        self.youtube_mock.credentials.expired = False
 
         return_value = YouTube.connection.__get__(self.youtube_mock)
 
-        self.youtube_mock._init_connection.assert_not_called()
+        self.youtube_mock._refresh_credentials.assert_not_called()
         self.assertIs(return_value, self.youtube_mock.youtube)
 
-    def test_YouTube_get_connection_with_init_connection(self):
-        credentials_mock = self.youtube_mock._get_credentials.return_value
-        credentials_mock.expired = True
+    def test_YouTube_get_connection_expired_credentials(self):
+        self.youtube_mock.credentials.expired = True
 
         return_value = YouTube.connection.__get__(self.youtube_mock)
 
-        self.youtube_mock._init_connection.assert_called_once_with(credentials_mock)
+        self.youtube_mock._refresh_credentials.assert_called_once_with()
+        self.youtube_mock._init_connection.assert_not_called()
         self.assertIs(return_value, self.youtube_mock.youtube)
 
     @mock.patch('youspotube.api.youtube.build')
-    def test_YouTube_init_connection_no_credentials_argument(self, build_mock):
+    def test_YouTube_init_connection(self, build_mock):
         credentials_mock = self.youtube_mock._get_credentials.return_value
-        credentials_mock.expired = False
 
         YouTube._init_connection(self.youtube_mock)
 
         self.youtube_mock._get_credentials.assert_called_once()
-        build_mock.assert_called_once_with(
-            'youtube',
-            'v3',
-            credentials=credentials_mock,
-            static_discovery=False,
-            cache_discovery=False
-        )
+        build_mock.assert_called_once_with('youtube', 'v3', credentials=credentials_mock, static_discovery=True,
+                                           requestBuilder=self.youtube_mock._build_request)
+        self.assertIs(self.youtube_mock.credentials, credentials_mock)
         self.assertIs(self.youtube_mock.youtube, build_mock.return_value)
 
-    @mock.patch('youspotube.api.youtube.Request')
     @mock.patch('youspotube.api.youtube.build')
-    def test_YouTube_init_connection_expired_credentials_as_argument(self, build_mock, request_mock):
-        credentials_mock = Mock()
-        credentials_mock.expired = True
+    def test_YouTube_init_connection_do_not_refresh_expired_credentials(self, build_mock):
+        self.youtube_mock._get_credentials.return_value.expired = True
+
+        YouTube._init_connection(self.youtube_mock)
+
+        # the test connection refreshes them, within the deadline of the health checks
+        self.youtube_mock._refresh_credentials.assert_not_called()
+        self.assertIs(self.youtube_mock.youtube, build_mock.return_value)
 
-        YouTube._init_connection(self.youtube_mock, credentials_mock)
+    @mock.patch('youspotube.api.youtube.HttpRequest')
+    @mock.patch('youspotube.api.youtube.AuthorizedHttp')
+    @mock.patch('youspotube.api.youtube.httplib2')
+    def test_YouTube_build_request_one_connection_per_thread(self, httplib2_mock, authorized_http_mock, http_request_mock):
+        self.youtube_mock.thread_local = threading.local()
+        thread_requests = []
+
+        YouTube._build_request(self.youtube_mock, 'shared_http', 'postproc', 'uri', method='GET')
+        YouTube._build_request(self.youtube_mock, 'shared_http', 'postproc', 'uri', method='GET')
+        thread = threading.Thread(target=lambda: thread_requests.append(
+            YouTube._build_request(self.youtube_mock, 'shared_http', 'postproc', 'uri', method='GET')
+        ))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(authorized_http_mock.call_count, 2)
+        httplib2_mock.Http.assert_called_with(timeout=constants.YOUTUBE_REQUEST_TIMEOUT_SECONDS)
+        authorized_http_mock.assert_called_with(self.youtube_mock.credentials, http=httplib2_mock.Http.return_value)
+        http_request_mock.assert_called_with(authorized_http_mock.return_value, 'postproc', 'uri', method='GET')
+        self.assertEqual(http_request_mock.call_count, 3)
+
+    @mock.patch('youspotube.api.youtube.Request')
+    def test_YouTube_refresh_credentials(self, request_mock):
+        credentials_mock = self.youtube_mock.credentials
+
+        YouTube._refresh_credentials(self.youtube_mock)
 
-        self.youtube_mock._get_credentials.assert_not_called()
         credentials_mock.refresh.assert_called_once_with(request_mock.return_value)
         self.youtube_mock._save_credentials.assert_called_once_with(credentials_mock)
-        build_mock.assert_called_once_with(
-            'youtube',
-            'v3',
-            credentials=credentials_mock,
-            static_discovery=False,
-            cache_discovery=False
-        )
-        self.assertIs(self.youtube_mock.youtube, build_mock.return_value)
+
+    def test_YouTube_get_credentials_expires_at(self):
+        self.youtube_mock.credentials.expiry = datetime.datetime(2022, 1, 1, 12, 0, 0)
+
+        return_value = YouTube._get_credentials_expires_at(self.youtube_mock)
+
+        self.assertEqual(return_value, 1641038400)
+
+    def test_YouTube_get_credentials_expires_at_no_expiry(self):
+        self.youtube_mock.credentials.expiry = None
+
+        self.assertIsNone(YouTube._get_credentials_expires_at(self.youtube_mock))
 
     @mock.patch('builtins.open')
     @mock.patch('youspotube.api.youtube.InstalledAppFlow')
@@ -132,9 +166,8 @@ class YouTubeTest(unittest.TestCase):
         self.assertIs(return_value, credentials_mock)
 
     @mock.patch('youspotube.api.youtube.pickle')
-    @mock.patch('builtins.open')
     @mock.patch('youspotube.api.youtube.Tools')
-    def test_YouTube_save_credentials(self, tools_mock, open_mock, pickle_mock):
+    def test_YouTube_save_credentials(self, tools_mock, pickle_mock):
         credentials_mock = Mock()
         credentials_file_path = os.path.join('.', 'credentials_file')
         tools_mock.get_filepath_relative_to_ysptb.return_value = credentials_file_path
@@ -142,56 +175,262 @@ class YouTubeTest(unittest.TestCase):
         YouTube._save_credentials(self.youtube_mock, credentials_mock)
 
         tools_mock.get_filepath_relative_to_ysptb.assert_called_once_with(constants.YOUTUBE_TOKEN_STORAGE_FILE)
-        open_mock.assert_called_once_with(credentials_file_path, 'wb')
-        pickle_mock.dump.assert_called_once_with(credentials_mock, open_mock.return_value.__enter__.return_value)
+        pickle_mock.dumps.assert_called_once_with(credentials_mock)
+        tools_mock.write_file_atomically.assert_called_once_with(
+            credentials_file_path,
+            pickle_mock.dumps.return_value,
+            'wb'
+        )
+
+    @mock.patch('youspotube.api.youtube.logging')
+    def test_YouTube_test_connection(self, logging_mock):
+        playlists = {
+            'First': {constants.ORIGIN_YOUTUBE: 'PL1', constants.ORIGIN_SPOTIFY: 'sp1'},
+            'Second': {constants.ORIGIN_YOUTUBE: 'PL2', constants.ORIGIN_SPOTIFY: 'sp2'}
+        }
+        self.youtube_mock.credentials.valid = True
+        playlists_request_mock = self.youtube_mock.connection.playlists.return_value
+        list_request_mock = playlists_request_mock.list.return_value
+        list_request_mock.execute.return_value = {'items': [{'id': 'PL1'}]}
+
+        YouTube._test_connection(self.youtube_mock, playlists)
+
+        playlists_request_mock.list.assert_called_once_with(
+            part='id',
+            id='PL1,PL2',
+            maxResults=constants.YOUTUBE_MAX_RESULTS_PER_PAGE,
+            fields=constants.YOUTUBE_PLAYLISTS_ID_FIELDS
+        )
+        list_request_mock.execute.assert_called_once()
+        logging_mock.warning.assert_called_once_with(
+            "YouTube playlist 'PL2' of playlist 'Second' from the configuration file does not exist or is not accessible"
+        )
+
+    def test_YouTube_test_connection_invalid_credentials(self):
+        self.youtube_mock.credentials.valid = False
+
+        with self.assertRaises(ValueError):
+            YouTube._test_connection(self.youtube_mock, {})
+
+        self.youtube_mock.connection.playlists.assert_not_called()
+
+    def test_YouTube_test_connection_get_connection_before_checking_credentials(self):
+        # getting the connection refreshes expired credentials, which are not valid until then
+        connection_mock = mock.PropertyMock()
+        type(self.youtube_mock).connection = connection_mock
+        self.youtube_mock.credentials.valid = False
+
+        with self.assertRaises(ValueError):
+            YouTube._test_connection(self.youtube_mock, {})
+
+        connection_mock.assert_called_once_with()
+
+    @mock.patch('youspotube.api.youtube.BaseAPI.__init__')
+    def test_YouTube_creation(self, base_init_mock):
+        youtube = YouTube(1, 2, {}, 'cache', 'limiter', 3)
+
+        base_init_mock.assert_called_once_with(1, 2, {}, 'cache', 'limiter', 3)
+        self.assertIsInstance(youtube.playlist_items_page_cache, PageCache)
+
+    def test_YouTube_get_playlist_items(self):
+        self.youtube_mock._get_playlist_items_pages.return_value = [
+            {'items': ['item1', 'item2'], 'nextPageToken': 'token'},
+            {'items': ['item3']}
+        ]
 
-    def test_YouTube_test_connection(self):
-        channels_request_mock = self.youtube_mock.connection.channels.return_value
-        list_request_mock = channels_request_mock.list.return_value
+        return_value = YouTube._get_playlist_items(self.youtube_mock, 'PL1')
 
-        YouTube._test_connection(self.youtube_mock)
+        self.youtube_mock._get_playlist_items_pages.assert_called_once_with('PL1')
+        self.assertEqual(return_value, ['item1', 'item2', 'item3'])
 
-        channels_request_mock.list.assert_called_once_with(
-            part="snippet,contentDetails,statistics",
-            id="UC_x5XG1OV2P6uZZ5FSM9Ttw"
+    def test_YouTube_get_playlist_items_pages(self):
+        pages = [
+            {'items': ['item1', 'item2'], 'nextPageToken': 'token'},
+            {'items': ['item3']}
+        ]
+        self.youtube_mock._get_playlist_items_page.side_effect = pages
+
+        return_value = list(YouTube._get_playlist_items_pages(self.youtube_mock, 'PL1'))
+
+        self.youtube_mock._get_playlist_items_page.assert_has_calls([call('PL1', None), call('PL1', 'token')])
+        self.assertEqual(return_value, pages)
+
+    def test_YouTube_get_playlist_items_etags(self):
+        not_found_response = Mock()
+        not_found_response.status = 404
+        pages_by_playlist_id = {
+            'PL1': [{'etag': 'e1', 'nextPageToken': 'token'}, {'etag': 'e2'}],
+            'PL2': [{'etag': 'e1'}, {'etag': 'e3'}]
+        }
+
+        def get_playlist_items_pages(playlist_id):
+            if playlist_id not in pages_by_playlist_id:
+                raise HttpError(not_found_response, bytes([]))
+            return iter(pages_by_playlist_id[playlist_id])
+
+        self.youtube_mock._get_playlist_items_pages.side_effect = get_playlist_items_pages
+
+        return_value = YouTube.get_playlist_items_etags(self.youtube_mock, ['PL1', 'PL2', 'PL3', 'PL1'])
+
+        self.assertEqual(self.youtube_mock._get_playlist_items_pages.call_count, 3)
+        self.assertEqual(set(return_value), {'PL1', 'PL2'})
+        self.assertNotEqual(return_value['PL1'], return_value['PL2'])
+
+    def test_YouTube_get_playlist_items_etags_error(self):
+        error_response = Mock()
+        error_response.status = 403
+        self.youtube_mock._get_playlist_items_pages.side_effect = HttpError(error_response, bytes([]))
+
+        with self.assertRaises(HttpError):
+            YouTube.get_playlist_items_etags(self.youtube_mock, ['PL1'])
+
+    def test_YouTube_get_playlist_items_page_not_cached(self):
+        self.youtube_mock.playlist_items_page_cache = PageCache()
+        list_mock = self.youtube_mock.connection.playlistItems.return_value.list
+        list_mock.return_value.headers = {}
+        page = {'etag': 'etag1', 'items': []}
+        list_mock.return_value.execute.return_value = page
+
+        return_value = YouTube._get_playlist_items_page(self.youtube_mock, 'PL1', 'token')
+
+        list_mock.assert_called_once_with(
+            part='snippet,contentDetails',
+            playlistId='PL1',
+            maxResults=constants.YOUTUBE_MAX_RESULTS_PER_PAGE,
+            pageToken='token',
+            fields=constants.YOUTUBE_PLAYLIST_ITEMS_FIELDS
         )
-        list_request_mock.execute.assert_called_once()
+        self.assertNotIn('If-None-Match', list_mock.return_value.headers)
+        cache_key = ('PL1', 'token', constants.YOUTUBE_PLAYLIST_ITEMS_FIELDS)
+        self.assertIs(self.youtube_mock.playlist_items_page_cache.get(cache_key), page)
+        self.assertIs(return_value, page)
+
+    def test_YouTube_get_playlist_items_page_not_modified(self):
+        cached_page = {'etag': 'etag1', 'items': ['item1']}
+        cache_key = ('PL1', None, constants.YOUTUBE_PLAYLIST_ITEMS_FIELDS)
+        self.youtube_mock.playlist_items_page_cache = PageCache()
+        self.youtube_mock.playlist_items_page_cache.put(cache_key, cached_page)
+        list_mock = self.youtube_mock.connection.playlistItems.return_value.list
+        list_mock.return_value.headers = {}
+        not_modified_response = Mock()
+        not_modified_response.status = 304
+        list_mock.return_value.execute.side_effect = HttpError(not_modified_response, bytes([]))
+
+        return_value = YouTube._get_playlist_items_page(self.youtube_mock, 'PL1', None)
+
+        self.assertEqual(list_mock.return_value.headers['If-None-Match'], 'etag1')
+        self.assertIs(return_value, cached_page)
+
+    def test_YouTube_get_playlist_items_page_modified(self):
+        page = {'etag': 'etag2', 'items': ['item2']}
+        cache_key = ('PL1', None, constants.YOUTUBE_PLAYLIST_ITEMS_FIELDS)
+        self.youtube_mock.playlist_items_page_cache = PageCache()
+        self.youtube_mock.playlist_items_page_cache.put(cache_key, {'etag': 'etag1'})
+        list_mock = self.youtube_mock.connection.playlistItems.return_value.list
+        list_mock.return_value.headers = {}
+        list_mock.return_value.execute.return_value = page
+
+        return_value = YouTube._get_playlist_items_page(self.youtube_mock, 'PL1', None)
+
+        self.assertIs(self.youtube_mock.playlist_items_page_cache.get(cache_key), page)
+        self.assertIs(return_value, page)
+
+    def test_YouTube_get_playlist_items_page_error(self):
+        self.youtube_mock.playlist_items_page_cache = PageCache()
+        list_mock = self.youtube_mock.connection.playlistItems.return_value.list
+        list_mock.return_value.headers = {}
+        error_response = Mock()
+        error_response.status = 304
+        list_mock.return_value.execute.side_effect = HttpError(error_response, bytes([]))
+
+        # without a cached page there is nothing that could not have been modified
+        with self.assertRaises(HttpError):
+            YouTube._get_playlist_items_page(self.youtube_mock, 'PL1', None)
+
+    def test_YouTube_get_playlist_etags(self):
+        playlist_ids = ['PL%s' % index for index in range(constants.YOUTUBE_MAX_RESULTS_PER_PAGE + 1)]
+        playlist_ids.append('PL0')
+        list_mock = self.youtube_mock.connection.playlists.return_value.list
+        list_mock.return_value.execute.side_effect = [
+            {'items': [{'id': 'PL0', 'etag': 'e0'}, {'id': 'PL1', 'etag': 'e1'}]},
+            {'items': [{'id': 'PL50', 'etag': 'e50'}]}
+        ]
 
-    def test_YouTube_spotify_playlist_to_video_ids_no_video_results(self):
-        expected_track_id = '1'
+        return_value = YouTube.get_playlist_etags(self.youtube_mock, playlist_ids)
+
+        list_mock.assert_has_calls([
+            call(
+                part='contentDetails',
+                id=','.join(playlist_ids[:constants.YOUTUBE_MAX_RESULTS_PER_PAGE]),
+                maxResults=constants.YOUTUBE_MAX_RESULTS_PER_PAGE,
+                fields=constants.YOUTUBE_PLAYLISTS_ETAG_FIELDS
+            ),
+            call().execute(),
+            call(
+                part='contentDetails',
+                id='PL50',
+                maxResults=constants.YOUTUBE_MAX_RESULTS_PER_PAGE,
+                fields=constants.YOUTUBE_PLAYLISTS_ETAG_FIELDS
+            ),
+            call().execute()
+        ])
+        self.assertEqual(return_value, {'PL0': 'e0', 'PL1': 'e1', 'PL50': 'e50'})
+
+    def test_YouTube_spotify_playlist_to_video_ids(self):
         spotify_playlist = {
-            expected_track_id: {}
+            '1': {'name': 'first'},
+            '2': {'name': 'second'},
+            '3': {'name': 'third'}
         }
-        self.youtube_mock._lookup_spotify_track_on_youtube.return_value = None, None
+        self.youtube_mock.search_workers = 2
+        self.youtube_mock._run_search.side_effect = lambda search, *args: search(*args)
+        self.youtube_mock.lookup_memo = LookupMemo()
+        self.youtube_mock._lookup_spotify_track_on_youtube.side_effect = lambda track, track_id: (
+            track['name'] + '_video',
+            None
+        )
+        self.youtube_mock._get_video_ids_from_lookups.side_effect = list
 
         return_value = YouTube.spotify_playlist_to_video_ids(self.youtube_mock, spotify_playlist)
 
-        self.youtube_mock._lookup_spotify_track_on_youtube.assert_called_once_with(
-            spotify_playlist[expected_track_id],
-            expected_track_id
+        self.youtube_mock._lookup_spotify_track_on_youtube.assert_has_calls(
+            [call(spotify_playlist[track_id], track_id) for track_id in spotify_playlist],
+            any_order=True
         )
+        self.assertEqual(return_value, [('first_video', None), ('second_video', None), ('third_video', None)])
+
+    def test_YouTube_spotify_playlist_to_video_ids_look_up_track_once_per_run(self):
+        self.youtube_mock.search_workers = 2
+        self.youtube_mock._run_search.side_effect = lambda search, *args: search(*args)
+        self.youtube_mock.lookup_memo = LookupMemo()
+        self.youtube_mock._lookup_spotify_track_on_youtube.return_value = 'video', None
+        self.youtube_mock._get_video_ids_from_lookups.side_effect = list
+
+        YouTube.spotify_playlist_to_video_ids(self.youtube_mock, {'1': {'name': 'first'}})
+        return_value = YouTube.spotify_playlist_to_video_ids(self.youtube_mock, {'1': {'name': 'first'}})
+
+        self.youtube_mock._lookup_spotify_track_on_youtube.assert_called_once_with({'name': 'first'}, '1')
+        self.assertEqual(return_value, [('video', None)])
+
+    def test_YouTube_get_video_ids_from_lookups_no_video_results(self):
+        return_value = list(YouTube._get_video_ids_from_lookups(self.youtube_mock, [(None, None)]))
+
         self.assertEqual(return_value, [])
 
-    def test_YouTube_spotify_playlist_to_video_ids_video_results_available(self):
-        expected_track_id = '1'
+    def test_YouTube_get_video_ids_from_lookups_video_results_available(self):
         expected_video_id = '2'
-        spotify_playlist = {
-            expected_track_id: {}
-        }
         expected_search_results = ['dummy']
         expected_return_value = [{
             constants.YOUTUBE_VIDEO_ID_DATA_KEY: expected_video_id,
             constants.SEARCH_RESULTS_DATA_KEY: expected_search_results,
             constants.TRACK_POSITION_DATA_KEY: 0
         }]
-        self.youtube_mock._lookup_spotify_track_on_youtube.return_value = expected_video_id, expected_search_results
 
-        return_value = YouTube.spotify_playlist_to_video_ids(self.youtube_mock, spotify_playlist)
+        return_value = list(YouTube._get_video_ids_from_lookups(
+            self.youtube_mock,
+            [(None, None), (expected_video_id, expected_search_results)]
+        ))
 
-        self.youtube_mock._lookup_spotify_track_on_youtube.assert_called_once_with(
-            spotify_playlist[expected_track_id],
-            expected_track_id
-        )
         self.assertEqual(return_value, expected_return_value)
 
     @mock.patch('youspotube.api.youtube.logging')
@@ -225,62 +464,6 @@ class YouTubeTest(unittest.TestCase):
     @mock.patch('youspotube.api.youtube.CustomSearch')
     @mock.patch('youspotube.api.youtube.logging')
     def test_YouTube_lookup_track_on_youtube_no_results(self, logging_mock, custom_search_mock):
-        expected_track_id = '1'
-        track_name = 'Test'
-        track_artists = ['Tester', 'Testable']
-        track_duration_ms = 1000
-        expected_track_beautiful = Tools.get_track_string(track_name, track_artists, True)
-        expected_track_lookup_string = Tools.get_track_string(track_name, track_artists)
-        track = {
-            'name': track_name,
-            'artists': track_artists,
-            'duration_ms': track_duration_ms,
-        }
-        msg1 = "YouTube search query: %s" % expected_track_lookup_string
-        msg2 = "Could not find a relevant video in the top %s YouTube search results for: %s, checking the top %s results" % (
-            constants.INITIAL_SEARCH_LIMIT,
-            expected_track_beautiful,
-            constants.EXTENDED_SEARCH_LIMIT
-        )
-        expected_debug_calls = [call(msg1), call(msg2)]
-        expected_search_results = []
-        expected_video_results = []
-        expected_video_id_result = None
-        custom_search_mock.return_value.result.return_value = {
-            'result': expected_search_results
-        }
-        self.youtube_mock._get_tied_video_id_to_track_id.return_value = None
-        self.youtube_mock._get_relevant_videos_from_search_result.return_value = expected_video_results
-        self.youtube_mock._lookup_spotify_track_on_youtube.return_value = expected_video_id_result, expected_video_results
-
-        return_value1, return_value2 = YouTube._lookup_spotify_track_on_youtube(
-            self.youtube_mock,
-            track,
-            expected_track_id
-        )
-
-        self.youtube_mock._get_tied_video_id_to_track_id.assert_called_once_with(expected_track_id)
-        custom_search_mock.assert_called_once_with(
-            expected_track_lookup_string,
-            VideoSortOrder.relevance,
-            constants.INITIAL_SEARCH_LIMIT
-        )
-        self.youtube_mock._get_relevant_videos_from_search_result.assert_called_once_with(
-            track_duration_ms // 1000,
-            expected_search_results,
-            constants.INITIAL_SEARCH_LIMIT
-        )
-        logging_mock.debug.assert_has_calls(expected_debug_calls)
-        self.youtube_mock._lookup_spotify_track_on_youtube.assert_called_once_with(
-            track,
-            expected_track_id,
-            constants.EXTENDED_SEARCH_LIMIT
-        )
-        self.assertEqual([return_value1, return_value2], [expected_video_id_result, expected_video_results])
-
-    @mock.patch('youspotube.api.youtube.CustomSearch')
-    @mock.patch('youspotube.api.youtube.logging')
-    def test_YouTube_lookup_track_on_youtube_no_results_extended_limit(self, logging_mock, custom_search_mock):
         expected_track_id = '1'
         track_name = 'Test'
         track_artists = ['Tester', 'Testable']
@@ -297,20 +480,17 @@ class YouTubeTest(unittest.TestCase):
             constants.EXTENDED_SEARCH_LIMIT,
             expected_track_beautiful
         )
-        expected_search_results = []
-        expected_video_results = []
-        expected_video_id_result = None
+        expected_search_results = ['dummy', 'results']
         custom_search_mock.return_value.result.return_value = {
             'result': expected_search_results
         }
         self.youtube_mock._get_tied_video_id_to_track_id.return_value = None
-        self.youtube_mock._get_relevant_videos_from_search_result.return_value = expected_video_results
+        self.youtube_mock._get_relevant_videos_within_search_limits.return_value = [], constants.EXTENDED_SEARCH_LIMIT
 
         return_value1, return_value2 = YouTube._lookup_spotify_track_on_youtube(
             self.youtube_mock,
             track,
-            expected_track_id,
-            constants.EXTENDED_SEARCH_LIMIT
+            expected_track_id
         )
 
         self.youtube_mock._get_tied_video_id_to_track_id.assert_called_once_with(expected_track_id)
@@ -319,15 +499,16 @@ class YouTubeTest(unittest.TestCase):
             VideoSortOrder.relevance,
             constants.EXTENDED_SEARCH_LIMIT
         )
-        self.youtube_mock._get_relevant_videos_from_search_result.assert_called_once_with(
+        self.youtube_mock._get_relevant_videos_within_search_limits.assert_called_once_with(
             track_duration_ms // 1000,
             expected_search_results,
-            constants.EXTENDED_SEARCH_LIMIT
+            expected_track_beautiful
         )
         logging_mock.debug.assert_called_once_with(msg1)
         logging_mock.warning.assert_called_once_with(msg2)
-        self.youtube_mock._lookup_spotify_track_on_youtube.assert_not_called()
-        self.assertEqual([return_value1, return_value2], [expected_video_id_result, expected_video_results])
+        self.youtube_mock._count_lookup.assert_called_once_with(constants.LOOKUP_OUTCOME_NOT_FOUND)
+        self.youtube_mock._cache_match.assert_not_called()
+        self.assertEqual([return_value1, return_value2], [None, expected_search_results])
 
     @mock.patch('youspotube.api.youtube.CustomSearch')
     @mock.patch('youspotube.api.youtube.logging')
@@ -344,12 +525,13 @@ class YouTubeTest(unittest.TestCase):
         }
         expected_message = "YouTube search query: %s" % expected_track_lookup_string
         expected_result_video_id = '2'
-        expected_search_results = ['dummy', 'results']
+        search_results = ['dummy', 'results', 'beyond', 'the', 'initial', 'limit']
+        expected_search_results = search_results[:constants.INITIAL_SEARCH_LIMIT]
         custom_search_mock.return_value.result.return_value = {
-            'result': expected_search_results
+            'result': search_results
         }
         self.youtube_mock._get_tied_video_id_to_track_id.return_value = None
-        self.youtube_mock._get_relevant_videos_from_search_result.return_value = [
+        self.youtube_mock._get_relevant_videos_within_search_limits.return_value = [
             {
                 constants.YOUTUBE_VIDEO_ID_DATA_KEY: '3',
                 constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY: 20
@@ -358,7 +540,7 @@ class YouTubeTest(unittest.TestCase):
                 constants.YOUTUBE_VIDEO_ID_DATA_KEY: expected_result_video_id,
                 constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY: 10
             }
-        ]
+        ], constants.INITIAL_SEARCH_LIMIT
 
         return_value1, return_value2 = YouTube._lookup_spotify_track_on_youtube(
             self.youtube_mock,
@@ -370,16 +552,124 @@ class YouTubeTest(unittest.TestCase):
         custom_search_mock.assert_called_once_with(
             expected_track_lookup_string,
             VideoSortOrder.relevance,
-            constants.INITIAL_SEARCH_LIMIT
+            constants.EXTENDED_SEARCH_LIMIT
         )
+        logging_mock.debug.assert_called_once_with(expected_message)
+        self.youtube_mock._cache_match.assert_called_once_with(
+            expected_track_id,
+            {
+                constants.YOUTUBE_VIDEO_ID_DATA_KEY: expected_result_video_id,
+                constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY: 10
+            },
+            expected_search_results
+        )
+        self.assertEqual([return_value1, return_value2], [expected_result_video_id, expected_search_results])
+
+    def test_YouTube_get_relevant_videos_within_initial_search_limit(self):
+        expected_videos = [{constants.YOUTUBE_VIDEO_ID_DATA_KEY: '1'}]
+        videos_result = ['dummy', 'results']
+        self.youtube_mock._get_relevant_videos_from_search_result.return_value = expected_videos
+
+        return_value = YouTube._get_relevant_videos_within_search_limits(self.youtube_mock, 100, videos_result, 'Test')
+
         self.youtube_mock._get_relevant_videos_from_search_result.assert_called_once_with(
-            track_duration_ms // 1000,
-            expected_search_results,
+            100,
+            videos_result,
             constants.INITIAL_SEARCH_LIMIT
         )
+        self.youtube_mock._count_lookup.assert_called_once_with(constants.LOOKUP_OUTCOME_INITIAL_SEARCH)
+        self.assertEqual(return_value, (expected_videos, constants.INITIAL_SEARCH_LIMIT))
+
+    @mock.patch('youspotube.api.youtube.logging')
+    def test_YouTube_get_relevant_videos_within_extended_search_limit(self, logging_mock):
+        expected_videos = [{constants.YOUTUBE_VIDEO_ID_DATA_KEY: '1'}]
+        videos_result = ['dummy', 'results', 'beyond', 'the', 'initial', 'limit']
+        expected_message = "Could not find a relevant video in the top %s YouTube search results for: %s, " \
+            "checking the top %s results" % (constants.INITIAL_SEARCH_LIMIT, 'Test', constants.EXTENDED_SEARCH_LIMIT)
+        self.youtube_mock._get_relevant_videos_from_search_result.side_effect = [[], expected_videos]
+
+        return_value = YouTube._get_relevant_videos_within_search_limits(self.youtube_mock, 100, videos_result, 'Test')
+
+        self.youtube_mock._get_relevant_videos_from_search_result.assert_has_calls([
+            call(100, videos_result, constants.INITIAL_SEARCH_LIMIT),
+            call(
+                100,
+                videos_result[constants.INITIAL_SEARCH_LIMIT:],
+                constants.EXTENDED_SEARCH_LIMIT - constants.INITIAL_SEARCH_LIMIT
+            )
+        ])
         logging_mock.debug.assert_called_once_with(expected_message)
-        self.youtube_mock._lookup_spotify_track_on_youtube.assert_not_called()
-        self.assertEqual([return_value1, return_value2], [expected_result_video_id, expected_search_results])
+        self.youtube_mock._count_lookup.assert_called_once_with(constants.LOOKUP_OUTCOME_EXTENDED_SEARCH)
+        self.assertEqual(return_value, (expected_videos, constants.EXTENDED_SEARCH_LIMIT))
+
+    @mock.patch('youspotube.api.youtube.logging')
+    def test_YouTube_get_no_relevant_videos_within_search_limits(self, logging_mock):
+        self.youtube_mock._get_relevant_videos_from_search_result.return_value = []
+
+        return_value = YouTube._get_relevant_videos_within_search_limits(self.youtube_mock, 100, [], 'Test')
+
+        self.youtube_mock._count_lookup.assert_not_called()
+        self.assertEqual(return_value, ([], constants.EXTENDED_SEARCH_LIMIT))
+
+    @mock.patch('youspotube.api.youtube.CustomSearch')
+    @mock.patch('youspotube.api.youtube.logging')
+    def test_YouTube_lookup_track_on_youtube_cached_match(self, logging_mock, custom_search_mock):
+        expected_track_id = '1'
+        cached_video_id = '2'
+        cached_search_results = [{'id': '2', 'title': 'Test'}]
+        track = {
+            'name': 'Test',
+            'artists': ['Tester'],
+            'duration_ms': 1000,
+        }
+        expected_message = "Using cached video ID '%s' to track '%s' instead of looking it up on YouTube" % (
+            cached_video_id,
+            Tools.get_track_string('Test', ['Tester'], True)
+        )
+        self.youtube_mock._get_tied_video_id_to_track_id.return_value = None
+        self.youtube_mock.match_cache.get.return_value = cached_video_id, {
+            constants.SEARCH_RESULTS_DATA_KEY: cached_search_results
+        }
+
+        return_value1, return_value2 = YouTube._lookup_spotify_track_on_youtube(
+            self.youtube_mock,
+            track,
+            expected_track_id
+        )
+
+        self.youtube_mock.match_cache.get.assert_called_once_with(
+            constants.MATCH_CACHE_KIND_TRACK_TO_VIDEO,
+            expected_track_id
+        )
+        logging_mock.debug.assert_called_once_with(expected_message)
+        custom_search_mock.assert_not_called()
+        self.youtube_mock._cache_match.assert_not_called()
+        self.assertEqual([return_value1, return_value2], [cached_video_id, cached_search_results])
+
+    def test_YouTube_cache_match(self):
+        track_id = '1'
+        best_match_video = {
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: '2',
+            constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY: 4
+        }
+        videos_result = [{
+            'id': '2',
+            'title': 'Test',
+            'duration': '3:00',
+            'thumbnails': []
+        }]
+
+        YouTube._cache_match(self.youtube_mock, track_id, best_match_video, videos_result)
+
+        self.youtube_mock.match_cache.put.assert_called_once_with(
+            constants.MATCH_CACHE_KIND_TRACK_TO_VIDEO,
+            track_id,
+            '2',
+            {
+                constants.YOUTUBE_SPOTIFY_DURATION_DELTA_DATA_KEY: 4,
+                constants.SEARCH_RESULTS_DATA_KEY: [{'id': '2', 'title': 'Test'}]
+            }
+        )
 
     def test_YouTube_get_relevant_videos_from_search_result_search_limit_exceeded(self):
         search_result = ['if', 'this', 'data', 'is', 'used', 'failure', 'is', 'expected']
@@ -415,95 +705,155 @@ class YouTubeTest(unittest.TestCase):
         self.assertEqual(return_value, expected_relevant_videos)
 
     def test_YouTube_get_available_tied_video_id_to_track_id(self):
-        self.youtube_mock.tied_songs = {
-            'Test': {
-                constants.ORIGIN_SPOTIFY: '1',
-                constants.ORIGIN_YOUTUBE: '2'
-            }
-        }
+        self.youtube_mock.tied_video_ids_by_track_id = {'1': '2'}
 
         return_value = YouTube._get_tied_video_id_to_track_id(self.youtube_mock, '1')
 
         self.assertEqual(return_value, '2')
 
     def test_YouTube_get_unavailable_tied_video_id_to_track_id(self):
-        self.youtube_mock.tied_songs = {}
+        self.youtube_mock.tied_video_ids_by_track_id = {}
 
         return_value = YouTube._get_tied_video_id_to_track_id(self.youtube_mock, '1')
 
         self.assertEqual(return_value, None)
 
-    @mock.patch('youspotube.api.youtube.time')
     @mock.patch('youspotube.api.youtube.logging')
-    def test_YouTube_append_video_to_playlist_no_error(self, logging_mock, time_mock):
+    def test_YouTube_add_videos_to_playlist(self, logging_mock):
         playlist_id = '1'
-        video_id = '2'
-        position = 3
         playlist_details = {
             constants.ORIGIN_YOUTUBE: playlist_id
         }
-        videos = [{
-            constants.YOUTUBE_VIDEO_ID_DATA_KEY: video_id,
-            constants.TRACK_POSITION_DATA_KEY: position
-        }]
-        expected_msg = "Pushing video ID '%s' to YouTube playlist '%s'" % (video_id, playlist_id)
+        videos = [
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: '2'},
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: '3'}
+        ]
+        request_bodies = ['body1', 'body2']
+        responses = ['response1', 'response2']
+        playlist_video_ids = ['4']
+        self.youtube_mock._get_video_ids_from_youtube_playlist.return_value = playlist_video_ids
+        self.youtube_mock._get_playlist_insert_request_body.side_effect = request_bodies
+        self.youtube_mock._push_video_to_playlist.side_effect = responses
+        on_pushed = Mock()
+
+        YouTube.add_videos_to_playlist(self.youtube_mock, playlist_details, videos, on_pushed)
+
+        self.youtube_mock._get_playlist_items.assert_called_once_with(playlist_id)
+        self.youtube_mock._get_video_ids_from_youtube_playlist.assert_called_once_with(
+            self.youtube_mock._get_playlist_items.return_value
+        )
+        self.youtube_mock._get_playlist_insert_request_body.assert_has_calls([
+            call(playlist_id, videos[0], 1),
+            call(playlist_id, videos[1], 1)
+        ])
+        logging_mock.debug.assert_has_calls([
+            call("Pushing video ID '2' to YouTube playlist '1'"),
+            call("Pushing video ID '3' to YouTube playlist '1'")
+        ])
+        self.youtube_mock._push_video_to_playlist.assert_has_calls([
+            call(playlist_id, '2', 'body1'),
+            call(playlist_id, '3', 'body2')
+        ])
+        self.youtube_mock._update_playlist_video_ids.assert_has_calls([
+            call(playlist_video_ids, '2', 'response1'),
+            call(playlist_video_ids, '3', 'response2')
+        ])
+        on_pushed.assert_has_calls([call(1), call(1)])
+
+    @mock.patch('youspotube.api.youtube.logging')
+    def test_YouTube_add_videos_to_playlist_stop_on_failed_push(self, logging_mock):
+        playlist_details = {
+            constants.ORIGIN_YOUTUBE: '1'
+        }
+        videos = [
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: '2'},
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: '3'}
+        ]
+        self.youtube_mock._get_video_ids_from_youtube_playlist.return_value = []
+        self.youtube_mock._push_video_to_playlist.return_value = None
+        on_pushed = Mock()
+
+        with self.assertRaises(ExecutionError) as expected_error:
+            YouTube.add_videos_to_playlist(self.youtube_mock, playlist_details, videos, on_pushed)
+
+        self.youtube_mock._push_video_to_playlist.assert_called_once()
+        on_pushed.assert_not_called()
+        self.youtube_mock._update_playlist_video_ids.assert_not_called()
+        self.assertEqual(
+            str(expected_error.exception),
+            "Execution error: Stopped pushing to YouTube playlist '1' because video ID '2' could not be pushed"
+        )
+
+    def test_YouTube_get_playlist_insert_request_body_position_in_playlist_range(self):
+        video_data = {
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: '2',
+            constants.TRACK_POSITION_DATA_KEY: 3
+        }
         expected_request_body = {
             "snippet": {
-                "playlistId": playlist_id,
+                "playlistId": '1',
+                "position": 3,
                 "resourceId": {
                     "kind": "youtube#video",
-                    "videoId": video_id
+                    "videoId": '2'
                 }
             }
         }
+
+        return_value = YouTube._get_playlist_insert_request_body(self.youtube_mock, '1', video_data, 4)
+
+        self.assertEqual(return_value, expected_request_body)
+
+    def test_YouTube_get_playlist_insert_request_body_position_out_of_playlist_range(self):
+        video_data = {
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: '2',
+            constants.TRACK_POSITION_DATA_KEY: 3
+        }
+        expected_request_body = {
+            "snippet": {
+                "playlistId": '1',
+                "resourceId": {
+                    "kind": "youtube#video",
+                    "videoId": '2'
+                }
+            }
+        }
+
+        return_value = YouTube._get_playlist_insert_request_body(self.youtube_mock, '1', video_data, 3)
+
+        self.assertEqual(return_value, expected_request_body)
+
+    def test_YouTube_push_video_to_playlist_no_error(self):
+        request_body = {'snippet': {}}
         expected_request = self.youtube_mock.connection.playlistItems.return_value.insert.return_value
-        self.youtube_mock._get_playlist_items.return_value = []
 
-        YouTube.add_videos_to_playlist(self.youtube_mock, playlist_details, videos)
+        return_value = YouTube._push_video_to_playlist(self.youtube_mock, '1', '2', request_body)
 
-        self.youtube_mock._get_playlist_items.assert_called_once_with(playlist_id)
-        logging_mock.debug.assert_called_once_with(expected_msg)
         self.youtube_mock.connection.playlistItems.return_value.insert.assert_called_once_with(
             part='snippet',
-            body=expected_request_body
+            body=request_body,
+            fields=constants.YOUTUBE_PLAYLIST_ITEM_INSERT_FIELDS
         )
-        time_mock.sleep.assert_called_once_with(constants.SLEEP_BETWEEN_PLAYLIST_PUSHES)
+        self.youtube_mock.rate_limiter.acquire.assert_called_once()
         expected_request.execute.assert_called_once()
+        self.youtube_mock.rate_limiter.on_success.assert_called_once()
+        self.assertIs(return_value, expected_request.execute.return_value)
 
     @mock.patch.object(HttpError, '__str__')
-    @mock.patch('youspotube.api.youtube.time')
     @mock.patch('youspotube.api.youtube.logging')
-    def test_YouTube_append_video_to_playlist_http_error_one_retry_fail_after_it(self, logging_mock,
-                                                                                 time_mock, httperror_str_mock):
+    def test_YouTube_push_video_to_playlist_http_error_fail_after_retries(self, logging_mock, httperror_str_mock):
         playlist_id = '1'
         video_id = '2'
-        position = 3
-        playlist_details = {
-            constants.ORIGIN_YOUTUBE: playlist_id
-        }
-        videos = [{
-            constants.YOUTUBE_VIDEO_ID_DATA_KEY: video_id,
-            constants.TRACK_POSITION_DATA_KEY: position
-        }]
-        expected_request_body = {
-            "snippet": {
-                "playlistId": playlist_id,
-                "resourceId": {
-                    "kind": "youtube#video",
-                    "videoId": video_id
-                }
-            }
-        }
+        request_body = {'snippet': {}}
         expected_error_msg = 'http failure'
-        expected_dbg1 = "Pushing video ID '%s' to YouTube playlist '%s'" % (video_id, playlist_id)
-        expected_dbg2 = "An error has occurred while pushing video ID '%s' to YouTube playlist '%s': %s" % (
+        expected_dbg1 = "An error has occurred while pushing video ID '%s' to YouTube playlist '%s': %s" % (
             video_id,
             playlist_id,
             expected_error_msg
         )
-        expected_dbg3 = "Request was: %s" % expected_request_body
-        expected_dbg4 = "Response was: None"
-        expected_debug_calls = [call(expected_dbg1), call(expected_dbg2), call(expected_dbg3), call(expected_dbg4)]
+        expected_dbg2 = "Request was: %s" % request_body
+        expected_dbg3 = "Response was: None"
+        expected_debug_calls = [call(expected_dbg1), call(expected_dbg2), call(expected_dbg3)]
         expected_wrn = "An error has occurred while pushing video ID '%s' to YouTube playlist '%s'" % (
             video_id,
             playlist_id
@@ -511,25 +861,50 @@ class YouTubeTest(unittest.TestCase):
         expected_request = self.youtube_mock.connection.playlistItems.return_value.insert.return_value
         expected_response = Mock()
         expected_response.status = 400
+        expected_response.get.return_value = '5'
         expected_request.execute.side_effect = Mock(side_effect=HttpError(expected_response, bytes([])))
-
         httperror_str_mock.return_value = expected_error_msg
-        self.youtube_mock._get_playlist_items.return_value = []
 
-        YouTube.add_videos_to_playlist(self.youtube_mock, playlist_details, videos)
+        return_value = YouTube._push_video_to_playlist(self.youtube_mock, playlist_id, video_id, request_body)
 
-        self.youtube_mock._get_playlist_items.assert_called_once_with(playlist_id)
-        self.youtube_mock.connection.playlistItems.return_value.insert.assert_called_once_with(
-            part='snippet',
-            body=expected_request_body
-        )
-        time_mock.sleep.assert_has_calls([
-            call(constants.SLEEP_BETWEEN_PLAYLIST_PUSHES),
-            call(constants.SLEEP_BETWEEN_PLAYLIST_PUSHES)
-        ])
-        expected_request.execute.assert_has_calls([call(), call()])
+        self.assertEqual(self.youtube_mock.rate_limiter.acquire.call_count, constants.MAX_PUSH_ATTEMPTS)
+        self.assertEqual(expected_request.execute.call_count, constants.MAX_PUSH_ATTEMPTS)
+        expected_response.get.assert_called_with('retry-after')
+        self.youtube_mock.rate_limiter.on_error.assert_has_calls([call(5)] * constants.MAX_PUSH_ATTEMPTS)
+        self.youtube_mock.rate_limiter.on_success.assert_not_called()
         logging_mock.warning.assert_called_once_with(expected_wrn)
         logging_mock.debug.assert_has_calls(expected_debug_calls)
+        self.assertIsNone(return_value)
+
+    def test_YouTube_push_video_to_playlist_success_after_retry(self):
+        expected_request = self.youtube_mock.connection.playlistItems.return_value.insert.return_value
+        expected_response = Mock()
+        expected_response.status = 429
+        expected_response.get.return_value = None
+        expected_request.execute.side_effect = [HttpError(expected_response, bytes([])), 'response']
+
+        return_value = YouTube._push_video_to_playlist(self.youtube_mock, '1', '2', {})
+
+        self.youtube_mock.rate_limiter.on_error.assert_called_once_with(None)
+        self.youtube_mock.rate_limiter.on_success.assert_called_once()
+        self.assertEqual(return_value, 'response')
+
+    def test_YouTube_update_playlist_video_ids(self):
+        playlist_video_ids = ['1', '2']
+
+        YouTube._update_playlist_video_ids(self.youtube_mock, playlist_video_ids, '3', {'snippet': {'position': 1}})
+        YouTube._update_playlist_video_ids(self.youtube_mock, playlist_video_ids, '4', {})
+
+        self.assertEqual(playlist_video_ids, ['1', '3', '2', '4'])
+
+    def test_YouTube_get_video_ids_from_youtube_playlist(self):
+        playlist_items = [{
+            'contentDetails': {
+                'videoId': '1'
+            }
+        }]
+
+        self.assertEqual(YouTube._get_video_ids_from_youtube_playlist(self.youtube_mock, playlist_items), ['1'])
 
     def test_YouTube_get_missing_videos_in_playlist_all_missing(self):
         playlist_id = '1'
@@ -540,18 +915,18 @@ class YouTubeTest(unittest.TestCase):
         videos = [{
             constants.YOUTUBE_VIDEO_ID_DATA_KEY: video_id
         }]
-        all_missing_videos = videos
         playlist_items = []
-        expected_return_value = [video_id]
 
         self.youtube_mock._get_playlist_items.return_value = playlist_items
-        self.youtube_mock._find_actually_missing_videos.return_value = expected_return_value
+        self.youtube_mock._get_video_ids_from_youtube_playlist.return_value = []
+        self.youtube_mock._get_video_titles_from_youtube_playlist.return_value = ['title']
+        self.youtube_mock._is_video_actually_missing.return_value = True
 
-        return_value = YouTube.get_missing_videos_in_playlist(self.youtube_mock, playlist_details, videos)
+        return_value = list(YouTube.get_missing_videos_in_playlist(self.youtube_mock, playlist_details, videos))
 
         self.youtube_mock._get_playlist_items.assert_called_once_with(playlist_id)
-        self.youtube_mock._find_actually_missing_videos.assert_called_once_with(all_missing_videos, playlist_items)
-        self.assertEqual(return_value, expected_return_value)
+        self.youtube_mock._is_video_actually_missing.assert_called_once_with(videos[0], {'title'})
+        self.assertEqual(return_value, videos)
 
     def test_YouTube_get_missing_videos_in_playlist_none_missing(self):
         playlist_id = '1'
@@ -562,19 +937,162 @@ class YouTubeTest(unittest.TestCase):
         videos = [{
             constants.YOUTUBE_VIDEO_ID_DATA_KEY: video_id
         }]
-        all_missing_videos = []
         playlist_items = [{
             'contentDetails': {
                 'videoId': video_id
             }
         }]
-        expected_return_value = [video_id]
 
         self.youtube_mock._get_playlist_items.return_value = playlist_items
-        self.youtube_mock._find_actually_missing_videos.return_value = expected_return_value
+        self.youtube_mock._get_video_ids_from_youtube_playlist.return_value = [video_id]
+        self.youtube_mock._get_video_titles_from_youtube_playlist.return_value = []
 
-        return_value = YouTube.get_missing_videos_in_playlist(self.youtube_mock, playlist_details, videos)
+        return_value = list(YouTube.get_missing_videos_in_playlist(self.youtube_mock, playlist_details, videos))
 
         self.youtube_mock._get_playlist_items.assert_called_once_with(playlist_id)
-        self.youtube_mock._find_actually_missing_videos.assert_called_once_with(all_missing_videos, playlist_items)
-        self.assertEqual(return_value, expected_return_value)
+        self.youtube_mock._is_video_actually_missing.assert_not_called()
+        self.assertEqual(return_value, [])
+
+    def test_YouTube_get_missing_videos_in_playlist_yields_missing_video_before_next_one(self):
+        playlist_details = {
+            constants.ORIGIN_YOUTUBE: '1'
+        }
+        consumed_video_ids = []
+
+        def videos():
+            for video_id in ['2', '3']:
+                consumed_video_ids.append(video_id)
+                yield {
+                    constants.YOUTUBE_VIDEO_ID_DATA_KEY: video_id
+                }
+
+        self.youtube_mock._get_playlist_items.return_value = []
+        self.youtube_mock._get_video_ids_from_youtube_playlist.return_value = []
+        self.youtube_mock._get_video_titles_from_youtube_playlist.return_value = []
+        self.youtube_mock._is_video_actually_missing.return_value = True
+
+        missing_videos = YouTube.get_missing_videos_in_playlist(self.youtube_mock, playlist_details, videos())
+
+        self.assertEqual(next(missing_videos), {constants.YOUTUBE_VIDEO_ID_DATA_KEY: '2'})
+        self.assertEqual(consumed_video_ids, ['2'])
+
+    def test_YouTube_get_relevant_spotify_tracks(self):
+        tied_track = {
+            constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: None
+        }
+        relevant_track = {
+            constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: 'Test relevant'
+        }
+        irrelevant_track = {
+            constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: 'Test irrelevant',
+            constants.YOUTUBE_VIDEO_TITLE_DATA_KEY: 'Irrelevant'
+        }
+        self.youtube_mock.search_workers = 2
+        self.youtube_mock._run_search.side_effect = lambda search, *args: search(*args)
+        self.youtube_mock._is_track_verified.side_effect = lambda track: YouTube._is_track_verified(self.youtube_mock,
+                                                                                                    track)
+        self.youtube_mock._is_spotify_track_relevant.side_effect = lambda track: track is relevant_track
+
+        with mock.patch('youspotube.api.youtube.logging') as logging_mock:
+            return_value = list(YouTube.get_relevant_spotify_tracks(
+                self.youtube_mock,
+                [tied_track, relevant_track, irrelevant_track]
+            ))
+
+        self.youtube_mock._is_spotify_track_relevant.assert_has_calls([call(relevant_track), call(irrelevant_track)],
+                                                                      any_order=True)
+        logging_mock.warning.assert_called_once_with(
+            "Could not find a relevant track on YouTube for: Irrelevant, song cannot be synchronized"
+        )
+        self.assertEqual(return_value, [tied_track, relevant_track])
+
+    @mock.patch('youspotube.api.youtube.CustomSearch')
+    def test_YouTube_is_spotify_track_relevant_cached_verification(self, custom_search_mock):
+        track = {
+            constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: 'Test',
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: '1',
+            constants.SPOTIFY_TRACK_ID_DATA_KEY: '2'
+        }
+        self.youtube_mock._get_cached_match_details_to_verify.return_value = {
+            constants.MATCH_VERIFIED_DATA_KEY: False
+        }
+
+        self.assertFalse(YouTube._is_spotify_track_relevant(self.youtube_mock, track))
+
+        self.youtube_mock._get_cached_match_details_to_verify.assert_called_once_with('1', '2')
+        custom_search_mock.assert_not_called()
+        self.youtube_mock.match_cache.update_details.assert_not_called()
+
+    @mock.patch('youspotube.api.youtube.CustomSearch')
+    def test_YouTube_is_spotify_track_relevant_verify_and_cache(self, custom_search_mock):
+        track = {
+            constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: 'Test',
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: '1',
+            constants.SPOTIFY_TRACK_ID_DATA_KEY: '2'
+        }
+        match_details = {
+            constants.MATCH_VERIFIED_DATA_KEY: None
+        }
+        self.youtube_mock._get_cached_match_details_to_verify.return_value = match_details
+        custom_search_mock.return_value.result.return_value = {
+            'result': [{'id': '3'}, {'id': '1'}]
+        }
+
+        self.assertTrue(YouTube._is_spotify_track_relevant(self.youtube_mock, track))
+
+        custom_search_mock.assert_called_once_with('Test', VideoSortOrder.relevance, constants.YOUTUBE_SEARCH_LIMIT)
+        self.youtube_mock.match_cache.update_details.assert_called_once_with(
+            constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK,
+            '1',
+            '2',
+            {
+                constants.MATCH_VERIFIED_DATA_KEY: True
+            }
+        )
+
+    @mock.patch('youspotube.api.youtube.CustomSearch')
+    def test_YouTube_is_spotify_track_relevant_without_cached_match(self, custom_search_mock):
+        track = {
+            constants.SPOTIFY_TRACK_TITLE_ARTISTS_DATA_KEY: 'Test',
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: '1',
+            constants.SPOTIFY_TRACK_ID_DATA_KEY: '2'
+        }
+        self.youtube_mock._get_cached_match_details_to_verify.return_value = None
+        custom_search_mock.return_value.result.return_value = {
+            'result': [{'id': '3'}]
+        }
+
+        self.assertFalse(YouTube._is_spotify_track_relevant(self.youtube_mock, track))
+
+        self.youtube_mock.match_cache.update_details.assert_not_called()
+
+    def test_YouTube_get_cached_match_details_to_verify(self):
+        match_details = {
+            constants.MATCH_VERIFIED_DATA_KEY: None
+        }
+        self.youtube_mock.match_cache.get.return_value = '2', match_details
+
+        self.assertIs(YouTube._get_cached_match_details_to_verify(self.youtube_mock, '1', '2'), match_details)
+        self.assertIsNone(YouTube._get_cached_match_details_to_verify(self.youtube_mock, '1', '3'))
+        self.youtube_mock.match_cache.get.assert_called_with(constants.MATCH_CACHE_KIND_VIDEO_TO_TRACK, '1')
+
+        self.youtube_mock.match_cache.get.return_value = None
+
+        self.assertIsNone(YouTube._get_cached_match_details_to_verify(self.youtube_mock, '1', '2'))
+
+    def test_YouTube_is_video_actually_missing(self):
+        youtube = YouTube.__new__(YouTube)
+        playlist_video_titles = {'Already in the playlist'}
+        tied_video = {
+            constants.SEARCH_RESULTS_DATA_KEY: None
+        }
+        video_with_title_in_playlist = {
+            constants.SEARCH_RESULTS_DATA_KEY: [{'title': 'Something else'}, {'title': 'Already in the playlist'}]
+        }
+        missing_video = {
+            constants.SEARCH_RESULTS_DATA_KEY: [{'title': 'Something else'}]
+        }
+
+        self.assertTrue(youtube._is_video_actually_missing(tied_video, playlist_video_titles))
+        self.assertFalse(youtube._is_video_actually_missing(video_with_title_in_playlist, playlist_video_titles))
+        self.assertTrue(youtube._is_video_actually_missing(missing_video, playlist_video_titles))
@@ -1,8 +1,9 @@
 import unittest
 from unittest import mock
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
 from youspotube.configuration.configurator import Configuration
+from youspotube.exceptions import ConfigurationError
 import youspotube.constants as constants
 
 
@@ -15,7 +16,14 @@ class ConfigurationTest(unittest.TestCase):
             constants.SPOTIFY_CLIENT_ID_PARAMETER: '',
             constants.SPOTIFY_CLIENT_SECRET_PARAMETER: '',
             constants.PLAYLISTS_PARAMETER: {},
-            constants.TIED_SONGS_PARAMETER: {}
+            constants.TIED_SONGS_PARAMETER: {},
+            constants.MATCH_CACHE_TTL_HOURS_PARAMETER: constants.MATCH_CACHE_DEFAULT_TTL_HOURS,
+            constants.MATCH_CACHE_MAX_ENTRIES_PARAMETER: constants.MATCH_CACHE_DEFAULT_MAX_ENTRIES,
+            constants.SPOTIFY_PUSHES_PER_MINUTE_PARAMETER: constants.SPOTIFY_DEFAULT_PUSHES_PER_MINUTE,
+            constants.YOUTUBE_PUSHES_PER_MINUTE_PARAMETER: constants.YOUTUBE_DEFAULT_PUSHES_PER_MINUTE,
+            constants.SEARCH_WORKERS_PARAMETER: constants.DEFAULT_SEARCH_WORKERS,
+            constants.PLAYLIST_WORKERS_PARAMETER: constants.DEFAULT_PLAYLIST_WORKERS,
+            constants.POLL_INTERVAL_SECONDS_PARAMETER: constants.DEFAULT_POLL_INTERVAL_SECONDS
         }
         self.configuration = Configuration()
 
@@ -36,9 +44,10 @@ class ConfigurationTest(unittest.TestCase):
         validator_mock.assert_called_once_with(self.params)
         validator_mock.return_value.check_params.assert_called_once()
 
+    @mock.patch('youspotube.configuration.configurator.RateLimiter')
     @mock.patch('youspotube.configuration.configurator.YouTube')
     @mock.patch('youspotube.configuration.configurator.Spotify')
-    def test_Configuration_connect_apis(self, spotify_mock, youtube_mock):
+    def test_Configuration_connect_apis(self, spotify_mock, youtube_mock, rate_limiter_mock):
         expected_spotify_client_id = 'aa'
         expected_spotify_secret = 'bb'
         expected_youtube_client_id = 'cc'
@@ -47,14 +56,173 @@ class ConfigurationTest(unittest.TestCase):
         self.configuration.params[constants.SPOTIFY_CLIENT_SECRET_PARAMETER] = expected_spotify_secret
         self.configuration.params[constants.YOUTUBE_CLIENT_ID_PARAMETER] = expected_youtube_client_id
         self.configuration.params[constants.YOUTUBE_CLIENT_SECRET_PARAMETER] = expected_youtube_client_secret
+        match_cache = Mock()
+        self.configuration.match_cache = match_cache
+        spotify_rate_limiter = Mock()
+        youtube_rate_limiter = Mock()
+        rate_limiter_mock.side_effect = [spotify_rate_limiter, youtube_rate_limiter]
 
         self.configuration.connect_apis()
 
-        spotify_mock.assert_called_once_with(expected_spotify_client_id, expected_spotify_secret, {})
-        youtube_mock.assert_called_once_with(expected_youtube_client_id, expected_youtube_client_secret, {})
+        rate_limiter_mock.assert_has_calls([
+            call('Spotify', constants.SPOTIFY_DEFAULT_PUSHES_PER_MINUTE),
+            call('YouTube', constants.YOUTUBE_DEFAULT_PUSHES_PER_MINUTE)
+        ])
+        spotify_mock.assert_called_once_with(
+            expected_spotify_client_id,
+            expected_spotify_secret,
+            {},
+            match_cache,
+            spotify_rate_limiter,
+            constants.DEFAULT_SEARCH_WORKERS
+        )
+        youtube_mock.assert_called_once_with(
+            expected_youtube_client_id,
+            expected_youtube_client_secret,
+            {},
+            match_cache,
+            youtube_rate_limiter,
+            constants.DEFAULT_SEARCH_WORKERS
+        )
         self.assertIs(self.configuration.spotify_connection, spotify_mock.return_value)
         self.assertIs(self.configuration.youtube_connection, youtube_mock.return_value)
 
+    @mock.patch('youspotube.configuration.configurator.RateLimiter')
+    @mock.patch('youspotube.configuration.configurator.YouTube')
+    @mock.patch('youspotube.configuration.configurator.Spotify')
+    def test_Configuration_connect_apis_youtube_error(self, spotify_mock, youtube_mock, rate_limiter_mock):
+        self.configuration.match_cache = Mock()
+        youtube_mock.side_effect = ConfigurationError('bad api')
+
+        with self.assertRaises(ConfigurationError):
+            self.configuration.connect_apis()
+
+        spotify_mock.return_value.disconnect.assert_called_once_with()
+
+    def test_Configuration_start_credential_refreshers(self):
+        self.configuration.spotify_connection = Mock()
+        self.configuration.youtube_connection = Mock()
+
+        self.configuration.start_credential_refreshers()
+
+        self.configuration.spotify_connection.start_credential_refresher.assert_called_once_with()
+        self.configuration.youtube_connection.start_credential_refresher.assert_called_once_with()
+
+    def test_Configuration_disconnect_apis(self):
+        self.configuration.spotify_connection = Mock()
+        self.configuration.youtube_connection = Mock()
+
+        self.configuration.disconnect_apis()
+
+        self.configuration.spotify_connection.disconnect.assert_called_once_with()
+        self.configuration.youtube_connection.disconnect.assert_called_once_with()
+
+    @mock.patch('youspotube.configuration.configurator.logging')
+    @mock.patch('youspotube.configuration.configurator.Tools')
+    @mock.patch('youspotube.configuration.configurator.MatchCache')
+    def test_Configuration_init_match_cache_without_invalidation(self, match_cache_mock, tools_mock, logging_mock):
+        match_cache_mock.return_value.prune.return_value = 3, 4
+
+        self.configuration.init_match_cache()
+
+        tools_mock.get_filepath_relative_to_ysptb.assert_called_once_with(constants.MATCH_CACHE_STORAGE_FILE)
+        match_cache_mock.assert_called_once_with(
+            tools_mock.get_filepath_relative_to_ysptb.return_value,
+            constants.MATCH_CACHE_DEFAULT_TTL_HOURS * 3600,
+            constants.MATCH_CACHE_DEFAULT_MAX_ENTRIES
+        )
+        match_cache_mock.return_value.prune.assert_called_once()
+        match_cache_mock.return_value.invalidate.assert_not_called()
+        logging_mock.debug.assert_called_once_with("Removed 3 expired and 4 excess matches from the match cache")
+        self.assertIs(self.configuration.match_cache, match_cache_mock.return_value)
+
+    @mock.patch('youspotube.configuration.configurator.logging')
+    def test_Configuration_prune_match_cache(self, logging_mock):
+        self.configuration.match_cache = Mock()
+        self.configuration.match_cache.prune.return_value = 1, 0
+
+        self.configuration.prune_match_cache()
+
+        self.configuration.match_cache.prune.assert_called_once_with()
+        logging_mock.debug.assert_called_once_with("Removed 1 expired and 0 excess matches from the match cache")
+
+    @mock.patch('youspotube.configuration.configurator.logging')
+    @mock.patch('youspotube.configuration.configurator.Tools')
+    @mock.patch('youspotube.configuration.configurator.MatchCache')
+    def test_Configuration_init_match_cache_with_invalidation(self, match_cache_mock, tools_mock, logging_mock):
+        invalidated_ids = ['aa', 'bb']
+        match_cache_mock.return_value.prune.return_value = 0, 0
+        match_cache_mock.return_value.invalidate.return_value = 2
+
+        self.configuration.init_match_cache(invalidated_ids)
+
+        match_cache_mock.return_value.invalidate.assert_called_once_with(invalidated_ids)
+        logging_mock.info.assert_called_once_with("Invalidated 2 matches in the match cache")
+
+    @mock.patch('youspotube.configuration.configurator.HttpUtil')
+    @mock.patch('youspotube.configuration.configurator.Tools')
+    @mock.patch('youspotube.configuration.configurator.HealthCheck')
+    def test_Configuration_check_health(self, health_check_mock, tools_mock, httputil_mock):
+        self.configuration.spotify_connection = Mock()
+        self.configuration.youtube_connection = Mock()
+
+        self.configuration.check_health()
+
+        tools_mock.get_filepath_relative_to_ysptb.assert_called_once_with(constants.HEALTH_CHECK_STORAGE_FILE)
+        health_check_mock.assert_called_once_with(tools_mock.get_filepath_relative_to_ysptb.return_value)
+        probes = health_check_mock.return_value.run.call_args[0][0]
+        self.assertEqual(
+            list(probes),
+            [constants.SPOTIFY_API_URL, constants.YOUTUBE_API_URL, 'Spotify API', 'YouTube API']
+        )
+        probes[constants.SPOTIFY_API_URL]()
+        probes[constants.YOUTUBE_API_URL]()
+        httputil_mock.check_connectivity.assert_has_calls([
+            call(constants.SPOTIFY_API_URL),
+            call(constants.YOUTUBE_API_URL)
+        ])
+        probes['Spotify API']()
+        probes['YouTube API']()
+        self.configuration.spotify_connection.test_connection.assert_called_once_with(
+            self.params[constants.PLAYLISTS_PARAMETER]
+        )
+        self.configuration.youtube_connection.test_connection.assert_called_once_with(
+            self.params[constants.PLAYLISTS_PARAMETER]
+        )
+
+    @mock.patch('youspotube.configuration.configurator.logging')
+    @mock.patch('youspotube.configuration.configurator.Tools')
+    @mock.patch('youspotube.configuration.configurator.SyncState')
+    def test_Configuration_init_sync_state(self, sync_state_mock, tools_mock, logging_mock):
+        self.configuration.init_sync_state()
+
+        tools_mock.get_filepath_relative_to_ysptb.assert_called_once_with(constants.SYNC_STATE_STORAGE_FILE)
+        sync_state_mock.assert_called_once_with(tools_mock.get_filepath_relative_to_ysptb.return_value)
+        sync_state_mock.return_value.clear.assert_not_called()
+        self.assertIs(self.configuration.get_sync_state(), sync_state_mock.return_value)
+
+    @mock.patch('youspotube.configuration.configurator.logging')
+    @mock.patch('youspotube.configuration.configurator.Tools')
+    @mock.patch('youspotube.configuration.configurator.SyncState')
+    def test_Configuration_init_sync_state_full_sync(self, sync_state_mock, tools_mock, logging_mock):
+        sync_state_mock.return_value.clear.return_value = 3
+
+        self.configuration.init_sync_state(True)
+
+        sync_state_mock.return_value.clear.assert_called_once()
+        logging_mock.info.assert_called_once_with(
+            "Forgot the synchronized versions of 3 playlists, all playlists will be synchronized"
+        )
+
+    @mock.patch('youspotube.configuration.configurator.Tools')
+    @mock.patch('youspotube.configuration.configurator.PushOutbox')
+    def test_Configuration_init_push_outbox(self, push_outbox_mock, tools_mock):
+        self.configuration.init_push_outbox()
+
+        tools_mock.get_filepath_relative_to_ysptb.assert_called_once_with(constants.PUSH_OUTBOX_STORAGE_FILE)
+        push_outbox_mock.assert_called_once_with(tools_mock.get_filepath_relative_to_ysptb.return_value)
+        self.assertIs(self.configuration.get_push_outbox(), push_outbox_mock.return_value)
+
     def test_Configuration_get_params(self):
         self.assertEqual(self.configuration.get_params(), self.params)
 
@@ -92,6 +92,37 @@ class CfgFileParameterCollectorTest(unittest.TestCase):
             "Configuration error: Parameter '%s' has an empty value in the configuration file" % constants.ORIGIN_PARAMETER
         )
 
+    def test_CfgFileParameterCollector_cfg_validation_no_error_when_optional_param_is_missing_in_cfg_file(self):
+        self.params[constants.MATCH_CACHE_TTL_HOURS_PARAMETER] = 1
+        cfg_file_params = {
+            constants.ORIGIN_PARAMETER: 'aa',
+            constants.YOUTUBE_CLIENT_ID_PARAMETER: 'dd',
+            constants.SPOTIFY_CLIENT_ID_PARAMETER: 'bb',
+            constants.SPOTIFY_CLIENT_SECRET_PARAMETER: 'cc',
+            constants.PLAYLISTS_PARAMETER: {'gg': {}},
+            constants.TIED_SONGS_PARAMETER: {}
+        }
+        self.collector.parsed_cfg_file = cfg_file_params
+
+        self.collector._validate_cfg()
+
+    def test_CfgFileParameterCollector_copy_cfg_values_keep_default_of_missing_optional_param(self):
+        self.params[constants.MATCH_CACHE_TTL_HOURS_PARAMETER] = 1
+        cfg_file_params = {
+            constants.ORIGIN_PARAMETER: 'aa',
+            constants.YOUTUBE_CLIENT_ID_PARAMETER: 'dd',
+            constants.SPOTIFY_CLIENT_ID_PARAMETER: 'bb',
+            constants.SPOTIFY_CLIENT_SECRET_PARAMETER: 'cc',
+            constants.PLAYLISTS_PARAMETER: {'gg'},
+            constants.TIED_SONGS_PARAMETER: {'ee'}
+        }
+        self.collector.parsed_cfg_file = cfg_file_params
+
+        self.collector._copy_cfg_values()
+
+        self.assertEqual(self.collector.params[constants.MATCH_CACHE_TTL_HOURS_PARAMETER], 1)
+        self.assertEqual(self.collector.params[constants.PLAYLISTS_PARAMETER], {'gg'})
+
     def test_CfgFileParameterCollector_copy_cfg_values(self):
         cfg_file_params = {
             constants.ORIGIN_PARAMETER: 'aa',
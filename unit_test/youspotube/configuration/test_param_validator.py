@@ -157,14 +157,36 @@ class ParameterValidatorTest(unittest.TestCase):
 
         check_song_playlist_mock.assert_called_once_with(playlists, 'playlist')
 
+    @mock.patch.object(ParameterValidator, 'check_song_playlist', mock.Mock())
+    def test_ParameterValidator_check_playlists_poll_interval_seconds(self):
+        playlists = {
+            'a': {constants.POLL_INTERVAL_SECONDS_PARAMETER: 30},
+            'b': {}
+        }
+
+        self.validator.check_playlists(playlists)
+
+    @mock.patch.object(ParameterValidator, 'check_song_playlist', mock.Mock())
+    def test_ParameterValidator_check_playlists_bad_poll_interval_seconds(self):
+        for poll_interval_seconds in [0, '30', 1.5]:
+            with self.assertRaises(ConfigurationError) as expected_error:
+                self.validator.check_playlists({'a': {constants.POLL_INTERVAL_SECONDS_PARAMETER: poll_interval_seconds}})
+
+            self.assertEqual(
+                str(expected_error.exception),
+                "Configuration error: Field '%s' of playlist 'a' should be a positive integer in the configuration file" %
+                constants.POLL_INTERVAL_SECONDS_PARAMETER
+            )
+
     @mock.patch.object(ParameterValidator, 'check_song_playlist')
     def test_ParameterValidator_do_not_check_tied_songs_if_there_are_none(self, check_song_playlist_mock):
         self.validator.check_tied_songs({})
 
         check_song_playlist_mock.assert_not_called()
 
+    @mock.patch.object(ParameterValidator, 'check_tied_songs_unique_ids')
     @mock.patch.object(ParameterValidator, 'check_song_playlist')
-    def test_ParameterValidator_check_tied_songs(self, check_song_playlist_mock):
+    def test_ParameterValidator_check_tied_songs(self, check_song_playlist_mock, check_tied_songs_unique_ids_mock):
         tied_songs = {
             'DesiSlava - Toxic': {
                 constants.ORIGIN_YOUTUBE: 'aa',
@@ -175,3 +197,97 @@ class ParameterValidatorTest(unittest.TestCase):
         self.validator.check_tied_songs(tied_songs)
 
         check_song_playlist_mock.assert_called_once_with(tied_songs, 'tied song')
+        check_tied_songs_unique_ids_mock.assert_has_calls([
+            mock.call(tied_songs, constants.ORIGIN_YOUTUBE),
+            mock.call(tied_songs, constants.ORIGIN_SPOTIFY)
+        ])
+
+    def test_ParameterValidator_no_error_on_unique_tied_songs(self):
+        tied_songs = {
+            'DesiSlava - Toxic': {
+                constants.ORIGIN_YOUTUBE: 'aa',
+                constants.ORIGIN_SPOTIFY: 'bb'
+            },
+            'Azis - Motel': {
+                constants.ORIGIN_YOUTUBE: 'cc',
+                constants.ORIGIN_SPOTIFY: 'dd'
+            }
+        }
+
+        for origin in constants.ORIGINS:
+            self.validator.check_tied_songs_unique_ids(tied_songs, origin)
+
+    def test_ParameterValidator_raise_error_on_conflicting_tied_songs(self):
+        tied_songs = {
+            'DesiSlava - Toxic': {
+                constants.ORIGIN_YOUTUBE: 'aa',
+                constants.ORIGIN_SPOTIFY: 'bb'
+            },
+            'DesiSlava - Toxic (live)': {
+                constants.ORIGIN_YOUTUBE: 'cc',
+                constants.ORIGIN_SPOTIFY: 'bb'
+            }
+        }
+
+        with self.assertRaises(ConfigurationError) as expected_error:
+            self.validator.check_tied_songs_unique_ids(tied_songs, constants.ORIGIN_SPOTIFY)
+
+        self.assertEqual(
+            str(expected_error.exception),
+            "Configuration error: Tied songs 'DesiSlava - Toxic' and 'DesiSlava - Toxic (live)' have the same value 'bb' "
+            "for the field 'spotify' in the configuration file"
+        )
+
+    def test_ParameterValidator_raise_error_on_non_positive_integer(self):
+        with self.assertRaises(ConfigurationError) as expected_error:
+            self.validator.check_positive_integer(0, 'some_parameter')
+
+        self.assertEqual(
+            str(expected_error.exception),
+            "Configuration error: Parameter 'some_parameter' should be a positive integer in the configuration file"
+        )
+
+    def test_ParameterValidator_no_error_on_positive_integer(self):
+        self.validator.check_positive_integer(1, 'some_parameter')
+
+    @mock.patch.object(ParameterValidator, 'check_positive_integer')
+    def test_ParameterValidator_check_match_cache_ttl_hours(self, check_positive_integer_mock):
+        self.validator.check_match_cache_ttl_hours(5)
+
+        check_positive_integer_mock.assert_called_once_with(5, constants.MATCH_CACHE_TTL_HOURS_PARAMETER)
+
+    @mock.patch.object(ParameterValidator, 'check_positive_integer')
+    def test_ParameterValidator_check_match_cache_max_entries(self, check_positive_integer_mock):
+        self.validator.check_match_cache_max_entries(5)
+
+        check_positive_integer_mock.assert_called_once_with(5, constants.MATCH_CACHE_MAX_ENTRIES_PARAMETER)
+
+    @mock.patch.object(ParameterValidator, 'check_positive_integer')
+    def test_ParameterValidator_check_spotify_pushes_per_minute(self, check_positive_integer_mock):
+        self.validator.check_spotify_pushes_per_minute(5)
+
+        check_positive_integer_mock.assert_called_once_with(5, constants.SPOTIFY_PUSHES_PER_MINUTE_PARAMETER)
+
+    @mock.patch.object(ParameterValidator, 'check_positive_integer')
+    def test_ParameterValidator_check_youtube_pushes_per_minute(self, check_positive_integer_mock):
+        self.validator.check_youtube_pushes_per_minute(5)
+
+        check_positive_integer_mock.assert_called_once_with(5, constants.YOUTUBE_PUSHES_PER_MINUTE_PARAMETER)
+
+    @mock.patch.object(ParameterValidator, 'check_positive_integer')
+    def test_ParameterValidator_check_search_workers(self, check_positive_integer_mock):
+        self.validator.check_search_workers(5)
+
+        check_positive_integer_mock.assert_called_once_with(5, constants.SEARCH_WORKERS_PARAMETER)
+
+    @mock.patch.object(ParameterValidator, 'check_positive_integer')
+    def test_ParameterValidator_check_playlist_workers(self, check_positive_integer_mock):
+        self.validator.check_playlist_workers(5)
+
+        check_positive_integer_mock.assert_called_once_with(5, constants.PLAYLIST_WORKERS_PARAMETER)
+
+    @mock.patch.object(ParameterValidator, 'check_positive_integer')
+    def test_ParameterValidator_check_poll_interval_seconds(self, check_positive_integer_mock):
+        self.validator.check_poll_interval_seconds(30)
+
+        check_positive_integer_mock.assert_called_once_with(30, constants.POLL_INTERVAL_SECONDS_PARAMETER)
@@ -1,3 +1,5 @@
+import threading
+import time
 import unittest
 from unittest import mock
 from unittest.mock import Mock, call
@@ -12,6 +14,9 @@ class ExecutionTest(unittest.TestCase):
         self.config = Mock()
         self.spotify = self.config.get_spotify_connection.return_value
         self.youtube = self.config.get_youtube_connection.return_value
+        self.push_outbox = self.config.get_push_outbox.return_value
+        self.push_outbox.get_run.return_value = None
+        self.push_outbox.get_pending.return_value = []
 
         self.playlist_names = ['Various', 'Chalga']
         self.youtube_playlists = ['ytp1', 'ytp2']
@@ -41,7 +46,10 @@ class ExecutionTest(unittest.TestCase):
                     constants.ORIGIN_YOUTUBE: self.youtube_tied_songs[1],
                     constants.ORIGIN_SPOTIFY: self.spotify_tied_songs[1]
                 }
-            }
+            },
+            constants.SEARCH_WORKERS_PARAMETER: 1,
+            constants.PLAYLIST_WORKERS_PARAMETER: 2,
+            constants.POLL_INTERVAL_SECONDS_PARAMETER: 60
         }
 
         self.config.get_params.return_value = self.params
@@ -52,10 +60,12 @@ class ExecutionTest(unittest.TestCase):
         self.assertIs(self.execution.config, self.config)
         self.assertIs(self.execution.params, self.params)
 
+    @mock.patch.object(Execution, 'log_lookup_counts')
     @mock.patch.object(Execution, 'sync_playlists')
     @mock.patch.object(Execution, 'get_sync_direction')
     @mock.patch('youspotube.execution.executor.logging')
-    def test_Execution_execute(self, logging_mock, get_sync_direction_mock, sync_playlists_mock):
+    def test_Execution_execute(self, logging_mock, get_sync_direction_mock, sync_playlists_mock, log_lookup_counts_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
         sync_direction = 'Spotify -> YouTube'
         get_sync_direction_mock.return_value = sync_direction
         expected_logging_message = "Synchronizing playlists: %s" % sync_direction
@@ -63,7 +73,35 @@ class ExecutionTest(unittest.TestCase):
         self.execution.execute()
 
         logging_mock.info.assert_called_once_with(expected_logging_message)
+        self.push_outbox.get_run.assert_has_calls([
+            call(constants.ORIGIN_SPOTIFY, self.spotify_playlists[0], self.youtube_playlists[0]),
+            call(constants.ORIGIN_SPOTIFY, self.spotify_playlists[1], self.youtube_playlists[1])
+        ])
         sync_playlists_mock.assert_called_once()
+        log_lookup_counts_mock.assert_called_once()
+
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_log_lookup_counts(self, logging_mock):
+        self.execution.youtube.get_lookup_counts.return_value = {
+            constants.LOOKUP_OUTCOME_INITIAL_SEARCH: 5,
+            constants.LOOKUP_OUTCOME_EXTENDED_SEARCH: 2
+        }
+        expected_logging_message = "Spotify tracks looked up on YouTube: 5 %s, 2 %s" % (
+            constants.LOOKUP_OUTCOME_INITIAL_SEARCH,
+            constants.LOOKUP_OUTCOME_EXTENDED_SEARCH
+        )
+
+        self.execution.log_lookup_counts()
+
+        logging_mock.info.assert_called_once_with(expected_logging_message)
+
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_do_not_log_lookup_counts_without_lookups(self, logging_mock):
+        self.execution.youtube.get_lookup_counts.return_value = {}
+
+        self.execution.log_lookup_counts()
+
+        logging_mock.info.assert_not_called()
 
     def test_Execution_sync_direction_Spotify_to_YouTube(self):
         dashes = '-' * 10
@@ -91,10 +129,14 @@ class ExecutionTest(unittest.TestCase):
         self.assertEqual(str(expected_error.exception), err_msg)
         logging.info.assert_not_called()
 
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'is_playlist_unchanged', Mock(return_value=False))
+    @mock.patch.object(Execution, 'get_playlists_versions', Mock(return_value={}))
     @mock.patch.object(Execution, 'sync_from_spotify')
     @mock.patch('youspotube.execution.executor.logging')
-    def test_Execution_sync_playlists_known_origin(self, logging_mock, sync_from_spotify_mock):
+    def test_Execution_sync_playlists_known_origin(self, logging_mock, sync_from_spotify_mock, save_playlists_versions_mock):
         self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        sync_from_spotify_mock.return_value = 1, 2, 1
 
         expected_info_calls = []
         expected_sync_from_spotify_calls = []
@@ -108,12 +150,24 @@ class ExecutionTest(unittest.TestCase):
 
         self.execution.sync_playlists()
 
-        logging_mock.info.assert_has_calls(expected_info_calls)
-        sync_from_spotify_mock.assert_has_calls(expected_sync_from_spotify_calls)
-
+        # the playlists are synchronized simultaneously, so their messages can be interleaved
+        logging_mock.info.assert_has_calls(expected_info_calls, any_order=True)
+        sync_from_spotify_mock.assert_has_calls(expected_sync_from_spotify_calls, any_order=True)
+        save_playlists_versions_mock.assert_called_once_with(self.playlist_names, {},
+                                                             self.params[constants.PLAYLISTS_PARAMETER])
+        logging_mock.info.assert_has_calls([
+            call("Summary of the synchronized playlists:"),
+            call("- '%s': found 1/2 songs, pushed 1" % self.playlist_names[0]),
+            call("- '%s': found 1/2 songs, pushed 1" % self.playlist_names[1])
+        ])
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'is_playlist_unchanged', Mock(return_value=False))
+    @mock.patch.object(Execution, 'get_playlists_versions', Mock(return_value={}))
     @mock.patch.object(Execution, 'sync_from_spotify')
     @mock.patch('youspotube.execution.executor.logging')
-    def test_Execution_sync_playlists_known_origin_sync_error(self, logging_mock, sync_from_spotify_mock):
+    def test_Execution_sync_playlists_known_origin_sync_error(self, logging_mock, sync_from_spotify_mock,
+                                                              save_playlists_versions_mock):
         self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
         expected_error_message = 'sync failure'
         sync_from_spotify_mock.side_effect = Exception(expected_error_message)
@@ -135,88 +189,832 @@ class ExecutionTest(unittest.TestCase):
 
         self.execution.sync_playlists()
 
-        logging_mock.info.assert_has_calls(expected_info_calls)
-        sync_from_spotify_mock.assert_has_calls(expected_sync_from_spotify_calls)
-        logging_mock.warning.assert_has_calls(expected_warning_calls)
+        logging_mock.info.assert_has_calls(expected_info_calls, any_order=True)
+        sync_from_spotify_mock.assert_has_calls(expected_sync_from_spotify_calls, any_order=True)
+        logging_mock.warning.assert_has_calls(expected_warning_calls, any_order=True)
+        save_playlists_versions_mock.assert_called_once_with([], {}, self.params[constants.PLAYLISTS_PARAMETER])
+        logging_mock.info.assert_has_calls([
+            call("- '%s': failed, %s" % (self.playlist_names[0], expected_error_message)),
+            call("- '%s': failed, %s" % (self.playlist_names[1], expected_error_message))
+        ])
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'is_playlist_unchanged')
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch.object(Execution, 'sync_from_spotify')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_sync_playlists_skip_unchanged_playlist(self, logging_mock, sync_from_spotify_mock,
+                                                              get_playlists_versions_mock, is_playlist_unchanged_mock,
+                                                              save_playlists_versions_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        is_playlist_unchanged_mock.side_effect = lambda playlist_name, playlists_versions: \
+            playlist_name == self.playlist_names[0]
+        sync_from_spotify_mock.return_value = 2, 2, 0
+
+        self.execution.sync_playlists()
+
+        is_playlist_unchanged_mock.assert_has_calls([
+            call(self.playlist_names[0], get_playlists_versions_mock.return_value),
+            call(self.playlist_names[1], get_playlists_versions_mock.return_value)
+        ])
+        logging_mock.info.assert_any_call(
+            "Skipping playlist '%s' from the configuration file, it has not changed since it was last synchronized" %
+            self.playlist_names[0]
+        )
+        sync_from_spotify_mock.assert_called_once_with(self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[1]])
+        save_playlists_versions_mock.assert_called_once_with(
+            [self.playlist_names[1]],
+            get_playlists_versions_mock.return_value,
+            self.params[constants.PLAYLISTS_PARAMETER]
+        )
+        logging_mock.info.assert_has_calls([
+            call("- '%s': skipped, it has not changed since it was last synchronized" % self.playlist_names[0]),
+            call("- '%s': found 2/2 songs, pushed 0" % self.playlist_names[1])
+        ])
+
+    @mock.patch.object(Execution, 'save_playlists_versions', Mock())
+    @mock.patch.object(Execution, 'is_playlist_unchanged', Mock(return_value=False))
+    @mock.patch.object(Execution, 'get_playlists_versions', Mock(return_value={}))
+    @mock.patch.object(Execution, 'sync_from_spotify')
+    @mock.patch('youspotube.execution.executor.logging', Mock())
+    def test_Execution_sync_playlists_simultaneously(self, sync_from_spotify_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        both_playlists_syncing = threading.Barrier(2, timeout=5)
+
+        def sync_from_spotify(playlist_details):
+            # each playlist waits for the other one, so they only finish if they are synchronized at the same time
+            both_playlists_syncing.wait()
+            return 1, 1, 1
+
+        sync_from_spotify_mock.side_effect = sync_from_spotify
+
+        self.execution.sync_playlists()
+
+        self.assertEqual(sync_from_spotify_mock.call_count, 2)
+        self.assertFalse(both_playlists_syncing.broken)
+
+    @mock.patch.object(Execution, 'save_playlists_versions', Mock())
+    @mock.patch.object(Execution, 'is_playlist_unchanged', Mock(return_value=False))
+    @mock.patch.object(Execution, 'get_playlists_versions', Mock(return_value={}))
+    @mock.patch.object(Execution, 'sync_from_spotify')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_sync_playlists_with_same_target_one_after_another(self, logging_mock, sync_from_spotify_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        self.params[constants.PLAYLISTS_PARAMETER]['Chalga'][constants.ORIGIN_YOUTUBE] = self.youtube_playlists[0]
+        self.params[constants.PLAYLISTS_PARAMETER]['Pop'] = {
+            constants.ORIGIN_YOUTUBE: 'ytp3',
+            constants.ORIGIN_SPOTIFY: 'sp3'
+        }
+        target_playlists = {self.youtube_playlists[0]: [], 'ytp3': []}
+        syncing_playlists = []
+        syncing_playlists_lock = threading.Lock()
+
+        def sync_from_spotify(playlist_details):
+            with syncing_playlists_lock:
+                syncing_playlists.append(playlist_details[constants.ORIGIN_SPOTIFY])
+                concurrently_syncing_playlists = list(syncing_playlists)
+            # both playlists push the same song unless the second one diffs the target after the first one pushed
+            target_playlist = target_playlists[playlist_details[constants.ORIGIN_YOUTUBE]]
+            is_song_missing = 'v1' not in target_playlist
+            time.sleep(0.05)
+            if is_song_missing:
+                target_playlist.append('v1')
+            with syncing_playlists_lock:
+                syncing_playlists.remove(playlist_details[constants.ORIGIN_SPOTIFY])
+            self.assertFalse({'sp1', 'sp2'}.issubset(concurrently_syncing_playlists))
+            return 1, 1, int(is_song_missing)
+
+        sync_from_spotify_mock.side_effect = sync_from_spotify
+
+        self.execution.sync_playlists()
+
+        self.assertEqual(sync_from_spotify_mock.call_count, 3)
+        self.assertEqual(target_playlists, {self.youtube_playlists[0]: ['v1'], 'ytp3': ['v1']})
+        logging_mock.info.assert_has_calls([
+            call("- 'Various': found 1/1 songs, pushed 1"),
+            call("- 'Chalga': found 1/1 songs, pushed 0"),
+            call("- 'Pop': found 1/1 songs, pushed 1")
+        ])
+
+    def test_Execution_group_playlists_by_target(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        playlists = {
+            'First': {constants.ORIGIN_YOUTUBE: 'yt1', constants.ORIGIN_SPOTIFY: 'sp1'},
+            'Second': {constants.ORIGIN_YOUTUBE: 'yt2', constants.ORIGIN_SPOTIFY: 'sp2'},
+            'Third': {constants.ORIGIN_YOUTUBE: 'yt3', constants.ORIGIN_SPOTIFY: 'sp1'}
+        }
+
+        return_value = self.execution.group_playlists_by_target(['First', 'Second', 'Third'], playlists)
+
+        self.assertEqual(return_value, [['First', 'Third'], ['Second']])
+
+    def test_Execution_get_playlists_versions(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        self.spotify.get_playlist_snapshot_ids.return_value = {'sp1': 's1', 'sp2': 's2'}
+        self.youtube.get_playlist_etags.return_value = {'ytp1': 'e1'}
+
+        return_value = self.execution.get_playlists_versions()
+
+        self.spotify.get_playlist_snapshot_ids.assert_called_once_with(self.spotify_playlists)
+        self.youtube.get_playlist_etags.assert_called_once_with(self.youtube_playlists)
+        self.youtube.get_playlist_items_etags.assert_not_called()
+        self.assertEqual(return_value, {
+            self.playlist_names[0]: {
+                constants.ORIGIN_SPOTIFY: 's1',
+                constants.ORIGIN_YOUTUBE: 'e1',
+                constants.TIED_SONGS_PARAMETER: self.execution.tied_songs_version
+            },
+            self.playlist_names[1]: {
+                constants.ORIGIN_SPOTIFY: 's2',
+                constants.ORIGIN_YOUTUBE: None,
+                constants.TIED_SONGS_PARAMETER: self.execution.tied_songs_version
+            }
+        })
+
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_get_playlists_versions_error(self, logging_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        self.spotify.get_playlist_snapshot_ids.side_effect = Exception('offline')
+
+        return_value = self.execution.get_playlists_versions()
+
+        logging_mock.warning.assert_called_once_with(
+            "Could not check which playlists have changed, all of them will be synchronized: offline"
+        )
+        self.assertEqual(return_value, {})
+
+    def test_Execution_get_playlists_versions_source_youtube(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        self.youtube.get_playlist_items_etags.return_value = {'ytp1': 'i1'}
+
+        return_value = self.execution.get_playlists_versions()
+
+        # the etags of the pages of a source YouTube playlist change along with any of its videos
+        self.youtube.get_playlist_items_etags.assert_called_once_with(self.youtube_playlists)
+        self.youtube.get_playlist_etags.assert_not_called()
+        self.assertEqual(return_value[self.playlist_names[0]][constants.ORIGIN_YOUTUBE], 'i1')
+
+    def test_Execution_get_playlists_versions_of_some_services(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        self.youtube.get_playlist_etags.return_value = {'ytp1': 'e1', 'ytp2': 'e2'}
+
+        return_value = self.execution.get_playlists_versions(services=[constants.ORIGIN_YOUTUBE])
+
+        self.spotify.get_playlist_snapshot_ids.assert_not_called()
+        self.assertEqual(return_value[self.playlist_names[1]], {
+            constants.ORIGIN_YOUTUBE: 'e2',
+            constants.TIED_SONGS_PARAMETER: self.execution.tied_songs_version
+        })
+
+    def test_Execution_tied_songs_version_depends_on_tied_songs(self):
+        tied_songs_version = self.execution.tied_songs_version
+        self.params[constants.TIED_SONGS_PARAMETER] = {}
+
+        self.assertNotEqual(Execution(self.config).tied_songs_version, tied_songs_version)
+
+    def test_Execution_is_playlist_unchanged(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        playlist_versions = {constants.ORIGIN_SPOTIFY: 's1', constants.ORIGIN_YOUTUBE: 'e1'}
+        self.execution.sync_state.get_versions.return_value = dict(playlist_versions)
+
+        return_value = self.execution.is_playlist_unchanged(
+            self.playlist_names[0],
+            {self.playlist_names[0]: playlist_versions}
+        )
+
+        self.execution.sync_state.get_versions.assert_called_once_with(
+            constants.ORIGIN_SPOTIFY,
+            self.spotify_playlists[0],
+            self.youtube_playlists[0]
+        )
+        self.assertTrue(return_value)
+
+    def test_Execution_is_playlist_changed(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        self.execution.sync_state.get_versions.return_value = {constants.ORIGIN_SPOTIFY: 's0'}
+
+        return_value = self.execution.is_playlist_unchanged(
+            self.playlist_names[0],
+            {self.playlist_names[0]: {constants.ORIGIN_SPOTIFY: 's1'}}
+        )
+
+        self.assertFalse(return_value)
+
+    def test_Execution_is_playlist_changed_without_known_versions(self):
+        self.assertFalse(self.execution.is_playlist_unchanged(self.playlist_names[0], {}))
+        self.assertFalse(self.execution.is_playlist_unchanged(
+            self.playlist_names[0],
+            {self.playlist_names[0]: {constants.ORIGIN_SPOTIFY: 's1', constants.ORIGIN_YOUTUBE: None}}
+        ))
+        self.execution.sync_state.get_versions.assert_not_called()
+
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    def test_Execution_save_playlists_versions(self, get_playlists_versions_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        # the source versions are the ones read before the synchronization, only the targets are read again
+        playlists_versions = {
+            self.playlist_names[0]: {constants.ORIGIN_SPOTIFY: 's0', constants.ORIGIN_YOUTUBE: 'e1'},
+            self.playlist_names[1]: {constants.ORIGIN_SPOTIFY: 's0', constants.ORIGIN_YOUTUBE: 'e2'}
+        }
+        get_playlists_versions_mock.return_value = {
+            self.playlist_names[0]: {constants.ORIGIN_SPOTIFY: 's1'},
+            self.playlist_names[1]: {constants.ORIGIN_SPOTIFY: None}
+        }
+
+        self.execution.save_playlists_versions(self.playlist_names, playlists_versions)
+
+        get_playlists_versions_mock.assert_called_once_with(self.params[constants.PLAYLISTS_PARAMETER],
+                                                            [constants.ORIGIN_SPOTIFY])
+        self.execution.sync_state.put_versions.assert_called_once_with(
+            constants.ORIGIN_YOUTUBE,
+            self.spotify_playlists[0],
+            self.youtube_playlists[0],
+            {constants.ORIGIN_SPOTIFY: 's1', constants.ORIGIN_YOUTUBE: 'e1'}
+        )
+
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    def test_Execution_save_playlists_versions_without_source_versions(self, get_playlists_versions_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        get_playlists_versions_mock.return_value = {self.playlist_names[0]: {constants.ORIGIN_YOUTUBE: 'e1'}}
+
+        self.execution.save_playlists_versions([self.playlist_names[0]], {})
+
+        get_playlists_versions_mock.assert_called_once_with(self.params[constants.PLAYLISTS_PARAMETER],
+                                                            [constants.ORIGIN_YOUTUBE])
+        self.execution.sync_state.put_versions.assert_not_called()
+
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    def test_Execution_save_playlists_versions_nothing_synced(self, get_playlists_versions_mock):
+        self.execution.save_playlists_versions([], {})
+
+        get_playlists_versions_mock.assert_not_called()
+        self.execution.sync_state.put_versions.assert_not_called()
 
     @mock.patch('youspotube.execution.executor.logging')
     def test_Execution_sync_from_spotify_nothing_to_push_to_YouTube(self, logging_mock):
         tracks_found_expected_message = "Found 2/2 Spotify tracks on YouTube"
         nothing_to_push_expected_message = "Nothing to push to YouTube playlist"
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
         playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
         ids = [1, 2]
         expected_info_calls = [call(tracks_found_expected_message), call(nothing_to_push_expected_message)]
 
         self.spotify.parse_playlist.return_value = ids
         self.youtube.spotify_playlist_to_video_ids.return_value = ids
-        self.youtube.get_missing_videos_in_playlist.return_value = []
+        self.youtube.get_missing_videos_in_playlist.side_effect = lambda details, videos: [video for video in videos if False]
+        self.youtube.add_videos_to_playlist.side_effect = lambda details, videos, on_pushed: list(videos)
 
         self.execution.sync_from_spotify(playlist_details)
 
         self.spotify.parse_playlist.assert_called_once_with(playlist_details)
         self.youtube.spotify_playlist_to_video_ids.assert_called_once_with(ids)
-        self.youtube.get_missing_videos_in_playlist.assert_called_once_with(playlist_details, ids)
+        self.youtube.get_missing_videos_in_playlist.assert_called_once_with(playlist_details, mock.ANY)
+        self.youtube.add_videos_to_playlist.assert_called_once_with(playlist_details, mock.ANY, mock.ANY)
         logging_mock.info.assert_has_calls(expected_info_calls)
 
     @mock.patch('youspotube.execution.executor.logging')
     def test_Execution_sync_from_spotify_push_to_YouTube(self, logging_mock):
         tracks_found_expected_message = "Found 2/2 Spotify tracks on YouTube"
-        expected_pushing_message = "Pushing 2 videos to YouTube playlist that are not in it"
+        expected_pushed_message = "Pushed 1 videos to YouTube playlist that were not in it"
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
         playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
-        ids = [1, 2]
-        expected_info_calls = [call(tracks_found_expected_message), call(expected_pushing_message)]
+        ids = [
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: 'v1', constants.TRACK_POSITION_DATA_KEY: 0},
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: 'v2', constants.TRACK_POSITION_DATA_KEY: 1}
+        ]
+        expected_info_calls = [call(tracks_found_expected_message), call(expected_pushed_message)]
+        pushed_videos = []
 
         self.spotify.parse_playlist.return_value = ids
         self.youtube.spotify_playlist_to_video_ids.return_value = ids
-        self.youtube.get_missing_videos_in_playlist.return_value = ids
+        self.youtube.get_missing_videos_in_playlist.side_effect = lambda details, videos: [video for video in videos
+                                                                                           if video is ids[1]]
+        self.youtube.add_videos_to_playlist.side_effect = lambda details, videos, on_pushed: pushed_videos.extend(videos)
 
-        self.execution.sync_from_spotify(playlist_details)
+        return_value = self.execution.sync_from_spotify(playlist_details)
 
         self.spotify.parse_playlist.assert_called_once_with(playlist_details)
         self.youtube.spotify_playlist_to_video_ids.assert_called_once_with(ids)
-        self.youtube.get_missing_videos_in_playlist.assert_called_once_with(playlist_details, ids)
+        self.youtube.get_missing_videos_in_playlist.assert_called_once_with(playlist_details, mock.ANY)
         logging_mock.info.assert_has_calls(expected_info_calls)
-        self.youtube.add_videos_to_playlist.assert_called_once_with(playlist_details, ids)
+        self.assertEqual(pushed_videos, [ids[1]])
+        self.assertEqual(return_value, (2, 2, 1))
+        self.push_outbox.append.assert_called_once_with(constants.ORIGIN_SPOTIFY, self.spotify_playlists[0],
+                                                        self.youtube_playlists[0], 'v2', 1)
 
     @mock.patch('youspotube.execution.executor.logging')
     def test_Execution_sync_from_YouTube_nothing_to_push_to_Spotify(self, logging_mock):
         tracks_found_expected_message = "Found 2/2 YouTube songs on Spotify"
         nothing_to_push_expected_message = "Nothing to push to Spotify playlist"
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
         playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
         ids = [1, 2]
         expected_info_calls = [call(tracks_found_expected_message), call(nothing_to_push_expected_message)]
 
         self.youtube.parse_playlist.return_value = ids
         self.spotify.youtube_playlist_to_track_ids.return_value = ids
-        self.youtube.get_relevant_spotify_tracks.return_value = ids
-        self.spotify.get_missing_tracks_in_playlist.return_value = []
+        self.youtube.get_relevant_spotify_tracks.side_effect = lambda tracks: iter(tracks)
+        self.spotify.get_missing_tracks_in_playlist.side_effect = lambda details, tracks: [track for track in tracks
+                                                                                           if False]
+        self.spotify.add_tracks_to_playlist.side_effect = lambda details, tracks, on_pushed: list(tracks)
 
         self.execution.sync_from_youtube(playlist_details)
 
         self.youtube.parse_playlist.assert_called_once_with(playlist_details)
         self.spotify.youtube_playlist_to_track_ids.assert_called_once_with(ids)
         self.youtube.get_relevant_spotify_tracks.assert_called_once_with(ids)
-        self.spotify.get_missing_tracks_in_playlist.assert_called_once_with(playlist_details, ids)
+        self.spotify.get_missing_tracks_in_playlist.assert_called_once_with(playlist_details, mock.ANY)
+        self.spotify.add_tracks_to_playlist.assert_called_once_with(playlist_details, mock.ANY, mock.ANY)
         logging_mock.info.assert_has_calls(expected_info_calls)
 
     @mock.patch('youspotube.execution.executor.logging')
     def test_Execution_sync_from_YouTube_push_to_Spotify(self, logging_mock):
         tracks_found_expected_message = "Found 2/2 YouTube songs on Spotify"
-        expected_pushing_message = "Pushing 2 tracks to Spotify playlist that are not in it"
+        expected_pushed_message = "Pushed 2 tracks to Spotify playlist that were not in it"
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
         playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
-        ids = [1, 2]
-        expected_info_calls = [call(tracks_found_expected_message), call(expected_pushing_message)]
+        ids = [
+            {constants.SPOTIFY_TRACK_ID_DATA_KEY: 't1', constants.TRACK_POSITION_DATA_KEY: 0},
+            {constants.SPOTIFY_TRACK_ID_DATA_KEY: 't2', constants.TRACK_POSITION_DATA_KEY: 1}
+        ]
+        expected_info_calls = [call(tracks_found_expected_message), call(expected_pushed_message)]
+        pushed_tracks = []
 
         self.youtube.parse_playlist.return_value = ids
         self.spotify.youtube_playlist_to_track_ids.return_value = ids
-        self.youtube.get_relevant_spotify_tracks.return_value = ids
-        self.spotify.get_missing_tracks_in_playlist.return_value = ids
+        self.youtube.get_relevant_spotify_tracks.side_effect = lambda tracks: iter(tracks)
+        self.spotify.get_missing_tracks_in_playlist.side_effect = lambda details, tracks: iter(tracks)
+        self.spotify.add_tracks_to_playlist.side_effect = lambda details, tracks, on_pushed: pushed_tracks.extend(tracks)
 
-        self.execution.sync_from_youtube(playlist_details)
+        return_value = self.execution.sync_from_youtube(playlist_details)
 
         self.youtube.parse_playlist.assert_called_once_with(playlist_details)
         self.spotify.youtube_playlist_to_track_ids.assert_called_once_with(ids)
         self.youtube.get_relevant_spotify_tracks.assert_called_once_with(ids)
-        self.spotify.get_missing_tracks_in_playlist.assert_called_once_with(playlist_details, ids)
+        self.spotify.get_missing_tracks_in_playlist.assert_called_once_with(playlist_details, mock.ANY)
         logging_mock.info.assert_has_calls(expected_info_calls)
-        self.spotify.add_tracks_to_playlist.assert_called_once_with(playlist_details, ids)
+        self.assertEqual(pushed_tracks, ids)
+        self.assertEqual(return_value, (2, 2, 2))
+        self.push_outbox.append.assert_has_calls([
+            call(constants.ORIGIN_YOUTUBE, self.spotify_playlists[0], self.youtube_playlists[0], 't1', 0),
+            call(constants.ORIGIN_YOUTUBE, self.spotify_playlists[0], self.youtube_playlists[0], 't2', 1)
+        ])
+
+    @mock.patch.object(Execution, 'log_lookup_counts')
+    @mock.patch.object(Execution, 'sync_playlists')
+    @mock.patch('youspotube.execution.executor.SyncPlan')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_plan(self, logging_mock, sync_plan_mock, sync_playlists_mock, log_lookup_counts_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+
+        self.execution.plan('plan.json')
+
+        sync_plan_mock.assert_called_once_with(constants.ORIGIN_SPOTIFY)
+        self.assertIs(self.execution.sync_plan, sync_plan_mock.return_value)
+        self.assertEqual(self.execution.push_outcome, 'planned to push')
+        sync_playlists_mock.assert_called_once()
+        # nothing is pushed while planning, so the pushes of an interrupted run are not resumed
+        self.push_outbox.get_run.assert_not_called()
+        sync_plan_mock.return_value.save.assert_called_once_with('plan.json')
+        logging_mock.info.assert_any_call("Saved the synchronization plan to 'plan.json'")
+        log_lookup_counts_mock.assert_called_once()
+
+    @mock.patch.object(Execution, 'sync_playlists', Mock())
+    @mock.patch('youspotube.execution.executor.SyncPlan')
+    @mock.patch('youspotube.execution.executor.logging', Mock())
+    def test_Execution_plan_save_error(self, sync_plan_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        sync_plan_mock.return_value.save.side_effect = OSError('disk full')
+
+        with self.assertRaises(ExecutionError) as expected_error:
+            self.execution.plan('plan.json')
+
+        self.assertEqual(
+            str(expected_error.exception),
+            "Execution error: Could not save the synchronization plan to 'plan.json': disk full"
+        )
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'is_playlist_unchanged', Mock(return_value=False))
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch.object(Execution, 'sync_from_spotify', Mock(return_value=(1, 1, 1)))
+    @mock.patch('youspotube.execution.executor.logging', Mock())
+    def test_Execution_sync_playlists_plan_playlists(self, get_playlists_versions_mock, save_playlists_versions_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        get_playlists_versions_mock.return_value = {self.playlist_names[0]: 'versions'}
+        self.execution.sync_plan = Mock()
+
+        self.execution.sync_playlists()
+
+        save_playlists_versions_mock.assert_not_called()
+        self.execution.sync_plan.add_playlist.assert_has_calls([
+            call(self.playlist_names[0], self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]], 'versions'),
+            call(self.playlist_names[1], self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[1]], None)
+        ])
+
+    def test_Execution_push_videos_to_plan(self):
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        videos = [{
+            constants.YOUTUBE_VIDEO_ID_DATA_KEY: 'video1',
+            constants.SEARCH_RESULTS_DATA_KEY: [],
+            constants.TRACK_POSITION_DATA_KEY: 3
+        }]
+        self.execution.sync_plan = Mock()
+
+        self.execution.push_videos(playlist_details, videos)
+
+        self.youtube.add_videos_to_playlist.assert_not_called()
+        self.execution.sync_plan.add_songs.assert_called_once_with(playlist_details, [['video1', 3]])
+
+    def test_Execution_push_tracks_to_plan(self):
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        tracks = [{
+            constants.SPOTIFY_TRACK_ID_DATA_KEY: 'track1',
+            constants.TRACK_POSITION_DATA_KEY: 0
+        }]
+        self.execution.sync_plan = Mock()
+
+        self.execution.push_tracks(playlist_details, tracks)
+
+        self.spotify.add_tracks_to_playlist.assert_not_called()
+        self.execution.sync_plan.add_songs.assert_called_once_with(playlist_details, [['track1', 0]])
+
+    @mock.patch('youspotube.execution.executor.SyncPlan')
+    def test_Execution_apply_unreadable_plan(self, sync_plan_mock):
+        sync_plan_mock.load.side_effect = OSError('no such file')
+
+        with self.assertRaises(ExecutionError) as expected_error:
+            self.execution.apply('plan.json')
+
+        self.assertEqual(
+            str(expected_error.exception),
+            "Execution error: Could not read the synchronization plan 'plan.json': no such file"
+        )
+
+    @mock.patch('youspotube.execution.executor.SyncPlan')
+    def test_Execution_apply_plan_of_other_origin(self, sync_plan_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        sync_plan_mock.load.return_value.origin = constants.ORIGIN_YOUTUBE
+
+        with self.assertRaises(ExecutionError) as expected_error:
+            self.execution.apply('plan.json')
+
+        self.assertEqual(
+            str(expected_error.exception),
+            "Execution error: Synchronization plan 'plan.json' was made with origin 'youtube', but the configured "
+            "origin is 'spotify'"
+        )
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch('youspotube.execution.executor.SyncPlan')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_apply(self, logging_mock, sync_plan_mock, get_playlists_versions_mock,
+                             save_playlists_versions_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        planned_playlists = {
+            'Unchanged': {constants.ORIGIN_SPOTIFY: 'sp1', constants.ORIGIN_YOUTUBE: 'yt1'},
+            'Changed': {constants.ORIGIN_SPOTIFY: 'sp2', constants.ORIGIN_YOUTUBE: 'yt2'}
+        }
+        sync_plan = sync_plan_mock.load.return_value
+        sync_plan.origin = constants.ORIGIN_SPOTIFY
+        sync_plan.get_playlists_details.return_value = planned_playlists
+        sync_plan.get_versions.return_value = {constants.ORIGIN_SPOTIFY: 's1', constants.ORIGIN_YOUTUBE: 'e1'}
+        sync_plan.get_songs.return_value = [['video1', 0], ['video2', 7]]
+        get_playlists_versions_mock.return_value = {
+            'Unchanged': {constants.ORIGIN_SPOTIFY: 's1', constants.ORIGIN_YOUTUBE: 'e1'},
+            'Changed': {constants.ORIGIN_SPOTIFY: 's1', constants.ORIGIN_YOUTUBE: 'e2'}
+        }
+        pushed_videos = []
+        self.youtube.add_videos_to_playlist.side_effect = lambda details, videos, on_pushed: pushed_videos.extend(videos)
+
+        self.execution.apply('plan.json')
+
+        sync_plan_mock.load.assert_called_once_with('plan.json')
+        get_playlists_versions_mock.assert_called_once_with(planned_playlists)
+        self.youtube.add_videos_to_playlist.assert_called_once_with(planned_playlists['Unchanged'], mock.ANY, mock.ANY)
+        self.assertEqual(pushed_videos, [
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: 'video1', constants.TRACK_POSITION_DATA_KEY: 0},
+            {constants.YOUTUBE_VIDEO_ID_DATA_KEY: 'video2', constants.TRACK_POSITION_DATA_KEY: 7}
+        ])
+        logging_mock.warning.assert_called_once_with(
+            "Skipping playlist 'Changed' of the synchronization plan, it may have changed since the plan was made"
+        )
+        save_playlists_versions_mock.assert_called_once_with(['Unchanged'], get_playlists_versions_mock.return_value,
+                                                             planned_playlists)
+        logging_mock.info.assert_has_calls([
+            call("- 'Unchanged': pushed 2 planned songs"),
+            call("- 'Changed': skipped, it may have changed since the synchronization plan was made")
+        ])
+
+    def test_Execution_apply_playlist_to_spotify(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        sync_plan = Mock()
+        sync_plan.get_songs.return_value = [['track1', 2]]
+        pushed_tracks = []
+        self.spotify.add_tracks_to_playlist.side_effect = lambda details, tracks, on_pushed: pushed_tracks.extend(tracks)
+
+        return_value = self.execution.apply_playlist(sync_plan, self.playlist_names[0], playlist_details)
+
+        sync_plan.get_songs.assert_called_once_with(self.playlist_names[0])
+        self.spotify.add_tracks_to_playlist.assert_called_once_with(playlist_details, mock.ANY, mock.ANY)
+        self.assertEqual(pushed_tracks, [
+            {constants.SPOTIFY_TRACK_ID_DATA_KEY: 'track1', constants.TRACK_POSITION_DATA_KEY: 2}
+        ])
+        self.assertEqual(return_value, "pushed 1 planned songs")
+
+    def test_Execution_push_songs_acknowledges_pushes_in_outbox(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        videos = [{constants.YOUTUBE_VIDEO_ID_DATA_KEY: 'v1', constants.TRACK_POSITION_DATA_KEY: 0}]
+
+        def add_videos_to_playlist(details, videos_to_add, on_pushed):
+            for video in videos_to_add:
+                # the song is recorded before it is pushed and marked as done once it is pushed
+                self.push_outbox.append.assert_called_once_with(constants.ORIGIN_SPOTIFY, self.spotify_playlists[0],
+                                                                self.youtube_playlists[0], 'v1', 0)
+                self.push_outbox.mark_done.assert_not_called()
+                on_pushed(1)
+
+        self.youtube.add_videos_to_playlist.side_effect = add_videos_to_playlist
+
+        self.execution.push_songs(playlist_details, videos)
+
+        self.push_outbox.mark_done.assert_called_once_with(constants.ORIGIN_SPOTIFY, self.spotify_playlists[0],
+                                                           self.youtube_playlists[0], 1)
+        self.push_outbox.set_diffed.assert_called_once_with(constants.ORIGIN_SPOTIFY, self.spotify_playlists[0],
+                                                            self.youtube_playlists[0])
+
+    def test_Execution_push_songs_diffs_ahead_of_pushes(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        tracks = [{constants.SPOTIFY_TRACK_ID_DATA_KEY: 't%s' % index, constants.TRACK_POSITION_DATA_KEY: index}
+                  for index in range(3)]
+        all_tracks_diffed = threading.Event()
+        self.push_outbox.set_diffed.side_effect = lambda *outbox_key: all_tracks_diffed.set()
+
+        def add_tracks_to_playlist(details, tracks_to_add, on_pushed):
+            next(iter(tracks_to_add))
+            # all tracks are recorded in the outbox while the first one is still being pushed
+            self.assertTrue(all_tracks_diffed.wait(1))
+            self.assertEqual(self.push_outbox.append.call_count, 3)
+
+        self.spotify.add_tracks_to_playlist.side_effect = add_tracks_to_playlist
+
+        self.execution.push_songs(playlist_details, iter(tracks))
+
+        self.spotify.add_tracks_to_playlist.assert_called_once()
+
+    def test_Execution_push_songs_bounds_diff_ahead_of_pushes(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        max_pending = constants.PIPELINE_MAX_PENDING_RESULTS_PER_WORKER
+        tracks = [{constants.SPOTIFY_TRACK_ID_DATA_KEY: 't%s' % index, constants.TRACK_POSITION_DATA_KEY: index}
+                  for index in range(max_pending + 10)]
+
+        def add_tracks_to_playlist(details, tracks_to_add, on_pushed):
+            tracks_to_add = iter(tracks_to_add)
+            next(tracks_to_add)
+            time.sleep(0.05)
+            # one track is being pushed, the pending ones wait for the push and one more waits for room
+            self.assertEqual(self.push_outbox.append.call_count, 1 + max_pending + 1)
+            self.assertEqual(len(list(tracks_to_add)), len(tracks) - 1)
+
+        self.spotify.add_tracks_to_playlist.side_effect = add_tracks_to_playlist
+
+        self.execution.push_songs(playlist_details, iter(tracks))
+
+        self.spotify.add_tracks_to_playlist.assert_called_once()
+        self.assertEqual(self.push_outbox.append.call_count, len(tracks))
+
+    def resume_interrupted_run(self, get_playlists_versions_mock, is_diffed, source_version, push_error=None):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        self.run_versions = {
+            constants.ORIGIN_SPOTIFY: 's1',
+            constants.ORIGIN_YOUTUBE: 'i1',
+            constants.TIED_SONGS_PARAMETER: self.execution.tied_songs_version
+        }
+        self.push_outbox.get_run.side_effect = lambda origin, spotify_playlist_id, youtube_playlist_id: \
+            (self.run_versions, is_diffed) if spotify_playlist_id == self.spotify_playlists[0] else None
+        self.push_outbox.get_pending.return_value = [(1, 't0', 2), (2, 't1', 3)]
+        self.push_outbox.finish_run.return_value = 2
+        self.interrupted_playlists = {
+            self.playlist_names[0]: self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        }
+        get_playlists_versions_mock.return_value = {
+            self.playlist_names[0]: {
+                constants.ORIGIN_YOUTUBE: source_version,
+                constants.TIED_SONGS_PARAMETER: self.execution.tied_songs_version
+            }
+        }
+        # the first pending track was pushed right before the previous run was interrupted
+        self.spotify.parse_playlist.return_value = {'t0': {}}
+        self.pushed_tracks = []
+        self.spotify.add_tracks_to_playlist.side_effect = push_error or (lambda details, tracks, on_pushed:
+                                                                         self.pushed_tracks.extend(tracks))
+
+        self.execution.resume_pending_pushes(self.params[constants.PLAYLISTS_PARAMETER])
+
+        get_playlists_versions_mock.assert_called_once_with(self.interrupted_playlists, [constants.ORIGIN_YOUTUBE])
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_resume_pending_pushes(self, logging_mock, get_playlists_versions_mock,
+                                             save_playlists_versions_mock):
+        self.resume_interrupted_run(get_playlists_versions_mock, True, 'i1')
+
+        self.spotify.parse_playlist.assert_called_once_with(self.interrupted_playlists[self.playlist_names[0]])
+        self.push_outbox.remove.assert_called_once_with([1])
+        self.spotify.add_tracks_to_playlist.assert_called_once_with(
+            self.interrupted_playlists[self.playlist_names[0]],
+            mock.ANY,
+            mock.ANY
+        )
+        self.assertEqual(self.pushed_tracks, [
+            {constants.SPOTIFY_TRACK_ID_DATA_KEY: 't1', constants.TRACK_POSITION_DATA_KEY: 3}
+        ])
+        # the pending pushes are already in the outbox
+        self.push_outbox.append.assert_not_called()
+        self.push_outbox.finish_run.assert_called_once_with(constants.ORIGIN_YOUTUBE, self.spotify_playlists[0],
+                                                            self.youtube_playlists[0])
+        logging_mock.info.assert_called_once_with(
+            "Resuming 1 pushes of playlist '%s' that were not finished by the previous run" % self.playlist_names[0]
+        )
+        # all songs of the playlist were diffed, so it is synchronized once they are pushed
+        save_playlists_versions_mock.assert_called_once_with(
+            [self.playlist_names[0]],
+            {self.playlist_names[0]: self.run_versions},
+            self.interrupted_playlists
+        )
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch('youspotube.execution.executor.logging', Mock())
+    def test_Execution_resume_pending_pushes_not_diffed(self, get_playlists_versions_mock, save_playlists_versions_mock):
+        self.resume_interrupted_run(get_playlists_versions_mock, False, 'i1')
+
+        self.assertEqual(len(self.pushed_tracks), 1)
+        self.push_outbox.finish_run.assert_called_once()
+        # the rest of the songs were not diffed, so the playlist is synchronized again
+        save_playlists_versions_mock.assert_called_once_with([], {}, self.interrupted_playlists)
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_resume_pending_pushes_source_changed(self, logging_mock, get_playlists_versions_mock,
+                                                            save_playlists_versions_mock):
+        self.resume_interrupted_run(get_playlists_versions_mock, True, 'i2')
+
+        self.spotify.parse_playlist.assert_not_called()
+        self.spotify.add_tracks_to_playlist.assert_not_called()
+        self.push_outbox.finish_run.assert_called_once_with(constants.ORIGIN_YOUTUBE, self.spotify_playlists[0],
+                                                            self.youtube_playlists[0])
+        logging_mock.info.assert_called_once_with(
+            "Dropped 2 pushes of playlist '%s' that were not finished by the previous run, the playlist has changed "
+            "since then" % self.playlist_names[0]
+        )
+        save_playlists_versions_mock.assert_called_once_with([], {}, self.interrupted_playlists)
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_resume_pending_pushes_error(self, logging_mock, get_playlists_versions_mock,
+                                                   save_playlists_versions_mock):
+        self.resume_interrupted_run(get_playlists_versions_mock, True, 'i1', ExecutionError('playlist is gone'))
+
+        self.push_outbox.finish_run.assert_called_once_with(constants.ORIGIN_YOUTUBE, self.spotify_playlists[0],
+                                                            self.youtube_playlists[0])
+        logging_mock.warning.assert_called_once_with(
+            "Could not resume the pushes of playlist '%s', dropped 2 pending pushes: Execution error: playlist is gone" %
+            self.playlist_names[0]
+        )
+        save_playlists_versions_mock.assert_called_once_with([], {}, self.interrupted_playlists)
+
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    def test_Execution_resume_pending_pushes_nothing_interrupted(self, get_playlists_versions_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        self.push_outbox.get_run.return_value = None
+
+        self.execution.resume_pending_pushes(self.params[constants.PLAYLISTS_PARAMETER])
+
+        get_playlists_versions_mock.assert_not_called()
+        self.push_outbox.get_pending.assert_not_called()
+
+    def test_Execution_run_with_outbox(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+        outbox_key = (constants.ORIGIN_SPOTIFY, self.spotify_playlists[0], self.youtube_playlists[0])
+        sync_function = Mock()
+
+        return_value = self.execution.run_with_outbox(playlist_details, 'versions', sync_function)
+
+        self.push_outbox.start_run.assert_called_once_with(*outbox_key, 'versions')
+        sync_function.assert_called_once_with(playlist_details)
+        self.push_outbox.finish_run.assert_called_once_with(*outbox_key)
+        self.assertIs(return_value, sync_function.return_value)
+
+    def test_Execution_run_with_outbox_error(self):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        playlist_details = self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[0]]
+
+        with self.assertRaises(ExecutionError):
+            self.execution.run_with_outbox(playlist_details, 'versions', Mock(side_effect=ExecutionError('quota')))
+
+        # the pending pushes are kept for the next run
+        self.push_outbox.finish_run.assert_not_called()
+
+    @mock.patch.object(Execution, 'log_lookup_counts')
+    @mock.patch.object(Execution, 'poll_playlists')
+    @mock.patch('youspotube.execution.executor.time')
+    @mock.patch('youspotube.execution.executor.logging')
+    def test_Execution_watch(self, logging_mock, time_mock, poll_playlists_mock, log_lookup_counts_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_YOUTUBE
+        time_mock.monotonic.return_value = 100
+        time_mock.sleep.side_effect = [None, KeyboardInterrupt()]
+        poll_times = []
+
+        def poll_playlists(next_poll_times):
+            poll_times.append(dict(next_poll_times))
+            next_poll_times[self.playlist_names[0]] = 130
+            next_poll_times[self.playlist_names[1]] = 160
+
+        poll_playlists_mock.side_effect = poll_playlists
+
+        self.execution.watch()
+
+        self.assertEqual(poll_times[0], dict.fromkeys(self.playlist_names, 100))
+        self.assertEqual(poll_playlists_mock.call_count, 2)
+        time_mock.sleep.assert_has_calls([call(30), call(30)])
+        logging_mock.info.assert_has_calls([
+            call("Watching playlists: %s" % self.execution.get_sync_direction()),
+            call("Stopped watching playlists")
+        ])
+        log_lookup_counts_mock.assert_called_once()
+
+    @mock.patch.object(Execution, 'sync_playlists')
+    @mock.patch.object(Execution, 'is_playlist_unchanged')
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch('youspotube.execution.executor.time')
+    def test_Execution_poll_playlists(self, time_mock, get_playlists_versions_mock, is_playlist_unchanged_mock,
+                                      sync_playlists_mock):
+        playlists = self.params[constants.PLAYLISTS_PARAMETER]
+        playlists[self.playlist_names[0]][constants.POLL_INTERVAL_SECONDS_PARAMETER] = 10
+        time_mock.monotonic.return_value = 100
+        next_poll_times = {self.playlist_names[0]: 90, self.playlist_names[1]: 150}
+        is_playlist_unchanged_mock.return_value = False
+
+        self.execution.poll_playlists(next_poll_times)
+
+        due_playlists = {self.playlist_names[0]: playlists[self.playlist_names[0]]}
+        get_playlists_versions_mock.assert_called_once_with(due_playlists)
+        sync_playlists_mock.assert_called_once_with(due_playlists, get_playlists_versions_mock.return_value)
+        self.youtube.lookup_memo.clear.assert_called_once()
+        self.spotify.lookup_memo.clear.assert_called_once()
+        self.config.prune_match_cache.assert_called_once_with()
+        self.assertEqual(next_poll_times, {self.playlist_names[0]: 110, self.playlist_names[1]: 150})
+
+    @mock.patch.object(Execution, 'sync_playlists')
+    @mock.patch.object(Execution, 'is_playlist_unchanged', Mock(return_value=True))
+    @mock.patch.object(Execution, 'get_playlists_versions', Mock(return_value={}))
+    @mock.patch('youspotube.execution.executor.time')
+    def test_Execution_poll_unchanged_playlists(self, time_mock, sync_playlists_mock):
+        time_mock.monotonic.return_value = 100
+        next_poll_times = dict.fromkeys(self.playlist_names, 100)
+
+        self.execution.poll_playlists(next_poll_times)
+
+        sync_playlists_mock.assert_not_called()
+        self.youtube.lookup_memo.clear.assert_not_called()
+        self.config.prune_match_cache.assert_not_called()
+        self.assertEqual(next_poll_times, dict.fromkeys(self.playlist_names, 160))
+
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch('youspotube.execution.executor.time')
+    def test_Execution_poll_playlists_none_due(self, time_mock, get_playlists_versions_mock):
+        time_mock.monotonic.return_value = 100
+        next_poll_times = dict.fromkeys(self.playlist_names, 120)
+
+        self.execution.poll_playlists(next_poll_times)
+
+        get_playlists_versions_mock.assert_not_called()
+        self.assertEqual(next_poll_times, dict.fromkeys(self.playlist_names, 120))
+
+    @mock.patch.object(Execution, 'save_playlists_versions')
+    @mock.patch.object(Execution, 'is_playlist_unchanged', Mock(return_value=False))
+    @mock.patch.object(Execution, 'get_playlists_versions')
+    @mock.patch.object(Execution, 'sync_from_spotify', Mock(return_value=(1, 1, 0)))
+    @mock.patch('youspotube.execution.executor.logging', Mock())
+    def test_Execution_sync_some_playlists(self, get_playlists_versions_mock, save_playlists_versions_mock):
+        self.params[constants.ORIGIN_PARAMETER] = constants.ORIGIN_SPOTIFY
+        playlists = {self.playlist_names[1]: self.params[constants.PLAYLISTS_PARAMETER][self.playlist_names[1]]}
+        versions = {self.playlist_names[1]: 'versions'}
+
+        self.execution.sync_playlists(playlists, versions)
+
+        get_playlists_versions_mock.assert_not_called()
+        # the pushes of the playlist are recorded along with the versions they are diffed from
+        self.push_outbox.start_run.assert_called_once_with(constants.ORIGIN_SPOTIFY, self.spotify_playlists[1],
+                                                           self.youtube_playlists[1], 'versions')
+        save_playlists_versions_mock.assert_called_once_with([self.playlist_names[1]], versions, playlists)
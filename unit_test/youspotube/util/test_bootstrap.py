@@ -5,6 +5,7 @@ from unittest.mock import Mock, call
 from youspotube.exceptions import ConfigurationError, ExecutionError
 from youspotube.util.bootstrapper import Bootstrap
 import youspotube.constants as constants
+from youspotube.util.tools import Tools
 import os
 from datetime import datetime
 import atexit
@@ -16,10 +17,9 @@ class BootstrapTest(unittest.TestCase):
     @mock.patch.object(ConfigurationError, 'get_exit_code', Mock(return_value=3))
     @mock.patch.object(ConfigurationError, 'print_exception')
     @mock.patch('youspotube.util.bootstrapper.Execution')
-    @mock.patch('youspotube.util.bootstrapper.HttpUtil')
     @mock.patch('youspotube.util.bootstrapper.Configuration')
-    def test_Bootstrap_creation_error_raised_bad_configuration(self, config_mock, httputil_mock,
-                                                               execution_mock, print_exception_mock):
+    def test_Bootstrap_creation_error_raised_bad_configuration(self, config_mock, execution_mock,
+                                                               print_exception_mock):
         expected_error = ConfigurationError('nyamame vruzka s teb sega')
         config_mock.return_value.collect_parameters.side_effect = Mock(side_effect=expected_error)
 
@@ -27,21 +27,39 @@ class BootstrapTest(unittest.TestCase):
             Bootstrap()
 
         config_mock.assert_called_once()
-        httputil_mock.check_connectivity.assert_called_once()
         config_mock.return_value.collect_parameters.assert_called_once()
-        config_mock.return_value.connect_apis.assert_not_called()
         config_mock.return_value.validate_parameters.assert_not_called()
+        config_mock.return_value.init_match_cache.assert_not_called()
+        config_mock.return_value.connect_apis.assert_not_called()
+        config_mock.return_value.check_health.assert_not_called()
         print_exception_mock.assert_called_once()
         expected_error.get_exit_code.assert_called_once()
         self.assertEqual(sys_exit.exception.code, 3)
         execution_mock.assert_not_called()
+        config_mock.return_value.disconnect_apis.assert_not_called()
+
+    @mock.patch.object(ConfigurationError, 'get_exit_code', Mock(return_value=3))
+    @mock.patch.object(ConfigurationError, 'print_exception')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_failed_health_check(self, config_mock, execution_mock, print_exception_mock):
+        expected_error = ConfigurationError('offline')
+        config_mock.return_value.check_health.side_effect = expected_error
+
+        with self.assertRaises(SystemExit) as sys_exit:
+            Bootstrap()
+
+        print_exception_mock.assert_called_once()
+        self.assertEqual(sys_exit.exception.code, 3)
+        execution_mock.assert_not_called()
+        config_mock.return_value.start_credential_refreshers.assert_not_called()
+        config_mock.return_value.disconnect_apis.assert_called_once_with()
 
     @mock.patch.object(ExecutionError, 'get_exit_code', Mock(return_value=3))
     @mock.patch.object(ExecutionError, 'print_exception')
     @mock.patch('youspotube.util.bootstrapper.Execution')
-    @mock.patch('youspotube.util.bootstrapper.HttpUtil')
     @mock.patch('youspotube.util.bootstrapper.Configuration')
-    def test_Bootstrap_creation_execution_error(self, config_mock, httputil_mock, execution_mock, print_exception_mock):
+    def test_Bootstrap_creation_execution_error(self, config_mock, execution_mock, print_exception_mock):
         expected_error = ExecutionError('greshka beshe')
         execution_mock.return_value.execute.side_effect = Mock(side_effect=expected_error)
 
@@ -49,31 +67,119 @@ class BootstrapTest(unittest.TestCase):
             Bootstrap()
 
         config_mock.assert_called_once()
-        httputil_mock.check_connectivity.assert_called_once()
         config_mock.return_value.collect_parameters.assert_called_once()
-        config_mock.return_value.connect_apis.assert_called_once()
         config_mock.return_value.validate_parameters.assert_called_once()
+        config_mock.return_value.init_match_cache.assert_called_once_with(None)
+        config_mock.return_value.init_sync_state.assert_called_once_with(False)
+        config_mock.return_value.init_push_outbox.assert_called_once()
+        config_mock.return_value.connect_apis.assert_called_once()
+        config_mock.return_value.check_health.assert_called_once()
         execution_mock.assert_called_once_with(config_mock.return_value)
         execution_mock.return_value.execute.assert_called_once()
         print_exception_mock.assert_called_once()
         expected_error.get_exit_code.assert_called_once()
         self.assertEqual(sys_exit.exception.code, 3)
+        config_mock.return_value.disconnect_apis.assert_called_once_with()
 
     @mock.patch('youspotube.util.bootstrapper.sys')
     @mock.patch('youspotube.util.bootstrapper.Execution')
-    @mock.patch('youspotube.util.bootstrapper.HttpUtil')
     @mock.patch('youspotube.util.bootstrapper.Configuration')
-    def test_Bootstrap_creation_no_errors(self, config_mock, httputil_mock, execution_mock, sys_mock):
+    def test_Bootstrap_creation_no_errors(self, config_mock, execution_mock, sys_mock):
         Bootstrap()
 
         config_mock.assert_called_once()
-        httputil_mock.check_connectivity.assert_called_once()
         config_mock.return_value.collect_parameters.assert_called_once()
-        config_mock.return_value.connect_apis.assert_called_once()
         config_mock.return_value.validate_parameters.assert_called_once()
+        config_mock.return_value.init_match_cache.assert_called_once_with(None)
+        config_mock.return_value.init_sync_state.assert_called_once_with(False)
+        config_mock.return_value.connect_apis.assert_called_once()
+        config_mock.return_value.check_health.assert_called_once()
+        config_mock.return_value.start_credential_refreshers.assert_called_once_with()
         execution_mock.assert_called_once_with(config_mock.return_value)
         execution_mock.return_value.execute.assert_called_once()
         sys_mock.exit.assert_not_called()
+        config_mock.return_value.disconnect_apis.assert_called_once_with()
+
+    @mock.patch('youspotube.util.bootstrapper.sys')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_invalidate_cache(self, config_mock, execution_mock, sys_mock):
+        Bootstrap(['--invalidate-cache', 'aa', '--invalidate-cache', 'bb'])
+
+        config_mock.return_value.init_match_cache.assert_called_once_with(['aa', 'bb'])
+
+    @mock.patch('youspotube.util.bootstrapper.sys')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_invalidate_whole_cache(self, config_mock, execution_mock, sys_mock):
+        Bootstrap(['--invalidate-whole-cache'])
+
+        config_mock.return_value.init_match_cache.assert_called_once_with([])
+
+    @mock.patch('youspotube.util.bootstrapper.sys')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_invalidate_cache_before_command(self, config_mock, execution_mock, sys_mock):
+        Bootstrap(['--invalidate-cache', 'aa', 'plan'])
+
+        # the command after an invalidated ID is still the command
+        config_mock.return_value.init_match_cache.assert_called_once_with(['aa'])
+        execution_mock.return_value.plan.assert_called_once()
+        execution_mock.return_value.execute.assert_not_called()
+
+    @mock.patch('youspotube.util.bootstrapper.sys')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_full_sync(self, config_mock, execution_mock, sys_mock):
+        Bootstrap(['--full-sync'])
+
+        config_mock.return_value.init_sync_state.assert_called_once_with(True)
+
+    @mock.patch('youspotube.util.bootstrapper.sys')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_plan(self, config_mock, execution_mock, sys_mock):
+        Bootstrap(['plan', '--plan-file', 'plan.json'])
+
+        execution_mock.return_value.plan.assert_called_once_with('plan.json')
+        execution_mock.return_value.apply.assert_not_called()
+        execution_mock.return_value.execute.assert_not_called()
+
+    @mock.patch('youspotube.util.bootstrapper.sys')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_apply(self, config_mock, execution_mock, sys_mock):
+        Bootstrap(['apply'])
+
+        execution_mock.return_value.apply.assert_called_once_with(
+            Tools.get_filepath_relative_to_ysptb(constants.SYNC_PLAN_STORAGE_FILE)
+        )
+        execution_mock.return_value.plan.assert_not_called()
+        execution_mock.return_value.execute.assert_not_called()
+
+    @mock.patch('youspotube.util.bootstrapper.sys')
+    @mock.patch('youspotube.util.bootstrapper.Execution')
+    @mock.patch('youspotube.util.bootstrapper.Configuration')
+    def test_Bootstrap_creation_watch(self, config_mock, execution_mock, sys_mock):
+        Bootstrap(['watch'])
+
+        execution_mock.return_value.watch.assert_called_once()
+        execution_mock.return_value.execute.assert_not_called()
+        config_mock.return_value.disconnect_apis.assert_called_once_with()
+
+    def test_Bootstrap_parse_arguments(self):
+        bootstrap_mock = Mock()
+
+        self.assertIsNone(Bootstrap.parse_arguments(bootstrap_mock, []).invalidate_cache)
+        self.assertEqual(Bootstrap.parse_arguments(bootstrap_mock, ['--invalidate-cache', 'aa']).invalidate_cache, ['aa'])
+        self.assertFalse(Bootstrap.parse_arguments(bootstrap_mock, []).invalidate_whole_cache)
+        self.assertTrue(Bootstrap.parse_arguments(bootstrap_mock, ['--invalidate-whole-cache']).invalidate_whole_cache)
+        self.assertFalse(Bootstrap.parse_arguments(bootstrap_mock, []).full_sync)
+        self.assertTrue(Bootstrap.parse_arguments(bootstrap_mock, ['--full-sync']).full_sync)
+        self.assertEqual(Bootstrap.parse_arguments(bootstrap_mock, []).command, constants.COMMAND_SYNC)
+        self.assertEqual(Bootstrap.parse_arguments(bootstrap_mock, ['plan', '--full-sync']).command, constants.COMMAND_PLAN)
+        self.assertIsNone(Bootstrap.parse_arguments(bootstrap_mock, ['apply']).plan_file)
+        self.assertEqual(Bootstrap.parse_arguments(bootstrap_mock, ['apply', '--plan-file', 'a.json']).plan_file, 'a.json')
 
     @mock.patch.object(getpass, 'getuser')
     @mock.patch.object(atexit, 'register')
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+from unittest.mock import Mock
+
+from youspotube.util.credential_refresher import CredentialRefresher
+import youspotube.constants as constants
+
+
+@mock.patch('youspotube.util.credential_refresher.logging')
+@mock.patch('youspotube.util.credential_refresher.threading')
+@mock.patch('youspotube.util.credential_refresher.time')
+class CredentialRefresherTest(unittest.TestCase):
+    def setUp(self):
+        self.get_expires_at = Mock()
+        self.refresh = Mock()
+        self.credential_refresher = CredentialRefresher('Test', self.get_expires_at, self.refresh)
+
+    def test_CredentialRefresher_schedule_refresh_before_expiry(self, time_mock, threading_mock, logging_mock):
+        time_mock.time.return_value = 1000
+        self.get_expires_at.return_value = 1000 + constants.CREDENTIALS_REFRESH_MARGIN_SECONDS + 60
+
+        self.credential_refresher.start()
+
+        threading_mock.Timer.assert_called_once_with(60, self.credential_refresher._refresh)
+        timer_mock = threading_mock.Timer.return_value
+        self.assertTrue(timer_mock.daemon)
+        timer_mock.start.assert_called_once()
+
+    def test_CredentialRefresher_schedule_immediate_refresh(self, time_mock, threading_mock, logging_mock):
+        time_mock.time.return_value = 1000
+        self.get_expires_at.return_value = 1000
+
+        self.credential_refresher.start()
+
+        threading_mock.Timer.assert_called_once_with(0, self.credential_refresher._refresh)
+
+    def test_CredentialRefresher_do_not_schedule_refresh_without_expiry(self, time_mock, threading_mock, logging_mock):
+        self.get_expires_at.return_value = None
+
+        self.credential_refresher.start()
+
+        threading_mock.Timer.assert_not_called()
+        logging_mock.debug.assert_called_once_with(
+            "Test credentials have no expiry, they will not be refreshed in the background"
+        )
+
+    def test_CredentialRefresher_reschedule_after_refresh(self, time_mock, threading_mock, logging_mock):
+        time_mock.time.return_value = 1000
+        self.get_expires_at.return_value = 1000 + constants.CREDENTIALS_REFRESH_MARGIN_SECONDS + 3600
+
+        self.credential_refresher._refresh()
+
+        self.refresh.assert_called_once()
+        logging_mock.debug.assert_called_once_with("Refreshed Test credentials in the background")
+        threading_mock.Timer.assert_called_once_with(3600, self.credential_refresher._refresh)
+
+    def test_CredentialRefresher_do_not_busy_loop(self, time_mock, threading_mock, logging_mock):
+        time_mock.time.return_value = 1000
+        self.get_expires_at.return_value = 1000
+
+        self.credential_refresher._refresh()
+
+        threading_mock.Timer.assert_called_once_with(
+            constants.CREDENTIALS_REFRESH_RETRY_SECONDS,
+            self.credential_refresher._refresh
+        )
+
+    def test_CredentialRefresher_retry_failed_refresh(self, time_mock, threading_mock, logging_mock):
+        self.refresh.side_effect = Exception('no network')
+
+        self.credential_refresher._refresh()
+
+        logging_mock.warning.assert_called_once_with(
+            "Could not refresh Test credentials in the background, retrying in %s seconds: no network" %
+            constants.CREDENTIALS_REFRESH_RETRY_SECONDS
+        )
+        threading_mock.Timer.assert_called_once_with(
+            constants.CREDENTIALS_REFRESH_RETRY_SECONDS,
+            self.credential_refresher._refresh
+        )
+
+    def test_CredentialRefresher_stop(self, time_mock, threading_mock, logging_mock):
+        time_mock.time.return_value = 1000
+        self.get_expires_at.return_value = 1000
+        self.credential_refresher.start()
+
+        self.credential_refresher.stop()
+        self.credential_refresher._schedule(0)
+
+        threading_mock.Timer.return_value.cancel.assert_called_once()
+        threading_mock.Timer.assert_called_once()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from unittest.mock import Mock
+
+from youspotube.exceptions import ConfigurationError
+from youspotube.util.health_check import HealthCheck
+import youspotube.constants as constants
+
+
+class HealthCheckTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.storage_file_path = os.path.join(self.temporary_directory.name, 'health')
+        self.health_check = HealthCheck(self.storage_file_path)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_HealthCheck_run_probes_and_save_success(self):
+        probe1 = Mock()
+        probe2 = Mock()
+
+        self.health_check.run({'probe1': probe1, 'probe2': probe2})
+
+        probe1.assert_called_once()
+        probe2.assert_called_once()
+        self.assertTrue(os.path.exists(self.storage_file_path))
+
+    def test_HealthCheck_run_probes_concurrently(self):
+        # each probe waits for the other one, which only works if they run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+
+        self.health_check.run({'probe1': barrier.wait, 'probe2': barrier.wait})
+
+        self.assertTrue(os.path.exists(self.storage_file_path))
+
+    def test_HealthCheck_raise_probe_error(self):
+        probe = Mock(side_effect=ConfigurationError('offline'))
+
+        with self.assertRaises(ConfigurationError) as expected_error:
+            self.health_check.run({'probe': probe})
+
+        self.assertEqual(str(expected_error.exception), "Configuration error: offline")
+        self.assertFalse(os.path.exists(self.storage_file_path))
+
+    @mock.patch('youspotube.util.health_check.threading')
+    def test_HealthCheck_run_probes_on_daemon_threads(self, threading_mock):
+        threading_mock.Thread.return_value.start.side_effect = lambda: HealthCheck._run_probe(
+            *threading_mock.Thread.call_args[1]['args']
+        )
+        probe = Mock()
+
+        self.health_check.run({'probe': probe})
+
+        probe.assert_called_once()
+        self.assertTrue(threading_mock.Thread.return_value.daemon)
+        self.assertTrue(os.path.exists(self.storage_file_path))
+
+    @mock.patch('youspotube.util.health_check.wait')
+    def test_HealthCheck_raise_error_on_missed_deadline(self, wait_mock):
+        wait_mock.side_effect = lambda futures, timeout: Mock(not_done=set(futures))
+
+        with self.assertRaises(ConfigurationError) as expected_error:
+            self.health_check.run({'probe': Mock()})
+
+        wait_mock.assert_called_once()
+        self.assertEqual(wait_mock.call_args[1]['timeout'], constants.HEALTH_CHECK_DEADLINE_SECONDS)
+        self.assertEqual(
+            str(expected_error.exception),
+            "Configuration error: Health check of probe did not finish within %s seconds" %
+            constants.HEALTH_CHECK_DEADLINE_SECONDS
+        )
+        self.assertFalse(os.path.exists(self.storage_file_path))
+
+    @mock.patch('youspotube.util.health_check.logging')
+    def test_HealthCheck_skip_probes_after_recent_success(self, logging_mock):
+        self.health_check.run({'probe': Mock()})
+        probe = Mock()
+
+        self.health_check.run({'probe': probe})
+
+        probe.assert_not_called()
+        logging_mock.debug.assert_called_once_with(
+            "Skipping the health checks, the last successful ones are less than %s seconds old" %
+            constants.HEALTH_CHECK_CACHE_TTL_SECONDS
+        )
+
+    @mock.patch('youspotube.util.health_check.time')
+    def test_HealthCheck_run_probes_after_cached_success_expires(self, time_mock):
+        time_mock.time.return_value = 1000
+        self.health_check.run({'probe': Mock()})
+        time_mock.time.return_value = os.path.getmtime(self.storage_file_path) + constants.HEALTH_CHECK_CACHE_TTL_SECONDS
+        probe = Mock()
+
+        self.health_check.run({'probe': probe})
+
+        probe.assert_called_once()
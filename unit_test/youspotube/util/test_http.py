@@ -1,6 +1,5 @@
 import unittest
 from unittest import mock
-from unittest.mock import call
 
 from youspotube.exceptions import ConfigurationError
 from youspotube.util.http import HttpUtil
@@ -14,7 +13,7 @@ class HttpUtilTest(unittest.TestCase):
         check_url_mock.side_effect = Exception(expected_message)
 
         with self.assertRaises(ConfigurationError) as config_err:
-            HttpUtil.check_connectivity()
+            HttpUtil.check_connectivity(constants.SPOTIFY_API_URL)
 
         check_url_mock.assert_called_once_with(constants.SPOTIFY_API_URL)
         self.assertEqual(
@@ -24,11 +23,9 @@ class HttpUtilTest(unittest.TestCase):
 
     @mock.patch.object(HttpUtil, '_check_url')
     def test_HttpUtil_check_connectivity_no_error(self, check_url_mock):
-        expected_calls = [call(constants.SPOTIFY_API_URL), call(constants.YOUTUBE_API_URL)]
+        HttpUtil.check_connectivity(constants.YOUTUBE_API_URL)
 
-        HttpUtil.check_connectivity()
-
-        check_url_mock.assert_has_calls(expected_calls)
+        check_url_mock.assert_called_once_with(constants.YOUTUBE_API_URL)
 
     @mock.patch('youspotube.util.http.requests')
     def test_HttpUtil_check_url(self, requests_mock):
@@ -36,4 +33,4 @@ class HttpUtilTest(unittest.TestCase):
 
         HttpUtil._check_url(test_url)
 
-        requests_mock.head.assert_called_with(test_url)
+        requests_mock.head.assert_called_with(test_url, timeout=constants.CONNECTIVITY_CHECK_TIMEOUT_SECONDS)
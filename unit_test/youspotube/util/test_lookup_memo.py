@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest.mock import Mock
+
+from youspotube.util.lookup_memo import LookupMemo
+
+
+class LookupMemoTest(unittest.TestCase):
+    def setUp(self):
+        self.lookup_memo = LookupMemo()
+
+    def test_LookupMemo_look_up_once(self):
+        lookup = Mock(return_value='result')
+
+        self.assertEqual(self.lookup_memo.get('key', lookup), 'result')
+        self.assertEqual(self.lookup_memo.get('key', lookup), 'result')
+
+        lookup.assert_called_once()
+
+    def test_LookupMemo_look_up_different_keys(self):
+        self.assertEqual(self.lookup_memo.get('key1', lambda: 'result1'), 'result1')
+        self.assertEqual(self.lookup_memo.get('key2', lambda: 'result2'), 'result2')
+
+    def test_LookupMemo_concurrent_lookups_wait_for_the_first_one(self):
+        lookup_started = threading.Event()
+        release_lookup = threading.Event()
+        lookup_calls = []
+        results = []
+
+        def slow_lookup():
+            lookup_calls.append(1)
+            lookup_started.set()
+            release_lookup.wait(5)
+            return 'result'
+
+        first_thread = threading.Thread(target=lambda: results.append(self.lookup_memo.get('key', slow_lookup)))
+        first_thread.start()
+        lookup_started.wait(5)
+        second_thread = threading.Thread(target=lambda: results.append(self.lookup_memo.get('key', slow_lookup)))
+        second_thread.start()
+        release_lookup.set()
+        first_thread.join(5)
+        second_thread.join(5)
+
+        self.assertEqual(lookup_calls, [1])
+        self.assertEqual(results, ['result', 'result'])
+
+    def test_LookupMemo_do_not_remember_failed_lookups(self):
+        lookup = Mock(side_effect=[Exception('search failed'), 'result'])
+
+        with self.assertRaises(Exception):
+            self.lookup_memo.get('key', lookup)
+
+        self.assertEqual(self.lookup_memo.get('key', lookup), 'result')
+        self.assertEqual(lookup.call_count, 2)
+
+    def test_LookupMemo_clear(self):
+        lookup = Mock(return_value='result')
+        self.lookup_memo.get('key', lookup)
+
+        self.lookup_memo.clear()
+        self.lookup_memo.get('key', lookup)
+
+        self.assertEqual(lookup.call_count, 2)
@@ -0,0 +1,98 @@
+import unittest
+from unittest import mock
+
+from youspotube.util.match_cache import MatchCache
+
+
+class MatchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.match_cache = MatchCache(':memory:', 60, 2)
+
+    def test_MatchCache_get_missing_match(self):
+        self.assertIsNone(self.match_cache.get('kind', '1'))
+
+    def test_MatchCache_put_and_get_match(self):
+        details = {'delta': 3, 'results': [{'id': '2'}]}
+
+        self.match_cache.put('kind', '1', '2', details)
+
+        self.assertEqual(self.match_cache.get('kind', '1'), ('2', details))
+        self.assertIsNone(self.match_cache.get('other kind', '1'))
+
+    def test_MatchCache_put_replaces_match(self):
+        self.match_cache.put('kind', '1', '2', {})
+        self.match_cache.put('kind', '1', '3', {})
+
+        self.assertEqual(self.match_cache.get('kind', '1'), ('3', {}))
+
+    @mock.patch('youspotube.util.match_cache.time')
+    def test_MatchCache_update_details_keeps_matched_at(self, time_mock):
+        time_mock.time.return_value = 1000
+        self.match_cache.put('kind', '1', '2', {'verified': None})
+        time_mock.time.return_value = 1050
+
+        self.match_cache.update_details('kind', '1', '2', {'verified': True})
+
+        self.assertEqual(self.match_cache.get('kind', '1'), ('2', {'verified': True}))
+        time_mock.time.return_value = 1061
+        self.assertIsNone(self.match_cache.get('kind', '1'))
+
+    def test_MatchCache_update_details_of_replaced_match(self):
+        self.match_cache.put('kind', '1', '3', {})
+
+        self.match_cache.update_details('kind', '1', '2', {'verified': True})
+
+        self.assertEqual(self.match_cache.get('kind', '1'), ('3', {}))
+
+    @mock.patch('youspotube.util.match_cache.time')
+    def test_MatchCache_get_expired_match(self, time_mock):
+        time_mock.time.return_value = 1000
+        self.match_cache.put('kind', '1', '2', {})
+
+        time_mock.time.return_value = 1061
+
+        self.assertIsNone(self.match_cache.get('kind', '1'))
+
+    @mock.patch('youspotube.util.match_cache.time')
+    def test_MatchCache_prune_expired(self, time_mock):
+        time_mock.time.return_value = 1000
+        self.match_cache.put('kind', '1', '2', {})
+        time_mock.time.return_value = 1050
+        self.match_cache.put('kind', '3', '4', {})
+
+        time_mock.time.return_value = 1061
+
+        self.assertEqual(self.match_cache.prune(), (1, 0))
+        self.assertEqual(self.match_cache.get('kind', '3'), ('4', {}))
+
+    @mock.patch('youspotube.util.match_cache.time')
+    def test_MatchCache_prune_over_size_cap(self, time_mock):
+        time_mock.time.return_value = 1000
+        self.match_cache.put('kind', '1', '2', {})
+        time_mock.time.return_value = 1010
+        self.match_cache.put('other kind', '3', '4', {})
+        time_mock.time.return_value = 1020
+        self.match_cache.put('kind', '5', '6', {})
+
+        self.assertEqual(self.match_cache.prune(), (0, 1))
+        self.assertIsNone(self.match_cache.get('kind', '1'))
+        self.assertEqual(self.match_cache.get('other kind', '3'), ('4', {}))
+        self.assertEqual(self.match_cache.get('kind', '5'), ('6', {}))
+
+    def test_MatchCache_invalidate_all(self):
+        self.match_cache.put('kind', '1', '2', {})
+        self.match_cache.put('kind', '3', '4', {})
+
+        self.assertEqual(self.match_cache.invalidate(), 2)
+        self.assertIsNone(self.match_cache.get('kind', '1'))
+        self.assertIsNone(self.match_cache.get('kind', '3'))
+
+    def test_MatchCache_invalidate_by_source_or_target_id(self):
+        self.match_cache.put('kind', '1', '2', {})
+        self.match_cache.put('kind', '3', '4', {})
+        self.match_cache.put('kind', '5', '6', {})
+
+        self.assertEqual(self.match_cache.invalidate(['1', '4']), 2)
+        self.assertIsNone(self.match_cache.get('kind', '1'))
+        self.assertIsNone(self.match_cache.get('kind', '3'))
+        self.assertEqual(self.match_cache.get('kind', '5'), ('6', {}))
@@ -0,0 +1,16 @@
+import unittest
+
+from youspotube.util.page_cache import PageCache
+
+
+class PageCacheTest(unittest.TestCase):
+    def test_PageCache_get_missing_page(self):
+        self.assertIsNone(PageCache().get(('PL1', None)))
+
+    def test_PageCache_put_and_get_page(self):
+        page_cache = PageCache()
+        page = {'etag': 'etag1'}
+
+        page_cache.put(('PL1', None), page)
+
+        self.assertIs(page_cache.get(('PL1', None)), page)
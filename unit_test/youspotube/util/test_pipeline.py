@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+
+from youspotube.util.pipeline import CountedStream, Pipeline
+
+
+class PipelineTest(unittest.TestCase):
+    def test_Pipeline_ordered_map_keeps_order_of_items(self):
+        def slow_first(item):
+            if item == 0:
+                time.sleep(0.05)
+            return item * 10
+
+        return_value = list(Pipeline.ordered_map(slow_first, range(5), 3, 4))
+
+        self.assertEqual(return_value, [0, 10, 20, 30, 40])
+
+    def test_Pipeline_ordered_map_bounds_pending_results(self):
+        consumed_items = []
+
+        def items():
+            for item in range(10):
+                consumed_items.append(item)
+                yield item
+
+        results = Pipeline.ordered_map(lambda item: item, items(), 2, 3)
+
+        self.assertEqual(next(results), 0)
+        # one result was taken and at most 3 wait for the consumer, the rest of the items are not consumed yet
+        self.assertEqual(consumed_items, [0, 1, 2, 3])
+        self.assertEqual(list(results), list(range(1, 10)))
+
+    def test_Pipeline_ordered_map_raises_error_of_item(self):
+        def fail_on_second(item):
+            if item == 1:
+                raise ValueError('failed')
+            return item
+
+        results = Pipeline.ordered_map(fail_on_second, range(3), 2, 2)
+
+        self.assertEqual(next(results), 0)
+        with self.assertRaises(ValueError):
+            next(results)
+
+    def test_Pipeline_run_ahead_consumes_items_ahead_of_consumer(self):
+        all_items_consumed = threading.Event()
+
+        def items():
+            yield from range(5)
+            all_items_consumed.set()
+
+        results = Pipeline.run_ahead(items(), 10)
+
+        self.assertEqual(next(results), 0)
+        # the items are consumed while the consumer holds on to the first one
+        self.assertTrue(all_items_consumed.wait(1))
+        self.assertEqual(list(results), [1, 2, 3, 4])
+
+    def test_Pipeline_run_ahead_bounds_pending_items(self):
+        consumed_items = []
+        pending_items_full = threading.Event()
+
+        def items():
+            for item in range(10):
+                consumed_items.append(item)
+                if item == 4:
+                    pending_items_full.set()
+                yield item
+
+        results = Pipeline.run_ahead(items(), 3)
+
+        self.assertEqual(next(results), 0)
+        self.assertTrue(pending_items_full.wait(1))
+        time.sleep(0.05)
+        # one item was taken, 3 wait for the consumer and one more waits for room, the rest are not consumed yet
+        self.assertEqual(consumed_items, [0, 1, 2, 3, 4])
+        self.assertEqual(list(results), list(range(1, 10)))
+
+    def test_Pipeline_run_ahead_stops_consuming_items_after_consumer(self):
+        items_stopped = threading.Event()
+
+        def items():
+            try:
+                yield from range(10)
+            finally:
+                items_stopped.set()
+
+        results = Pipeline.run_ahead(items(), 1)
+
+        self.assertEqual(next(results), 0)
+        results.close()
+
+        # the thread that waited for room for the pending items is not left waiting forever
+        self.assertTrue(items_stopped.wait(1))
+
+    def test_Pipeline_run_ahead_raises_error_after_items_before_it(self):
+        def items():
+            yield 0
+            raise ValueError('failed')
+
+        results = Pipeline.run_ahead(items(), 10)
+
+        self.assertEqual(next(results), 0)
+        with self.assertRaises(ValueError):
+            next(results)
+
+    def test_Pipeline_run_ahead_no_items(self):
+        self.assertEqual(list(Pipeline.run_ahead(iter([]), 10)), [])
+
+    def test_Pipeline_ordered_map_no_items(self):
+        self.assertEqual(list(Pipeline.ordered_map(lambda item: item, [], 2, 2)), [])
+
+
+class CountedStreamTest(unittest.TestCase):
+    def test_CountedStream_counts_consumed_items(self):
+        stream = CountedStream(iter(['a', 'b', 'c']))
+
+        self.assertEqual(stream.count, 0)
+        self.assertEqual(list(stream), ['a', 'b', 'c'])
+        self.assertEqual(stream.count, 3)
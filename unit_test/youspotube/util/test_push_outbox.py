@@ -0,0 +1,78 @@
+import unittest
+
+from youspotube.util.push_outbox import PushOutbox
+
+
+class PushOutboxTest(unittest.TestCase):
+    def setUp(self):
+        self.push_outbox = PushOutbox(':memory:')
+
+    def get_pending_songs(self, *outbox_key):
+        return [(song_id, track_position) for push_id, song_id, track_position in self.push_outbox.get_pending(*outbox_key)]
+
+    def test_PushOutbox_get_pending_empty(self):
+        self.assertEqual(self.push_outbox.get_pending('spotify', 'sp1', 'yt1'), [])
+
+    def test_PushOutbox_append_and_get_pending(self):
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v2', 5)
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v1', 3)
+        self.push_outbox.append('spotify', 'sp2', 'yt2', 'v3', 0)
+
+        self.assertEqual(self.get_pending_songs('spotify', 'sp1', 'yt1'), [('v2', 5), ('v1', 3)])
+        self.assertEqual(self.push_outbox.get_pending('youtube', 'sp1', 'yt1'), [])
+
+    def test_PushOutbox_mark_done(self):
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v1', 0)
+        self.push_outbox.append('spotify', 'sp2', 'yt2', 'v2', 0)
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v3', 1)
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v4', 2)
+
+        self.push_outbox.mark_done('spotify', 'sp1', 'yt1', 2)
+
+        self.assertEqual(self.get_pending_songs('spotify', 'sp1', 'yt1'), [('v4', 2)])
+        self.assertEqual(self.get_pending_songs('spotify', 'sp2', 'yt2'), [('v2', 0)])
+
+    def test_PushOutbox_remove(self):
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v1', 0)
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v2', 1)
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v3', 2)
+        pending_pushes = self.push_outbox.get_pending('spotify', 'sp1', 'yt1')
+        pending_push_ids = [push_id for push_id, song_id, track_position in pending_pushes]
+
+        self.push_outbox.remove([pending_push_ids[0], pending_push_ids[2]])
+
+        self.assertEqual(self.get_pending_songs('spotify', 'sp1', 'yt1'), [('v2', 1)])
+
+    def test_PushOutbox_get_missing_run(self):
+        self.assertIsNone(self.push_outbox.get_run('spotify', 'sp1', 'yt1'))
+
+    def test_PushOutbox_start_run(self):
+        versions = {'spotify': 's1', 'youtube': 'e1'}
+        self.push_outbox.start_run('spotify', 'sp1', 'yt1', None)
+        self.push_outbox.append('spotify', 'sp1', 'yt1', 'v1', 0)
+
+        # a new run drops the pushes of the previous one
+        self.push_outbox.start_run('spotify', 'sp1', 'yt1', versions)
+
+        self.assertEqual(self.push_outbox.get_run('spotify', 'sp1', 'yt1'), (versions, False))
+        self.assertEqual(self.push_outbox.get_pending('spotify', 'sp1', 'yt1'), [])
+        self.assertIsNone(self.push_outbox.get_run('youtube', 'sp1', 'yt1'))
+
+    def test_PushOutbox_set_diffed(self):
+        self.push_outbox.start_run('spotify', 'sp1', 'yt1', None)
+
+        self.push_outbox.set_diffed('spotify', 'sp1', 'yt1')
+
+        self.assertEqual(self.push_outbox.get_run('spotify', 'sp1', 'yt1'), (None, True))
+
+    def test_PushOutbox_finish_run(self):
+        self.push_outbox.start_run('youtube', 'sp1', 'yt1', {})
+        self.push_outbox.append('youtube', 'sp1', 'yt1', 't1', 0)
+        self.push_outbox.append('youtube', 'sp1', 'yt1', 't2', 1)
+        self.push_outbox.start_run('youtube', 'sp2', 'yt2', {})
+        self.push_outbox.append('youtube', 'sp2', 'yt2', 't3', 0)
+
+        self.assertEqual(self.push_outbox.finish_run('youtube', 'sp1', 'yt1'), 2)
+        self.assertIsNone(self.push_outbox.get_run('youtube', 'sp1', 'yt1'))
+        self.assertEqual(self.push_outbox.get_pending('youtube', 'sp1', 'yt1'), [])
+        self.assertEqual(self.get_pending_songs('youtube', 'sp2', 'yt2'), [('t3', 0)])
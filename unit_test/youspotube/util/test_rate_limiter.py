@@ -0,0 +1,106 @@
+import unittest
+from unittest import mock
+
+from youspotube.util.rate_limiter import RateLimiter
+import youspotube.constants as constants
+
+
+@mock.patch('youspotube.util.rate_limiter.logging')
+@mock.patch('youspotube.util.rate_limiter.time')
+class RateLimiterTest(unittest.TestCase):
+    def create_rate_limiter(self, time_mock, operations_per_minute=60):
+        self.now = 1000
+        self.sleeps = []
+        time_mock.monotonic.side_effect = lambda: self.now
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+        time_mock.sleep.side_effect = sleep
+
+        return RateLimiter('Test', operations_per_minute)
+
+    def test_RateLimiter_report_rate(self, time_mock, logging_mock):
+        rate_limiter = self.create_rate_limiter(time_mock, 30)
+
+        logging_mock.info.assert_called_once_with("Pushing to Test at up to 30 operations per minute")
+        self.assertEqual(rate_limiter.get_operations_per_minute(), 30)
+
+    def test_RateLimiter_acquire_burst_without_waiting(self, time_mock, logging_mock):
+        rate_limiter = self.create_rate_limiter(time_mock)
+
+        for _ in range(constants.RATE_LIMITER_BURST):
+            rate_limiter.acquire()
+
+        self.assertEqual(self.sleeps, [])
+
+    def test_RateLimiter_acquire_waits_for_token_after_burst(self, time_mock, logging_mock):
+        rate_limiter = self.create_rate_limiter(time_mock)
+
+        for _ in range(constants.RATE_LIMITER_BURST + 2):
+            rate_limiter.acquire()
+
+        # 60 operations per minute means a new token every second
+        self.assertEqual(self.sleeps, [1, 1])
+
+    def test_RateLimiter_acquire_waits_without_holding_lock(self, time_mock, logging_mock):
+        rate_limiter = self.create_rate_limiter(time_mock)
+        for _ in range(constants.RATE_LIMITER_BURST):
+            rate_limiter.acquire()
+        sleep = time_mock.sleep.side_effect
+
+        def sleep_during_error(seconds):
+            self.assertFalse(rate_limiter.lock.locked())
+            if len(self.sleeps) == 0:
+                # another worker reports an error while this one waits for a token
+                rate_limiter.on_error(10)
+            sleep(seconds)
+
+        time_mock.sleep.side_effect = sleep_during_error
+
+        rate_limiter.acquire()
+
+        # after waking up the wait is computed again, now honouring the Retry-After of the error
+        self.assertEqual(self.sleeps, [1, 9])
+
+    def test_RateLimiter_on_error_backs_off_and_honours_retry_after(self, time_mock, logging_mock):
+        rate_limiter = self.create_rate_limiter(time_mock)
+
+        rate_limiter.on_error(10)
+        rate_limiter.acquire()
+
+        self.assertEqual(rate_limiter.get_operations_per_minute(), 60 * constants.RATE_LIMITER_BACKOFF_FACTOR)
+        self.assertEqual(self.sleeps, [10])
+        logging_mock.info.assert_called_with(
+            "Test push rate lowered to %s operations per minute, retrying after 10 seconds" % (
+                60 * constants.RATE_LIMITER_BACKOFF_FACTOR
+            )
+        )
+
+    def test_RateLimiter_on_error_does_not_go_below_min_rate(self, time_mock, logging_mock):
+        rate_limiter = self.create_rate_limiter(time_mock)
+
+        for _ in range(100):
+            rate_limiter.on_error()
+
+        self.assertEqual(rate_limiter.rate, rate_limiter.max_rate * constants.RATE_LIMITER_MIN_RATE_RATIO)
+
+    def test_RateLimiter_on_success_recovers_up_to_max_rate(self, time_mock, logging_mock):
+        rate_limiter = self.create_rate_limiter(time_mock)
+        rate_limiter.on_error()
+
+        rate_limiter.on_success()
+
+        self.assertGreater(rate_limiter.rate, rate_limiter.max_rate * constants.RATE_LIMITER_BACKOFF_FACTOR)
+
+        for _ in range(100):
+            rate_limiter.on_success()
+
+        self.assertEqual(rate_limiter.rate, rate_limiter.max_rate)
+
+    def test_RateLimiter_parse_retry_after(self, time_mock, logging_mock):
+        self.assertEqual(RateLimiter.parse_retry_after('3'), 3)
+        self.assertEqual(RateLimiter.parse_retry_after(7), 7)
+        self.assertIsNone(RateLimiter.parse_retry_after(None))
+        self.assertIsNone(RateLimiter.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'))
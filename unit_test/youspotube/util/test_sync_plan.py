@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+
+import youspotube.constants as constants
+from youspotube.util.sync_plan import SyncPlan
+
+
+class SyncPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.sync_plan = SyncPlan(constants.ORIGIN_SPOTIFY)
+        self.playlist_details = {
+            constants.ORIGIN_SPOTIFY: 'sp1',
+            constants.ORIGIN_YOUTUBE: 'yt1'
+        }
+        self.versions = {
+            constants.ORIGIN_SPOTIFY: 's1',
+            constants.ORIGIN_YOUTUBE: 'e1',
+            constants.TIED_SONGS_PARAMETER: 't1'
+        }
+
+    def test_SyncPlan_add_playlist_with_songs(self):
+        self.sync_plan.add_songs(self.playlist_details, [['video1', 0], ['video2', 5]])
+        self.sync_plan.add_playlist('Various', self.playlist_details, self.versions)
+
+        self.assertEqual(self.sync_plan.get_playlists_details(), {'Various': self.playlist_details})
+        self.assertEqual(self.sync_plan.get_versions('Various'), self.versions)
+        self.assertEqual(self.sync_plan.get_songs('Various'), [['video1', 0], ['video2', 5]])
+
+    def test_SyncPlan_add_playlist_without_songs(self):
+        self.sync_plan.add_playlist('Various', self.playlist_details, self.versions)
+
+        self.assertEqual(self.sync_plan.get_songs('Various'), [])
+
+    def test_SyncPlan_songs_of_playlist_that_was_not_added_are_not_planned(self):
+        self.sync_plan.add_songs(self.playlist_details, [['video1', 0]])
+
+        self.assertEqual(self.sync_plan.get_playlists_details(), {})
+
+    def test_SyncPlan_save_and_load(self):
+        self.sync_plan.add_songs(self.playlist_details, [['video1', 0]])
+        self.sync_plan.add_playlist('Various', self.playlist_details, self.versions)
+
+        with tempfile.TemporaryDirectory() as plan_dir:
+            plan_file_path = os.path.join(plan_dir, 'plan.json')
+            self.sync_plan.save(plan_file_path)
+            with open(plan_file_path) as plan_file:
+                plan = json.load(plan_file)
+            loaded_sync_plan = SyncPlan.load(plan_file_path)
+
+        self.assertEqual(plan[constants.SYNC_PLAN_ORIGIN_KEY], constants.ORIGIN_SPOTIFY)
+        self.assertEqual(loaded_sync_plan.origin, constants.ORIGIN_SPOTIFY)
+        self.assertEqual(loaded_sync_plan.get_playlists_details(), {'Various': self.playlist_details})
+        self.assertEqual(loaded_sync_plan.get_versions('Various'), self.versions)
+        self.assertEqual(loaded_sync_plan.get_songs('Various'), [['video1', 0]])
+
+    def test_SyncPlan_load_missing_keys(self):
+        with tempfile.TemporaryDirectory() as plan_dir:
+            plan_file_path = os.path.join(plan_dir, 'plan.json')
+            with open(plan_file_path, 'w') as plan_file:
+                plan_file.write('{}')
+
+            with self.assertRaises(KeyError):
+                SyncPlan.load(plan_file_path)
@@ -0,0 +1,33 @@
+import unittest
+
+from youspotube.util.sync_state import SyncState
+
+
+class SyncStateTest(unittest.TestCase):
+    def setUp(self):
+        self.sync_state = SyncState(':memory:')
+
+    def test_SyncState_get_missing_versions(self):
+        self.assertIsNone(self.sync_state.get_versions('spotify', 'sp1', 'yt1'))
+
+    def test_SyncState_put_and_get_versions(self):
+        versions = {'spotify': 's1', 'youtube': 'e1'}
+
+        self.sync_state.put_versions('spotify', 'sp1', 'yt1', versions)
+
+        self.assertEqual(self.sync_state.get_versions('spotify', 'sp1', 'yt1'), versions)
+        self.assertIsNone(self.sync_state.get_versions('youtube', 'sp1', 'yt1'))
+        self.assertIsNone(self.sync_state.get_versions('spotify', 'sp1', 'yt2'))
+
+    def test_SyncState_put_replaces_versions(self):
+        self.sync_state.put_versions('spotify', 'sp1', 'yt1', {'spotify': 's1'})
+        self.sync_state.put_versions('spotify', 'sp1', 'yt1', {'spotify': 's2'})
+
+        self.assertEqual(self.sync_state.get_versions('spotify', 'sp1', 'yt1'), {'spotify': 's2'})
+
+    def test_SyncState_clear(self):
+        self.sync_state.put_versions('spotify', 'sp1', 'yt1', {})
+        self.sync_state.put_versions('spotify', 'sp2', 'yt2', {})
+
+        self.assertEqual(self.sync_state.clear(), 2)
+        self.assertIsNone(self.sync_state.get_versions('spotify', 'sp1', 'yt1'))
@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from youspotube.util.token_cache import TokenCache
+
+
+class TokenCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temporary_directory.name, 'token_cache')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_TokenCache_no_token_file(self):
+        token_cache = TokenCache(self.cache_path)
+
+        self.assertIsNone(token_cache.get_cached_token())
+
+    def test_TokenCache_read_token_file_once(self):
+        token_info = {'access_token': 'token'}
+        with open(self.cache_path, 'w') as cache_file:
+            cache_file.write(json.dumps(token_info))
+        token_cache = TokenCache(self.cache_path)
+        os.remove(self.cache_path)
+
+        self.assertEqual(token_cache.get_cached_token(), token_info)
+
+    def test_TokenCache_save_token(self):
+        token_info = {'access_token': 'token'}
+        token_cache = TokenCache(self.cache_path)
+
+        token_cache.save_token_to_cache(token_info)
+
+        self.assertEqual(token_cache.get_cached_token(), token_info)
+        with open(self.cache_path) as cache_file:
+            self.assertEqual(json.loads(cache_file.read()), token_info)
+
+    @mock.patch('youspotube.util.token_cache.logging')
+    @mock.patch('youspotube.util.token_cache.Tools')
+    def test_TokenCache_keep_token_in_memory_if_it_cannot_be_saved(self, tools_mock, logging_mock):
+        token_info = {'access_token': 'token'}
+        tools_mock.write_file_atomically.side_effect = OSError('read-only')
+        token_cache = TokenCache(self.cache_path)
+
+        token_cache.save_token_to_cache(token_info)
+
+        self.assertEqual(token_cache.get_cached_token(), token_info)
+        logging_mock.warning.assert_called_once_with(
+            "Could not save Spotify token to '%s': read-only" % self.cache_path
+        )
@@ -71,3 +71,15 @@ class ToolsTest(unittest.TestCase):
         return_value = Tools.getcwd()
 
         self.assertEqual(return_value, expected_cwd)
+
+    @mock.patch('youspotube.util.tools.os')
+    @mock.patch('builtins.open')
+    def test_Tools_write_file_atomically(self, open_mock, os_mock):
+        filepath = os.path.join('.', 'file')
+        expected_temporary_filepath = "%s.tmp" % filepath
+
+        Tools.write_file_atomically(filepath, b'data', 'wb')
+
+        open_mock.assert_called_once_with(expected_temporary_filepath, 'wb')
+        open_mock.return_value.__enter__.return_value.write.assert_called_once_with(b'data')
+        os_mock.replace.assert_called_once_with(expected_temporary_filepath, filepath)